@@ -4,10 +4,12 @@ from .availability_agent import AvailabilityAgent
 from .preference_agent import PreferenceAgent
 from .optimization_agent import OptimizationAgent
 from .negotiation_agent import NegotiationAgent
+from .joint_scheduling_agent import JointSchedulingAgent
 
 __all__ = [
     "AvailabilityAgent",
     "PreferenceAgent",
     "OptimizationAgent",
     "NegotiationAgent",
+    "JointSchedulingAgent",
 ]
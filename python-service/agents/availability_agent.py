@@ -1,6 +1,8 @@
 """Availability Agent: Computes free/busy slots with buffer and timezone handling."""
 
-from typing import List, Set, Tuple
+import math
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta, timezone
 from schemas.scheduling import (
     Participant,
@@ -8,7 +10,19 @@ from schemas.scheduling import (
     SchedulingConstraints,
     DayOfWeek,
     EventCategory,
+    WorkingHoursMode,
 )
+from agents.busy_index import (
+    BusyIndex,
+    MICROSECONDS_PER_MINUTE,
+    from_epoch_us,
+    to_epoch_us,
+    to_minutes,
+)
+from agents import availability_grid, interval_set, timezone_engine
+from agents.availability_grid import AvailabilityGrid, np
+from agents.interval_set import IntervalSet
+from services import metrics_service
 
 
 class AvailabilityAgent:
@@ -22,60 +36,112 @@ class AvailabilityAgent:
     - Respect working hours and allowed days
     """
     
+    # Candidate slot start times are spaced on a 30-minute grid
+    SLOT_STEP_MINUTES = 30
+    
     @staticmethod
     def find_available_slots(
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        strategy: str = "auto",
     ) -> List[TimeSlot]:
         """
         Find all available time slots that work for all required participants.
         
+        Strategies:
+        - "sweep": Merge required participants' busy time once and only emit
+          grid slots that fit inside free gaps (cost scales with free gaps)
+        - "bitset": OR the required participants' busy bitsets (see
+          AvailabilityGrid) and find free runs with a prefix-sum scan (cost
+          scales with participants x window length, not with busy slots)
+        - "scan": Enumerate every grid slot, then filter each one against
+          busy data (reference implementation)
+        - "auto": "bitset" when NumPy is installed, otherwise "sweep"
+        
+        All strategies return the same slots in the same order. With
+        ``constraints.working_hours_mode`` set to "participants", the time
+        windows are first clipped to the hours that are working hours for
+        every required participant in their own timezone (see
+        _shared_working_hours), so no slot outside them is generated.
+        
         Args:
             participants: List of meeting participants with calendar summaries
             constraints: Scheduling constraints (duration, working hours, etc.)
+            strategy: Slot generation strategy ("auto", "sweep", "bitset" or "scan")
             
         Returns:
             List of available time slots
         """
-        # Generate all possible time slots within constraints
-        candidate_slots = AvailabilityAgent._generate_candidate_slots(constraints)
-        
-        # Filter slots based on participant availability
-        available_slots = []
-        for slot in candidate_slots:
-            if AvailabilityAgent._is_slot_available_for_all(
-                slot, participants, constraints
-            ):
-                available_slots.append(slot)
+        if strategy == "auto":
+            strategy = "bitset" if availability_grid.is_available() else "sweep"
+        if strategy == "sweep":
+            available_slots = AvailabilityAgent._generate_free_slots(participants, constraints)
+        elif strategy == "bitset":
+            available_slots = AvailabilityAgent._generate_bitset_slots(participants, constraints)
+        elif strategy == "scan":
+            # Generate all possible time slots within constraints
+            candidate_slots = AvailabilityAgent._generate_candidate_slots(constraints, participants)
+            
+            # Filter slots based on participant availability
+            available_slots = []
+            for slot in candidate_slots:
+                if AvailabilityAgent._is_slot_available_for_all(
+                    slot, participants, constraints
+                ):
+                    available_slots.append(slot)
+        else:
+            raise ValueError(f"Unknown slot strategy: {strategy}")
+        
+        if metrics_service.active():
+            metrics_service.count(
+                "slots_generated", AvailabilityAgent._count_grid_slots(constraints, participants)
+            )
+            metrics_service.count("slots_available", len(available_slots))
         
         return available_slots
     
     @staticmethod
-    def _generate_candidate_slots(
+    def _count_grid_slots(
         constraints: SchedulingConstraints,
-    ) -> List[TimeSlot]:
+        participants: Optional[List[Participant]] = None,
+    ) -> int:
+        """Count the grid slots considered for the constraints (fit in a time window)."""
+        duration = constraints.duration_minutes * 60
+        step = AvailabilityAgent.SLOT_STEP_MINUTES * 60
+        total = 0
+        for day_start, day_end in AvailabilityAgent._iter_time_windows(constraints, participants):
+            span = (day_end - day_start).total_seconds()
+            if span >= duration:
+                total += int((span - duration) // step) + 1
+        return total
+    
+    @staticmethod
+    def _iter_time_windows(
+        constraints: SchedulingConstraints,
+        participants: Optional[List[Participant]] = None,
+    ) -> Iterator[Tuple[datetime, datetime]]:
         """
-        Generate intelligent time slots based on event category, weekday/weekend.
+        Yield (window_start, window_end) datetimes for every allowed day.
         
-        This method generates slots:
-        1. During office hours gaps (not just after hours)
-        2. With different time windows for weekdays vs weekends
-        3. Based on event category preferences
+        Windows come from _get_time_windows_for_category, so they differ for
+        weekdays vs weekends and by event category. Disallowed weekdays and
+        holidays are skipped. In the "participants" working hours mode each
+        window is clipped to the required participants' shared working
+        hours (a window may then yield several parts, or none).
         
         Args:
             constraints: Scheduling constraints
+            participants: Participants whose working hours apply (only read
+                in the "participants" working hours mode)
             
-        Returns:
-            List of candidate time slots
+        Yields:
+            Timezone-aware window boundaries, in chronological day order
         """
-        slots = []
         # Ensure datetime is timezone-aware
         current_date = constraints.earliest_date
         if current_date.tzinfo is None:
             current_date = current_date.replace(tzinfo=timezone.utc)
         
-        duration = timedelta(minutes=constraints.duration_minutes)
-        
         # Map DayOfWeek enum to Python weekday integers (0=Monday, 6=Sunday)
         allowed_weekdays = {
             DayOfWeek.MONDAY: 0,
@@ -101,7 +167,17 @@ class AvailabilityAgent:
         # Get event category
         event_category = getattr(constraints, 'event_category', EventCategory.MEETING)
         
-        # Generate slots day by day
+        # Working hours shared by every required participant, as UTC intervals
+        shared_hours = None
+        if (
+            participants is not None
+            and constraints.working_hours_mode == WorkingHoursMode.PARTICIPANTS
+        ):
+            shared_hours = AvailabilityAgent._shared_working_hours(
+                participants, constraints, current_date, latest_date, allowed_weekday_nums
+            )
+        
+        # Walk the range day by day
         while current_date <= latest_date:
             # Check if this day is allowed
             if current_date.weekday() not in allowed_weekday_nums:
@@ -121,7 +197,6 @@ class AvailabilityAgent:
                 event_category, is_weekend, constraints
             )
             
-            # Generate slots for each time window
             for window_start, window_end in time_windows:
                 day_start = current_date.replace(
                     hour=window_start,
@@ -135,26 +210,332 @@ class AvailabilityAgent:
                     second=0,
                     microsecond=0,
                 )
-                
-                # Generate slots in 30-minute increments
+                if shared_hours is None:
+                    yield day_start, day_end
+                else:
+                    yield from AvailabilityAgent._clip_window(day_start, day_end, shared_hours)
+            
+            current_date += timedelta(days=1)
+    
+    @staticmethod
+    def _shared_working_hours(
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+        earliest: datetime,
+        latest: datetime,
+        weekdays: Sequence[int],
+    ) -> Optional[IntervalSet]:
+        """
+        Intersect the required participants' local working hours.
+        
+        Each distinct timezone of a required participant contributes
+        working_hours_start-working_hours_end on its allowed local days
+        (timezone_engine.working_intervals), so the shared region follows
+        every zone's DST changes through the window.
+        
+        Args:
+            participants: List of participants
+            constraints: Scheduling constraints (working hours)
+            earliest: Start of the scheduling range
+            latest: End of the scheduling range
+            weekdays: Allowed weekdays (Monday is 0)
+            
+        Returns:
+            Shared working hours in epoch microseconds, or None without
+            required participants (nothing to restrict)
+        """
+        zones = list(dict.fromkeys(
+            p.calendar_summary.timezone for p in participants if p.is_required
+        ))
+        if not zones:
+            return None
+        
+        # Local dates that can overlap a window, whatever the UTC offsets
+        first_day = earliest.date() - timedelta(days=2)
+        last_day = latest.date() + timedelta(days=2)
+        shared = None
+        for zone in zones:
+            hours = timezone_engine.working_intervals(
+                zone,
+                first_day,
+                last_day,
+                constraints.working_hours_start,
+                constraints.working_hours_end,
+                weekdays,
+            )
+            shared = hours if shared is None else shared.intersection(hours)
+        return shared
+    
+    @staticmethod
+    def _clip_window(
+        day_start: datetime,
+        day_end: datetime,
+        intervals: IntervalSet,
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Yield the parts of a time window inside an interval set.
+        
+        Part starts are rounded up to the window's slot grid, so the slots of
+        a part are exactly the window's slots that fit inside it.
+        
+        Args:
+            day_start: Window start
+            day_end: Window end
+            intervals: Allowed time (epoch microseconds)
+            
+        Yields:
+            (part_start, part_end) datetimes in the window's timezone
+        """
+        window_start = to_epoch_us(day_start)
+        window_end = to_epoch_us(day_end)
+        step_us = AvailabilityAgent.SLOT_STEP_MINUTES * MICROSECONDS_PER_MINUTE
+        for part_start, part_end in intervals.clip(window_start, window_end):
+            part_start = window_start + -(-(part_start - window_start) // step_us) * step_us
+            if part_start < part_end:
+                yield (
+                    from_epoch_us(part_start, day_start.tzinfo),
+                    from_epoch_us(part_end, day_start.tzinfo),
+                )
+    
+    @staticmethod
+    def _generate_candidate_slots(
+        constraints: SchedulingConstraints,
+        participants: Optional[List[Participant]] = None,
+    ) -> List[TimeSlot]:
+        """
+        Generate intelligent time slots based on event category, weekday/weekend.
+        
+        This method generates slots:
+        1. During office hours gaps (not just after hours)
+        2. With different time windows for weekdays vs weekends
+        3. Based on event category preferences
+        
+        Args:
+            constraints: Scheduling constraints
+            participants: Participants whose working hours apply (only read
+                in the "participants" working hours mode)
+            
+        Returns:
+            List of candidate time slots
+        """
+        slots = []
+        duration = timedelta(minutes=constraints.duration_minutes)
+        step = timedelta(minutes=AvailabilityAgent.SLOT_STEP_MINUTES)
+        
+        for day_start, day_end in AvailabilityAgent._iter_time_windows(constraints, participants):
+            # Generate slots in 30-minute increments
+            slot_start = day_start
+            while slot_start + duration <= day_end:
+                slots.append(
+                    TimeSlot(
+                        start=slot_start,
+                        end=slot_start + duration,
+                        timezone=constraints.timezone,
+                    )
+                )
+                slot_start += step
+        
+        return slots
+    
+    @staticmethod
+    def _merge_required_busy(
+        participants: List[Participant],
+        buffer_us: int,
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Union the buffer-expanded busy runs of all required participants.
+        
+        Args:
+            participants: List of participants
+            buffer_us: Buffer applied around each busy slot (microseconds)
+            
+        Returns:
+            Tuple of parallel, sorted and disjoint start and end lists
+        """
+        runs = []
+        for participant in participants:
+            if not participant.is_required:
+                continue  # Optional participants don't block slots
+            busy_index = BusyIndex.for_summary(participant.calendar_summary)
+            runs.extend(zip(*busy_index.merged(buffer_us)))
+        runs.sort()
+        
+        merged_starts: List[int] = []
+        merged_ends: List[int] = []
+        for start, end in runs:
+            if merged_ends and start <= merged_ends[-1]:
+                if end > merged_ends[-1]:
+                    merged_ends[-1] = end
+            else:
+                merged_starts.append(start)
+                merged_ends.append(end)
+        return merged_starts, merged_ends
+    
+    @staticmethod
+    def _generate_free_slots(
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+    ) -> List[TimeSlot]:
+        """
+        Sweep-line slot generation over the free gaps of required participants.
+        
+        Busy time is merged once; each time window is then split into free
+        gaps, and only grid-aligned slot starts that fit inside a gap are
+        materialised as TimeSlot objects.
+        
+        Args:
+            participants: List of participants
+            constraints: Scheduling constraints
+            
+        Returns:
+            Available time slots, identical to the "scan" strategy
+        """
+        busy_starts, busy_ends = AvailabilityAgent._merge_required_busy(
+            participants, constraints.buffer_minutes * MICROSECONDS_PER_MINUTE
+        )
+        duration = timedelta(minutes=constraints.duration_minutes)
+        duration_us = constraints.duration_minutes * MICROSECONDS_PER_MINUTE
+        step_minutes = AvailabilityAgent.SLOT_STEP_MINUTES
+        step_us = step_minutes * MICROSECONDS_PER_MINUTE
+        
+        slots = []
+        for day_start, day_end in AvailabilityAgent._iter_time_windows(constraints, participants):
+            if day_start.utcoffset() != day_end.utcoffset():
+                # Wall-clock arithmetic across a DST change is not linear in
+                # epoch time, so check this window slot by slot instead
                 slot_start = day_start
                 while slot_start + duration <= day_end:
-                    slot_end = slot_start + duration
-                    
-                    # Create timezone-aware copies for the slot
-                    slot_start_aware = slot_start if slot_start.tzinfo else slot_start.replace(tzinfo=timezone.utc)
-                    slot_end_aware = slot_end if slot_end.tzinfo else slot_end.replace(tzinfo=timezone.utc)
-                    
+                    slot = TimeSlot(
+                        start=slot_start,
+                        end=slot_start + duration,
+                        timezone=constraints.timezone,
+                    )
+                    if AvailabilityAgent._is_slot_available_for_all(
+                        slot, participants, constraints
+                    ):
+                        slots.append(slot)
+                    slot_start += timedelta(minutes=step_minutes)
+                continue
+            
+            window_start = to_epoch_us(day_start)
+            window_end = to_epoch_us(day_end)
+            
+            # Walk busy runs that intersect the window, emitting free gaps
+            cursor = window_start
+            position = bisect_right(busy_ends, window_start)
+            while cursor < window_end:
+                if position < len(busy_starts) and busy_starts[position] < window_end:
+                    gap_end = busy_starts[position]
+                    next_cursor = max(cursor, busy_ends[position])
+                    position += 1
+                else:
+                    gap_end = window_end
+                    next_cursor = window_end
+                
+                # First grid step at or after the gap opens
+                step_index = -(-(cursor - window_start) // step_us)
+                slot_start_us = window_start + step_index * step_us
+                while slot_start_us + duration_us <= gap_end:
+                    slot_start = day_start + timedelta(minutes=step_index * step_minutes)
                     slots.append(
                         TimeSlot(
-                            start=slot_start_aware,
-                            end=slot_end_aware,
+                            start=slot_start,
+                            end=slot_start + duration,
                             timezone=constraints.timezone,
                         )
                     )
-                    slot_start += timedelta(minutes=30)  # 30-minute increments
+                    step_index += 1
+                    slot_start_us += step_us
+                
+                cursor = next_cursor
+        
+        return slots
+    
+    @staticmethod
+    def _generate_bitset_slots(
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+    ) -> List[TimeSlot]:
+        """
+        Bitset slot generation over the required participants' busy cells.
+        
+        Cells are as wide as the largest divisor of GRID_RESOLUTION_MINUTES
+        that also divides the duration and the slot step, so every grid slot
+        starts and ends on a cell boundary. Windows that are not aligned
+        (DST changes, odd UTC offsets) are checked slot by slot, and
+        calendars the bitsets cannot represent exactly use the sweep.
+        
+        Args:
+            participants: List of participants
+            constraints: Scheduling constraints
+            
+        Returns:
+            Available time slots, identical to the "scan" strategy
+        """
+        if not availability_grid.is_available():
+            return AvailabilityAgent._generate_free_slots(participants, constraints)
+        
+        windows = list(AvailabilityAgent._iter_time_windows(constraints, participants))
+        if not windows:
+            return []
+        
+        step_minutes = AvailabilityAgent.SLOT_STEP_MINUTES
+        resolution_minutes = math.gcd(
+            availability_grid.GRID_RESOLUTION_MINUTES, constraints.duration_minutes, step_minutes
+        )
+        grid = AvailabilityGrid(
+            [p for p in participants if p.is_required],
+            min(to_epoch_us(start) for start, _ in windows),
+            max(to_epoch_us(end) for _, end in windows),
+            buffer_us=constraints.buffer_minutes * MICROSECONDS_PER_MINUTE,
+            resolution_minutes=resolution_minutes,
+        )
+        if not grid.exact.all():
+            return AvailabilityAgent._generate_free_slots(participants, constraints)
+        
+        # Cell i is True when the meeting fits in cells [i, i + duration)
+        duration_cells = constraints.duration_minutes // resolution_minutes
+        fits = AvailabilityGrid.free_starts(grid.union(), duration_cells)
+        step_cells = step_minutes // resolution_minutes
+        duration = timedelta(minutes=constraints.duration_minutes)
+        duration_us = constraints.duration_minutes * MICROSECONDS_PER_MINUTE
+        
+        slots = []
+        for day_start, day_end in windows:
+            window_start = to_epoch_us(day_start)
+            window_end = to_epoch_us(day_end)
+            if (
+                day_start.utcoffset() != day_end.utcoffset()
+                or not grid.aligned(window_start, window_end)
+            ):
+                # Check this window slot by slot instead
+                slot_start = day_start
+                while slot_start + duration <= day_end:
+                    slot = TimeSlot(
+                        start=slot_start,
+                        end=slot_start + duration,
+                        timezone=constraints.timezone,
+                    )
+                    if AvailabilityAgent._is_slot_available_for_all(
+                        slot, participants, constraints
+                    ):
+                        slots.append(slot)
+                    slot_start += timedelta(minutes=step_minutes)
+                continue
             
-            current_date += timedelta(days=1)
+            slot_count = (window_end - window_start - duration_us) // (step_minutes * MICROSECONDS_PER_MINUTE) + 1
+            if slot_count <= 0:
+                continue
+            cells = grid.cell(window_start) + step_cells * np.arange(slot_count)
+            for step_index in np.flatnonzero(fits[cells]).tolist():
+                slot_start = day_start + timedelta(minutes=step_index * step_minutes)
+                slots.append(
+                    TimeSlot(
+                        start=slot_start,
+                        end=slot_start + duration,
+                        timezone=constraints.timezone,
+                    )
+                )
         
         return slots
     
@@ -268,24 +649,18 @@ class AvailabilityAgent:
         Returns:
             True if slot is available for all required participants
         """
-        buffer = timedelta(minutes=constraints.buffer_minutes)
+        buffer_us = constraints.buffer_minutes * MICROSECONDS_PER_MINUTE
+        slot_start = to_epoch_us(slot.start)
+        slot_end = to_epoch_us(slot.end)
         
         for participant in participants:
             if not participant.is_required:
                 continue  # Optional participants don't block slots
             
-            # Check against participant's busy slots
-            for busy_slot in participant.calendar_summary.busy_slots:
-                # Add buffer to busy slot
-                busy_start = busy_slot.start - buffer
-                busy_end = busy_slot.end + buffer
-                
-                # Check for overlap
-                if AvailabilityAgent._slots_overlap(
-                    slot.start, slot.end,
-                    busy_start, busy_end
-                ):
-                    return False
+            # Check against participant's merged, buffer-expanded busy slots
+            busy_index = BusyIndex.for_summary(participant.calendar_summary)
+            if busy_index.overlaps(slot_start, slot_end, buffer_us):
+                return False
         
         return True
     
@@ -308,7 +683,56 @@ class AvailabilityAgent:
         Returns:
             True if ranges overlap
         """
-        return start1 < end2 and end1 > start2
+        return interval_set.overlap(start1, end1, start2, end2)
+    
+    @staticmethod
+    def count_available_participants(
+        slots: List[TimeSlot],
+        participants: List[Participant],
+    ) -> List[int]:
+        """
+        Count participants without a hard conflict in each slot.
+        
+        A participant counts as available exactly when
+        get_participant_availability_score is above 50 (buffer proximity
+        alone never costs more than 40 points).
+        
+        Args:
+            slots: Time slots to check
+            participants: Participants to count
+            
+        Returns:
+            Number of available participants per slot, in slot order
+        """
+        if not slots or not participants:
+            return [len(participants)] * len(slots)
+        
+        starts = [to_epoch_us(slot.start) for slot in slots]
+        ends = [to_epoch_us(slot.end) for slot in slots]
+        
+        counts: List[int] = [0] * len(slots)
+        pending = list(range(len(slots)))
+        if availability_grid.is_available():
+            grid = AvailabilityGrid(participants, min(starts), max(ends))
+            if grid.exact.all():
+                pending = [i for i in pending if not grid.aligned(starts[i], ends[i])]
+                on_grid = [i for i in range(len(slots)) if grid.aligned(starts[i], ends[i])]
+                if on_grid:
+                    free = grid.free_counts(
+                        [starts[i] for i in on_grid], [ends[i] for i in on_grid]
+                    ).tolist()
+                    for i, count in zip(on_grid, free):
+                        counts[i] = count
+        
+        # Slots off the grid: one bisect per participant
+        for i in pending:
+            counts[i] = sum(
+                1 for participant in participants
+                if not BusyIndex.for_summary(participant.calendar_summary).overlaps(
+                    starts[i], ends[i]
+                )
+            )
+        return counts
     
     @staticmethod
     def get_participant_availability_score(
@@ -327,30 +751,19 @@ class AvailabilityAgent:
         Returns:
             Score from 0-100 (100 = completely free, 0 = busy)
         """
-        buffer = timedelta(minutes=constraints.buffer_minutes)
+        busy_index = BusyIndex.for_summary(participant.calendar_summary)
+        slot_start = to_epoch_us(slot.start)
+        slot_end = to_epoch_us(slot.end)
         
         # Check for exact conflicts
-        for busy_slot in participant.calendar_summary.busy_slots:
-            if AvailabilityAgent._slots_overlap(
-                slot.start, slot.end,
-                busy_slot.start, busy_slot.end
-            ):
-                return 0.0  # Hard conflict
+        if busy_index.overlaps(slot_start, slot_end):
+            return 0.0  # Hard conflict
         
-        # Check proximity to busy slots (soft penalty)
-        min_gap_before = float('inf')
-        min_gap_after = float('inf')
-        
-        for busy_slot in participant.calendar_summary.busy_slots:
-            # Gap before
-            gap_before = (slot.start - busy_slot.end).total_seconds() / 60
-            if 0 <= gap_before < min_gap_before:
-                min_gap_before = gap_before
-            
-            # Gap after
-            gap_after = (busy_slot.start - slot.end).total_seconds() / 60
-            if 0 <= gap_after < min_gap_after:
-                min_gap_after = gap_after
+        # Check proximity to nearest busy slots (soft penalty)
+        gap_before = busy_index.gap_before(slot_start)
+        gap_after = busy_index.gap_after(slot_end)
+        min_gap_before = to_minutes(gap_before) if gap_before is not None else float('inf')
+        min_gap_after = to_minutes(gap_after) if gap_after is not None else float('inf')
         
         # Score based on buffer availability
         score = 100.0
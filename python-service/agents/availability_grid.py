@@ -0,0 +1,161 @@
+"""Availability Grid: Per-participant busy bitsets over a scheduling window."""
+
+from itertools import chain
+from typing import Sequence
+from schemas.scheduling import Participant
+from agents.busy_index import BusyIndex, MICROSECONDS_PER_MINUTE
+
+# Lazy import so availability keeps working without NumPy
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+
+# Width of one grid cell
+GRID_RESOLUTION_MINUTES = 5
+
+
+def is_available() -> bool:
+    """Check if availability grids can be built (NumPy installed)."""
+    return np is not None
+
+
+class AvailabilityGrid:
+    """
+    Busy time of several participants on a grid of fixed-width cells.
+
+    Every (buffer-expanded) busy run is stored as the half-open range of
+    cells it touches, tagged with its participant's row. For a time range
+    whose start and end fall on cell boundaries this is exact: the range
+    overlaps a busy run if and only if it shares a cell with it. Callers
+    check ``aligned`` and fall back to the BusyIndex for anything else.
+
+    Group availability is a bitset over the cells (``union``: one
+    difference-array pass over the runs, independent of how many runs
+    overlap), and free windows of any length are a prefix-sum scan over it
+    (``free_starts``).
+
+    Attributes:
+        origin: Epoch microseconds of the first cell's start
+        resolution: Cell width in microseconds
+        size: Number of cells
+        participants: Number of participant rows
+        exact: Per participant, False if it has empty busy runs (zero or
+            negative length) near the window, which cells cannot represent
+    """
+
+    __slots__ = ("origin", "resolution", "size", "participants", "exact", "_rows", "_first", "_last")
+
+    def __init__(
+        self,
+        participants: Sequence[Participant],
+        start_us: int,
+        end_us: int,
+        buffer_us: int = 0,
+        resolution_minutes: int = GRID_RESOLUTION_MINUTES,
+    ):
+        """
+        Args:
+            participants: Participants, one row each (in this order)
+            start_us: Start of the window to cover (epoch microseconds)
+            end_us: End of the window to cover (epoch microseconds)
+            buffer_us: Buffer added on both sides of every busy slot
+            resolution_minutes: Cell width in minutes
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for availability grids")
+
+        self.resolution = resolution_minutes * MICROSECONDS_PER_MINUTE
+        self.origin = (start_us // self.resolution) * self.resolution
+        self.size = max(0, -(-(end_us - self.origin) // self.resolution))
+        self.participants = len(participants)
+        self.exact = np.ones(self.participants, bool)
+
+        # Buffer-expanded busy runs of every participant, tagged with their row
+        runs = [
+            BusyIndex.for_summary(participant.calendar_summary).merged(buffer_us)
+            for participant in participants
+        ]
+        counts = np.fromiter((len(starts) for starts, _ in runs), np.int64, len(runs))
+        total = int(counts.sum())
+        starts = np.fromiter(chain.from_iterable(s for s, _ in runs), np.int64, total)
+        ends = np.fromiter(chain.from_iterable(e for _, e in runs), np.int64, total)
+        rows = np.repeat(np.arange(len(runs)), counts)
+
+        window_end = self.origin + self.size * self.resolution
+        near = (starts <= window_end) & (ends >= self.origin)
+        starts, ends, rows = starts[near], ends[near], rows[near]
+        self.exact[rows[ends <= starts]] = False
+
+        # Cells [first, last) touched by each run (empty once clipped = outside)
+        first = np.clip((starts - self.origin) // self.resolution, 0, self.size)
+        last = np.clip(-(-(ends - self.origin) // self.resolution), 0, self.size)
+        keep = first < last
+        self._rows = rows[keep]
+        self._first = first[keep]
+        self._last = last[keep]
+
+    def aligned(self, start_us: int, end_us: int) -> bool:
+        """Check if [start, end) lies inside the grid on cell boundaries."""
+        return (
+            start_us % self.resolution == 0
+            and end_us % self.resolution == 0
+            and self.origin <= start_us <= end_us <= self.origin + self.size * self.resolution
+        )
+
+    def cell(self, value_us: int) -> int:
+        """Get the index of the cell boundary at ``value_us`` (must be aligned)."""
+        return (value_us - self.origin) // self.resolution
+
+    def union(self) -> "np.ndarray":
+        """
+        Get the cells where any participant is busy.
+
+        Returns:
+            Bool array with one entry per cell
+        """
+        delta = (
+            np.bincount(self._first, minlength=self.size + 1)
+            - np.bincount(self._last, minlength=self.size + 1)
+        )
+        return np.cumsum(delta[:-1]) > 0
+
+    def free_counts(self, starts_us: Sequence[int], ends_us: Sequence[int]) -> "np.ndarray":
+        """
+        Count participants with no busy cell inside each aligned range.
+
+        Args:
+            starts_us: Range starts (aligned, see ``aligned``)
+            ends_us: Range ends (aligned)
+
+        Returns:
+            Int array with the number of free participants per range
+        """
+        first = (np.asarray(starts_us, np.int64) - self.origin) // self.resolution
+        last = (np.asarray(ends_us, np.int64) - self.origin) // self.resolution
+        # (ranges x runs): run shares a cell with the range
+        hits = (self._first < last[:, None]) & (self._last > first[:, None])
+        busy = np.zeros((len(first), self.participants), bool)
+        range_index, run_index = np.nonzero(hits)
+        busy[range_index, self._rows[run_index]] = True
+        return self.participants - busy.sum(axis=1)
+
+    @staticmethod
+    def free_starts(busy: "np.ndarray", length: int) -> "np.ndarray":
+        """
+        Find every cell where a run of ``length`` free cells begins.
+
+        Args:
+            busy: Bool array with one entry per cell
+            length: Run length in cells
+
+        Returns:
+            Bool array; entry i is True if cells [i, i + length) are all free
+            (only entries with a full run inside the array are returned)
+        """
+        if length > len(busy):
+            return np.zeros(0, bool)
+        prefix = np.zeros(len(busy) + 1, np.int64)
+        np.cumsum(busy, out=prefix[1:])
+        return prefix[length:] - prefix[:len(prefix) - length] == 0
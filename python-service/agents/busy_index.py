@@ -0,0 +1,353 @@
+"""Busy Index: Sorted interval index over a participant's busy slots."""
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from schemas.scheduling import CompressedCalendarSummary, TimeSlot
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Epoch values are integer microseconds so that gaps computed from the index
+# are bit-for-bit identical to ``timedelta.total_seconds()`` on the datetimes.
+MICROSECONDS_PER_MINUTE = 60 * 1_000_000
+
+# Busy slots further than this from a candidate can only matter through the
+# nearest-gap lookups: same-date matches across UTC offsets (up to 26h apart)
+# plus a 24h day still fall inside it.
+CONTEXT_REACH_US = 3 * 24 * 60 * MICROSECONDS_PER_MINUTE
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime to integer microseconds since the Unix epoch."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _ONE_MICROSECOND
+
+
+def to_minutes(delta_us: int) -> float:
+    """Convert a microsecond delta to minutes, matching ``total_seconds() / 60``."""
+    return delta_us / 1_000_000 / 60
+
+
+def from_epoch_us(value: int, tz: timezone = timezone.utc) -> datetime:
+    """Convert integer epoch microseconds back to an aware datetime."""
+    return (_EPOCH + timedelta(microseconds=value)).astimezone(tz)
+
+
+class CompactBusySlots(Sequence[TimeSlot]):
+    """
+    Busy slots decoded straight into sorted epoch-microsecond lists.
+
+    Produced by services.request_decoder for large requests, so the busy
+    index is built without creating a TimeSlot model per slot. Models are
+    only validated (from the original JSON objects) if something actually
+    reads the slots, e.g. to serialize the summary.
+
+    Attributes:
+        starts: Start times ordered like BusyIndex.starts
+        ends: End times, parallel to starts
+        start_days: Ordinal of each start's calendar date in its own timezone
+        sorted_ends: End times ascending
+        max_duration: Longest slot duration
+    """
+
+    __slots__ = ("starts", "ends", "start_days", "sorted_ends", "max_duration", "_raw", "_models")
+
+    def __init__(
+        self,
+        starts: List[int],
+        ends: List[int],
+        start_days: List[int],
+        sorted_ends: List[int],
+        max_duration: int,
+        raw: List[Any],
+    ):
+        """
+        Args:
+            starts, ends, start_days: Parallel lists sorted by (start, end, day)
+            sorted_ends: End times ascending
+            max_duration: Longest slot duration (0 if empty)
+            raw: The JSON objects the slots were decoded from, in request order
+        """
+        self.starts = starts
+        self.ends = ends
+        self.start_days = start_days
+        self.sorted_ends = sorted_ends
+        self.max_duration = max_duration
+        self._raw = raw
+        self._models: Optional[List[TimeSlot]] = None
+
+    def models(self) -> List[TimeSlot]:
+        """Get the slots as TimeSlot models (validated on first use)."""
+        if self._models is None:
+            self._models = [TimeSlot.model_validate(slot) for slot in self._raw]
+        return self._models
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, item):
+        return self.models()[item]
+
+
+class ProjectedBusySlots(Sequence[TimeSlot]):
+    """
+    Busy slots kept by ``BusyIndex.project`` or ``BusyIndex.edit``, in index
+    (start) order.
+
+    Models are only built if something reads the slots; they are rebuilt
+    from the epoch values, so they carry UTC times (same instants as the
+    original slots).
+    """
+
+    __slots__ = ("_starts", "_ends", "_models")
+
+    def __init__(self, starts: List[int], ends: List[int]):
+        self._starts = starts
+        self._ends = ends
+        self._models: Optional[List[TimeSlot]] = None
+
+    def models(self) -> List[TimeSlot]:
+        """Get the slots as TimeSlot models (built on first use)."""
+        if self._models is None:
+            self._models = [
+                TimeSlot(start=from_epoch_us(start), end=from_epoch_us(end), timezone="UTC")
+                for start, end in zip(self._starts, self._ends)
+            ]
+        return self._models
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, item):
+        return self.models()[item]
+
+
+class BusyIndex:
+    """
+    Immutable, sorted view of one participant's busy slots.
+
+    Raw intervals are kept sorted by start (for "next meeting" lookups) and
+    by end (for "previous meeting" lookups). Buffer-expanded intervals are
+    merged into disjoint runs on first use and cached per buffer size, so an
+    overlap check is a single bisect instead of a scan of every busy slot.
+    """
+
+    __slots__ = (
+        "source",
+        "size",
+        "starts",
+        "ends",
+        "start_days",
+        "sorted_ends",
+        "max_duration",
+        "_merged",
+    )
+
+    def __init__(
+        self,
+        intervals: Sequence[Tuple[int, int, int]],
+        source: Optional[Sequence[TimeSlot]] = None,
+    ):
+        """
+        Args:
+            intervals: (start_us, end_us, start_day) triples, where start_day
+                is the ordinal of the start's calendar date in its own timezone
+            source: Busy slot list the intervals were built from, if any
+        """
+        ordered = sorted(intervals)
+        self.source = source
+        self.size = len(ordered)
+        self.starts: List[int] = [start for start, _, _ in ordered]
+        self.ends: List[int] = [end for _, end, _ in ordered]
+        self.start_days: List[int] = [day for _, _, day in ordered]
+        self.sorted_ends: List[int] = sorted(self.ends)
+        self.max_duration = max(
+            (end - start for start, end, _ in ordered), default=0
+        )
+        self._merged: Dict[int, Tuple[List[int], List[int]]] = {}
+
+    @classmethod
+    def from_slots(cls, busy_slots: Sequence[TimeSlot]) -> "BusyIndex":
+        """Build an index from a list of busy time slots."""
+        if isinstance(busy_slots, CompactBusySlots):
+            # Already sorted and converted by the decoder
+            index = cls.__new__(cls)
+            index.source = busy_slots
+            index.size = len(busy_slots)
+            index.starts = busy_slots.starts
+            index.ends = busy_slots.ends
+            index.start_days = busy_slots.start_days
+            index.sorted_ends = busy_slots.sorted_ends
+            index.max_duration = busy_slots.max_duration
+            index._merged = {}
+            return index
+        return cls(
+            [
+                (to_epoch_us(slot.start), to_epoch_us(slot.end), slot.start.toordinal())
+                for slot in busy_slots
+            ],
+            source=busy_slots,
+        )
+
+    @classmethod
+    def for_summary(cls, summary: CompressedCalendarSummary) -> "BusyIndex":
+        """
+        Return the index for a calendar summary, building it at most once.
+
+        The index is cached on the summary itself and rebuilt automatically
+        if its ``busy_slots`` list is replaced or resized.
+        """
+        busy_slots = summary.busy_slots
+        index = summary._busy_index
+        if index is None or index.source is not busy_slots or index.size != len(busy_slots):
+            index = cls.from_slots(busy_slots)
+            summary._busy_index = index
+        return index
+
+    def merged(self, buffer_us: int = 0) -> Tuple[List[int], List[int]]:
+        """
+        Get disjoint (starts, ends) runs of busy time expanded by a buffer.
+
+        Args:
+            buffer_us: Buffer added on both sides of every busy slot
+
+        Returns:
+            Tuple of parallel, sorted start and end lists
+        """
+        cached = self._merged.get(buffer_us)
+        if cached is not None:
+            return cached
+
+        merged_starts: List[int] = []
+        merged_ends: List[int] = []
+        for start, end in zip(self.starts, self.ends):
+            start -= buffer_us
+            end += buffer_us
+            if merged_ends and start <= merged_ends[-1]:
+                if end > merged_ends[-1]:
+                    merged_ends[-1] = end
+            else:
+                merged_starts.append(start)
+                merged_ends.append(end)
+
+        self._merged[buffer_us] = (merged_starts, merged_ends)
+        return merged_starts, merged_ends
+
+    def overlaps(self, start: int, end: int, buffer_us: int = 0) -> bool:
+        """
+        Check whether [start, end) overlaps any buffer-expanded busy slot.
+
+        Uses the same strict comparison as ``AvailabilityAgent._slots_overlap``.
+        """
+        merged_starts, merged_ends = self.merged(buffer_us)
+        # Last run that starts before the range ends is the only candidate
+        position = bisect_left(merged_starts, end)
+        return position > 0 and merged_ends[position - 1] > start
+
+    def gap_before(self, start: int) -> Optional[int]:
+        """Gap from the latest busy slot ending at or before ``start``."""
+        position = bisect_right(self.sorted_ends, start)
+        if position == 0:
+            return None
+        return start - self.sorted_ends[position - 1]
+
+    def gap_after(self, end: int) -> Optional[int]:
+        """Gap until the earliest busy slot starting at or after ``end``."""
+        position = bisect_left(self.starts, end)
+        if position == self.size:
+            return None
+        return self.starts[position] - end
+
+    def project(self, start: int, end: int) -> "BusyIndex":
+        """
+        Get an index over only the busy slots that matter for a range.
+
+        Keeps every slot that may touch [start, end] (see ``window``) plus
+        the slot with the latest end before the range and the first slot
+        starting after it, so ``gap_before`` / ``gap_after`` lookups from
+        inside the range give the same results as on the full index.
+
+        Args:
+            start: Range start (epoch microseconds)
+            end: Range end (epoch microseconds)
+
+        Returns:
+            Index whose ``source`` is a ProjectedBusySlots view of the kept slots
+        """
+        lo, hi = self.window(start, end)
+        positions = list(range(lo, min(hi + 1, self.size)))
+
+        # Latest-ending slot before the range (may start before ``lo``)
+        before = bisect_left(self.sorted_ends, start)
+        if before > 0:
+            latest_end = self.sorted_ends[before - 1]
+            first = bisect_left(self.starts, latest_end - self.max_duration)
+            for position in range(first, lo):
+                if self.ends[position] == latest_end:
+                    positions.insert(0, position)
+                    break
+
+        index = BusyIndex.__new__(BusyIndex)
+        index.starts = [self.starts[i] for i in positions]
+        index.ends = [self.ends[i] for i in positions]
+        index.start_days = [self.start_days[i] for i in positions]
+        index.sorted_ends = sorted(index.ends)
+        index.max_duration = max(
+            (e - s for s, e in zip(index.starts, index.ends)), default=0
+        )
+        index.size = len(positions)
+        index.source = ProjectedBusySlots(index.starts, index.ends)
+        index._merged = {}
+        return index
+
+    def edit(
+        self,
+        added: Sequence[Tuple[int, int, int]] = (),
+        removed: Sequence[Tuple[int, int]] = (),
+    ) -> "BusyIndex":
+        """
+        Get an index with some busy slots added and others removed.
+
+        Args:
+            added: (start_us, end_us, start_day) triples to add
+            removed: (start_us, end_us) of slots to remove (one slot each)
+
+        Returns:
+            Index whose ``source`` is a ProjectedBusySlots view of its slots
+
+        Raises:
+            ValueError: If a slot to remove is not in the index
+        """
+        pending = Counter(removed)
+        kept = []
+        for triple in zip(self.starts, self.ends, self.start_days):
+            if pending[triple[:2]] > 0:
+                pending[triple[:2]] -= 1
+            else:
+                kept.append(triple)
+        missing = [interval for interval, count in pending.items() if count > 0]
+        if missing:
+            raise ValueError("Busy slots not found: " + ", ".join(
+                f"{from_epoch_us(start).isoformat()} - {from_epoch_us(end).isoformat()}"
+                for start, end in missing
+            ))
+
+        index = BusyIndex(kept + list(added))
+        index.source = ProjectedBusySlots(index.starts, index.ends)
+        return index
+
+    def window(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Get the [lo, hi) positions of busy slots that may touch a range.
+
+        Every slot that overlaps or lies within [start, end] is inside the
+        returned slice (ordered by start); slots that merely start early
+        enough to reach into the range are included via ``max_duration``.
+        """
+        lo = bisect_left(self.starts, start - self.max_duration)
+        hi = bisect_right(self.starts, end)
+        return lo, hi
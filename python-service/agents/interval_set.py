@@ -0,0 +1,262 @@
+"""Interval Set: Sorted, disjoint half-open intervals with set algebra."""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+
+def overlap(start1: Any, end1: Any, start2: Any, end2: Any) -> bool:
+    """
+    Check if two half-open ranges overlap.
+
+    Works on any ordered values (epoch integers, datetimes); this is the
+    strict comparison every overlap check in the agents uses.
+
+    Args:
+        start1: Start of first range
+        end1: End of first range
+        start2: Start of second range
+        end2: End of second range
+
+    Returns:
+        True if ranges overlap
+    """
+    return start1 < end2 and end1 > start2
+
+
+class IntervalSet:
+    """
+    Immutable set of integer points stored as sorted, disjoint runs.
+
+    Runs are half-open [start, end) with start < end and are separated by a
+    gap (touching runs are merged), so every set has exactly one
+    representation and equality is a list comparison. Values are plain
+    integers; the agents use epoch microseconds (see busy_index) so results
+    stay bit-identical to datetime arithmetic, but any unit works.
+
+    Building a set from arbitrary intervals sorts them once (O(n log n));
+    every operation between sets is a single merge pass over both run lists
+    (O(n + m)) and point or window queries are bisections (O(log n)).
+
+    Attributes:
+        starts: Run starts, ascending
+        ends: Run ends, parallel to starts
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        """
+        Args:
+            intervals: (start, end) pairs in any order; they may overlap,
+                and empty or inverted pairs are ignored
+        """
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self._extend(sorted(
+            (start, end) for start, end in intervals if start < end
+        ))
+
+    @classmethod
+    def _from_runs(cls, starts: List[int], ends: List[int]) -> "IntervalSet":
+        """Wrap run lists that are already sorted and disjoint (no checks)."""
+        result = cls.__new__(cls)
+        result.starts = starts
+        result.ends = ends
+        return result
+
+    def _extend(self, intervals: Iterable[Tuple[int, int]]) -> None:
+        """Append start-ordered, non-empty intervals, merging touching runs."""
+        starts, ends = self.starts, self.ends
+        for start, end in intervals:
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+
+    @classmethod
+    def union_all(cls, sets: Iterable["IntervalSet"]) -> "IntervalSet":
+        """
+        Union any number of sets in one k-way merge (O(n log k)).
+
+        Args:
+            sets: Sets to unite
+
+        Returns:
+            Union of every set
+        """
+        result = cls._from_runs([], [])
+        result._extend(heapq.merge(*(zip(s.starts, s.ends) for s in sets)))
+        return result
+
+    def union(self, other: "IntervalSet") -> "IntervalSet":
+        """Get the points in either set."""
+        return IntervalSet.union_all((self, other))
+
+    def intersection(self, other: "IntervalSet") -> "IntervalSet":
+        """Get the points in both sets."""
+        starts: List[int] = []
+        ends: List[int] = []
+        i = j = 0
+        while i < len(self.starts) and j < len(other.starts):
+            start = max(self.starts[i], other.starts[j])
+            end = min(self.ends[i], other.ends[j])
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+            # Advance whichever run ends first
+            if self.ends[i] < other.ends[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet._from_runs(starts, ends)
+
+    def difference(self, other: "IntervalSet") -> "IntervalSet":
+        """Get the points in this set but not in the other."""
+        if not self.starts:
+            return self
+        return self.intersection(other.complement(self.starts[0], self.ends[-1]))
+
+    def complement(self, lo: int, hi: int) -> "IntervalSet":
+        """
+        Get the gaps of the set within [lo, hi).
+
+        Only the runs that touch the range are visited (O(log n + k)).
+
+        Args:
+            lo: Range start
+            hi: Range end
+
+        Returns:
+            Points of [lo, hi) outside the set
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        cursor = lo
+        position = bisect_right(self.ends, lo)
+        while cursor < hi and position < len(self.starts) and self.starts[position] < hi:
+            if self.starts[position] > cursor:
+                starts.append(cursor)
+                ends.append(self.starts[position])
+            cursor = max(cursor, self.ends[position])
+            position += 1
+        if cursor < hi:
+            starts.append(cursor)
+            ends.append(hi)
+        return IntervalSet._from_runs(starts, ends)
+
+    def clip(self, lo: int, hi: int) -> "IntervalSet":
+        """
+        Get the part of the set within [lo, hi) (O(log n + k)).
+
+        Args:
+            lo: Range start
+            hi: Range end
+
+        Returns:
+            Intersection of the set with [lo, hi)
+        """
+        if lo >= hi:
+            return IntervalSet._from_runs([], [])
+        first, last = self._touching(lo, hi)
+        starts = self.starts[first:last]
+        ends = self.ends[first:last]
+        if starts:
+            starts[0] = max(starts[0], lo)
+            ends[-1] = min(ends[-1], hi)
+        return IntervalSet._from_runs(starts, ends)
+
+    def expand(self, before: int, after: Optional[int] = None) -> "IntervalSet":
+        """
+        Widen every run, merging runs that come to touch (O(n)).
+
+        Negative amounts shrink runs instead; runs that vanish are dropped.
+
+        Args:
+            before: Amount added before each run's start
+            after: Amount added after each run's end (defaults to before)
+
+        Returns:
+            Expanded set
+        """
+        if after is None:
+            after = before
+        result = IntervalSet._from_runs([], [])
+        result._extend(
+            (start - before, end + after)
+            for start, end in zip(self.starts, self.ends)
+            if start - before < end + after
+        )
+        return result
+
+    def _touching(self, start: int, end: int) -> Tuple[int, int]:
+        """Get the [first, last) positions of runs overlapping [start, end)."""
+        return bisect_right(self.ends, start), bisect_left(self.starts, end)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Check if [start, end) shares a point with the set."""
+        first, last = self._touching(start, end)
+        return start < end and first < last
+
+    def contains(self, start: int, end: int) -> bool:
+        """Check if every point of [start, end) is in the set."""
+        if start >= end:
+            return True
+        position = bisect_right(self.starts, start) - 1
+        return position >= 0 and self.ends[position] >= end
+
+    def count_within(self, start: int, end: int) -> int:
+        """Count the runs overlapping [start, end)."""
+        if start >= end:
+            return 0
+        first, last = self._touching(start, end)
+        return max(0, last - first)
+
+    def gap_before(self, point: int) -> Optional[int]:
+        """
+        Distance from the end of the nearest run ending at or before a point.
+
+        Returns:
+            point - end, or None if no run ends by the point
+        """
+        position = bisect_right(self.ends, point)
+        if position == 0:
+            return None
+        return point - self.ends[position - 1]
+
+    def gap_after(self, point: int) -> Optional[int]:
+        """
+        Distance to the start of the nearest run starting at or after a point.
+
+        Returns:
+            start - point, or None if no run starts from the point on
+        """
+        position = bisect_left(self.starts, point)
+        if position == len(self.starts):
+            return None
+        return self.starts[position] - point
+
+    def measure(self) -> int:
+        """Get the total length of the runs."""
+        return sum(self.ends) - sum(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.starts == other.starts and self.ends == other.ends
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self)!r})"
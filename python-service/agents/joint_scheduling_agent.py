@@ -0,0 +1,310 @@
+"""Joint Scheduling Agent: Assigns many meetings to mutually compatible slots."""
+
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from schemas.scheduling import (
+    MeetingSlotCandidate,
+    ScheduleRequest,
+)
+from agents.busy_index import MICROSECONDS_PER_MINUTE, to_epoch_us
+
+
+# Value of placing a meeting at all; dominates any score difference (0-100)
+# so the solver first maximises the number of scheduled meetings
+ASSIGNMENT_VALUE = 1000.0
+
+# Candidates considered per meeting by the joint solver
+CANDIDATE_POOL_SIZE = 25
+
+# Default wall-clock budget for the solver
+DEFAULT_TIME_BUDGET_MS = 2000
+
+
+class JointSchedulingAgent:
+    """
+    Stateless agent that schedules a set of meetings jointly.
+
+    Responsibilities:
+    - Pick one candidate slot per meeting so that no required participant
+      is double-booked (including the larger of the two meetings' buffers)
+    - Maximise the number of scheduled meetings, then their total score
+    - Refine the assignment progressively within a wall-clock budget
+
+    Candidates come from OptimizationAgent (via the normal per-meeting
+    pipeline); the agent only decides which candidate each meeting gets.
+    """
+
+    @staticmethod
+    def solve(
+        requests: Sequence[ScheduleRequest],
+        candidate_lists: Sequence[List[MeetingSlotCandidate]],
+        time_budget_ms: int = DEFAULT_TIME_BUDGET_MS,
+        on_improvement: Optional[Callable[[Dict[str, Any]], None]] = None,
+        optional_conflicts: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Assign meetings to non-conflicting candidate slots.
+
+        Only participants required in both meetings make two slots
+        conflict; an optional attendee may be booked into overlapping
+        meetings (and miss one) unless ``optional_conflicts`` is set.
+
+        Solver:
+        1. Greedy construction, most constrained meetings first (fewest
+           candidates, then most participants), each taking its best
+           candidate that conflicts with nothing already placed
+        2. Local search until no move improves or the budget runs out:
+           move a meeting to a better free candidate, or place it by
+           ejecting up to two conflicting meetings and re-placing them on
+           their best remaining candidates (ejection chain)
+
+        Args:
+            requests: Meetings (participants and constraints)
+            candidate_lists: Ranked candidates per meeting, best first
+            time_budget_ms: Wall-clock budget for the whole solve
+            on_improvement: Called with a solution snapshot after the greedy
+                phase and after every improving local-search pass
+            optional_conflicts: Also treat optional attendees as unable to
+                attend overlapping meetings
+
+        Returns:
+            Dictionary with:
+            - assignments: Candidate index per meeting (None = unscheduled)
+            - total_score: Sum of scores of scheduled meetings
+            - scheduled / unscheduled: Meeting counts
+            - iterations, improvements, elapsed_ms, budget_exhausted
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget_ms / 1000.0
+        meeting_count = len(requests)
+
+        # 1. Flatten candidates to integer intervals (deduplicated per meeting)
+        candidates: List[List[Tuple[int, int, float]]] = []
+        candidate_positions: List[List[int]] = []
+        for candidate_list in candidate_lists:
+            seen: Set[int] = set()
+            intervals = []
+            positions = []
+            for position, candidate in enumerate(candidate_list):
+                start = to_epoch_us(candidate.slot.start)
+                if start in seen:
+                    continue
+                seen.add(start)
+                intervals.append((start, to_epoch_us(candidate.slot.end), candidate.score))
+                positions.append(position)
+            # Best first; stable so equal scores keep ranking order
+            order = sorted(range(len(intervals)), key=lambda k: -intervals[k][2])
+            candidates.append([intervals[k] for k in order])
+            candidate_positions.append([positions[k] for k in order])
+
+        # 2. Global candidate ids and pairwise conflicts as integer bitmasks
+        offsets = []
+        owners: List[int] = []
+        for meeting, intervals in enumerate(candidates):
+            offsets.append(len(owners))
+            owners.extend([meeting] * len(intervals))
+        conflict_masks = JointSchedulingAgent._build_conflict_masks(
+            requests, candidates, offsets, optional_conflicts
+        )
+
+        assignment: List[Optional[int]] = [None] * meeting_count
+        placed_mask = 0
+
+        def blockers(meeting: int, choice: int) -> Set[int]:
+            """Placed meetings that conflict with ``meeting`` at ``choice``."""
+            bits = conflict_masks[offsets[meeting] + choice] & placed_mask
+            found: Set[int] = set()
+            while bits:
+                lowest = bits & -bits
+                found.add(owners[lowest.bit_length() - 1])
+                bits ^= lowest
+            return found
+
+        def place(meeting: int, choice: int) -> None:
+            nonlocal placed_mask
+            placed_mask |= 1 << (offsets[meeting] + choice)
+            assignment[meeting] = choice
+
+        def unplace(meeting: int) -> None:
+            nonlocal placed_mask
+            placed_mask &= ~(1 << (offsets[meeting] + assignment[meeting]))
+            assignment[meeting] = None
+
+        def value(meeting: int) -> float:
+            choice = assignment[meeting]
+            if choice is None:
+                return 0.0
+            return ASSIGNMENT_VALUE + candidates[meeting][choice][2]
+
+        def best_free(meeting: int) -> Optional[int]:
+            first = offsets[meeting]
+            for choice in range(len(candidates[meeting])):
+                if not conflict_masks[first + choice] & placed_mask:
+                    return choice
+            return None
+
+        def snapshot() -> Dict[str, Any]:
+            scheduled = [m for m in range(meeting_count) if assignment[m] is not None]
+            return {
+                "assignments": [
+                    candidate_positions[m][assignment[m]] if assignment[m] is not None else None
+                    for m in range(meeting_count)
+                ],
+                "total_score": round(sum(candidates[m][assignment[m]][2] for m in scheduled), 2),
+                "scheduled": len(scheduled),
+                "unscheduled": meeting_count - len(scheduled),
+            }
+
+        # 3. Greedy construction, most constrained first
+        order = sorted(
+            range(meeting_count),
+            key=lambda m: (len(candidates[m]), -len(requests[m].participants)),
+        )
+        for meeting in order:
+            choice = best_free(meeting)
+            if choice is not None:
+                place(meeting, choice)
+
+        if on_improvement is not None:
+            on_improvement(snapshot())
+
+        # 4. Local search with ejection chains
+        iterations = 0
+        improvements = 0
+        budget_exhausted = False
+        improved = True
+        while improved and not budget_exhausted:
+            improved = False
+            for meeting in order:
+                if time.perf_counter() >= deadline:
+                    budget_exhausted = True
+                    break
+                iterations += 1
+
+                current = assignment[meeting]
+                limit = current if current is not None else len(candidates[meeting])
+                for choice in range(limit):
+                    conflicts = blockers(meeting, choice)
+                    if len(conflicts) > 2:
+                        continue
+
+                    before = value(meeting) + sum(value(other) for other in conflicts)
+                    previous = {other: assignment[other] for other in conflicts}
+                    previous[meeting] = current
+
+                    for other in conflicts:
+                        unplace(other)
+                    if current is not None:
+                        unplace(meeting)
+                    place(meeting, choice)
+                    for other in sorted(conflicts, key=lambda m: len(candidates[m])):
+                        replacement = best_free(other)
+                        if replacement is not None:
+                            place(other, replacement)
+
+                    after = value(meeting) + sum(value(other) for other in conflicts)
+                    if after > before + 1e-9:
+                        improvements += 1
+                        improved = True
+                        break
+
+                    # Revert the move
+                    for other in list(previous):
+                        if assignment[other] is not None:
+                            unplace(other)
+                    for other, old_choice in previous.items():
+                        if old_choice is not None:
+                            place(other, old_choice)
+
+            if improved and on_improvement is not None:
+                on_improvement(snapshot())
+
+        result = snapshot()
+        result.update({
+            "iterations": iterations,
+            "improvements": improvements,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "budget_exhausted": budget_exhausted,
+        })
+        return result
+
+    @staticmethod
+    def _build_conflict_masks(
+        requests: Sequence[ScheduleRequest],
+        candidates: List[List[Tuple[int, int, float]]],
+        offsets: List[int],
+        optional_conflicts: bool = False,
+    ) -> List[int]:
+        """
+        Build, per global candidate id, the bitmask of conflicting candidates.
+
+        Two candidates conflict when their meetings share a required
+        participant and the slots are closer than the larger of the two
+        meetings' buffers.
+        For each pair of meetings the conflicting candidates of the other
+        meeting are a start-sorted prefix intersected with an end-sorted
+        suffix, so each mask is two bisects and an AND of precomputed masks.
+
+        Args:
+            requests: Meetings (participants and buffers)
+            candidates: (start_us, end_us, score) per candidate, per meeting
+            offsets: Global id of each meeting's first candidate
+            optional_conflicts: Count optional attendees as shared participants
+
+        Returns:
+            List of integer bitmasks indexed by global candidate id
+        """
+        meeting_count = len(requests)
+        buffers = [
+            request.constraints.buffer_minutes * MICROSECONDS_PER_MINUTE for request in requests
+        ]
+
+        # Per meeting: starts ascending with prefix masks, ends ascending with suffix masks
+        start_keys, start_prefix, end_keys, end_suffix = [], [], [], []
+        for meeting, intervals in enumerate(candidates):
+            ids = range(offsets[meeting], offsets[meeting] + len(intervals))
+            by_start = sorted(zip(ids, intervals), key=lambda item: item[1][0])
+            by_end = sorted(zip(ids, intervals), key=lambda item: item[1][1])
+
+            prefix = [0]
+            for global_id, _ in by_start:
+                prefix.append(prefix[-1] | (1 << global_id))
+            suffix = [0]
+            for global_id, _ in reversed(by_end):
+                suffix.append(suffix[-1] | (1 << global_id))
+            suffix.reverse()
+
+            start_keys.append([interval[0] for _, interval in by_start])
+            start_prefix.append(prefix)
+            end_keys.append([interval[1] for _, interval in by_end])
+            end_suffix.append(suffix)
+
+        # Meetings sharing at least one (required) participant
+        attendance: Dict[str, List[int]] = {}
+        for meeting, request in enumerate(requests):
+            attendees = {
+                p.user_id for p in request.participants
+                if p.is_required or optional_conflicts
+            }
+            for user_id in attendees:
+                attendance.setdefault(user_id, []).append(meeting)
+        neighbours: List[Set[int]] = [set() for _ in range(meeting_count)]
+        for meetings in attendance.values():
+            for meeting in meetings:
+                neighbours[meeting].update(meetings)
+
+        masks = [0] * (offsets[-1] + len(candidates[-1]) if candidates else 0)
+        for meeting, intervals in enumerate(candidates):
+            others = sorted(neighbours[meeting] - {meeting})
+            for choice, (start, end, _) in enumerate(intervals):
+                mask = 0
+                for other in others:
+                    gap = max(buffers[meeting], buffers[other])
+                    # Other slot starts before this one ends (+gap) ...
+                    starts_before = bisect_left(start_keys[other], end + gap)
+                    # ... and ends after this one starts (-gap)
+                    ends_after = bisect_right(end_keys[other], start - gap)
+                    mask |= start_prefix[other][starts_before] & end_suffix[other][ends_after]
+                masks[offsets[meeting] + choice] = mask
+        return masks
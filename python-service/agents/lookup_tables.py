@@ -0,0 +1,115 @@
+"""Lookup Tables: Memoized time-of-week scoring rules."""
+
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+MINUTES_PER_DAY = 24 * 60
+
+# Cells of a weekly table (one per weekday and minute of day)
+CELLS_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Shared tables kept at once (rule tables per category are few; pattern
+# tables are keyed by pattern field values)
+MAX_TABLES = 512
+
+
+class LookupTable:
+    """
+    Memoized values of a pure scoring rule over slot start times.
+
+    Rules in this service depend only on the wall-clock weekday, hour and
+    minute of a slot's start (never seconds or the date), so each table
+    has one cell per minute of the week, or of the day when the rule
+    ignores the weekday. Cells are computed by the rule itself on first
+    use, so a table costs nothing up front and always returns exactly what
+    the rule would.
+
+    Minute (not half-hour) cells are needed because several rules vary
+    within the hour (e.g. round-hour bonuses and sub-hour gradients).
+    """
+
+    __slots__ = ("rule", "key", "weekly", "_values")
+
+    def __init__(
+        self,
+        rule: Callable[[Hashable, int, int, int], float],
+        key: Hashable,
+        weekly: bool = True,
+    ):
+        """
+        Args:
+            rule: Pure function of (key, weekday, hour, minute)
+            key: Every other input of the rule (event category, pattern
+                field values, ...)
+            weekly: False if the rule ignores the weekday (one day of cells)
+        """
+        self.rule = rule
+        self.key = key
+        self.weekly = weekly
+        self._values: List[Optional[float]] = [None] * (
+            CELLS_PER_WEEK if weekly else MINUTES_PER_DAY
+        )
+
+    def at(self, value: datetime) -> float:
+        """Get the rule's value for a slot starting at ``value``."""
+        hour = value.hour
+        minute = value.minute
+        if self.weekly:
+            weekday = value.weekday()
+            cell = weekday * MINUTES_PER_DAY + hour * 60 + minute
+        else:
+            weekday = 0
+            cell = hour * 60 + minute
+        result = self._values[cell]
+        if result is None:
+            # Concurrent fills of the same cell store the same value
+            result = self._values[cell] = self.rule(self.key, weekday, hour, minute)
+        return result
+
+
+_tables: Dict[Tuple[Callable, Hashable], LookupTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(
+    rule: Callable[[Hashable, int, int, int], float],
+    key: Hashable,
+    weekly: bool = True,
+) -> LookupTable:
+    """
+    Get the shared table of a rule, creating it on first use.
+
+    Tables are keyed by the rule function itself and its key, so changed
+    inputs (another category, edited pattern fields) select another table
+    and a rule replaced at runtime never sees values of the old one.
+
+    Args:
+        rule: Pure function of (key, weekday, hour, minute)
+        key: Every input of the rule other than the slot time; tables are
+            shared by all callers with equal keys, so it must capture
+            everything the rule reads
+        weekly: False if the rule ignores the weekday
+
+    Returns:
+        The table for (rule, key)
+    """
+    table_key = (rule, key)
+    table = _tables.get(table_key)
+    if table is not None:
+        return table
+    with _tables_lock:
+        table = _tables.get(table_key)
+        if table is None:
+            # Oldest tables go first; a dropped table is simply rebuilt
+            while len(_tables) >= MAX_TABLES:
+                del _tables[next(iter(_tables))]
+            table = _tables[table_key] = LookupTable(rule, key, weekly)
+        return table
+
+
+def clear_tables() -> None:
+    """Drop every shared table (frees memory; never needed for correctness)."""
+    with _tables_lock:
+        _tables.clear()
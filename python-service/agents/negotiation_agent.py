@@ -1,6 +1,7 @@
 """Negotiation Agent: Resolves conflicts for multi-party meetings."""
 
-from typing import List, Dict, Tuple, Optional, Any
+import logging
+from typing import Callable, List, Dict, Tuple, Optional, Any
 from datetime import datetime, timedelta
 from schemas.scheduling import (
     Participant,
@@ -8,8 +9,9 @@ from schemas.scheduling import (
     MeetingSlotCandidate,
     SchedulingConstraints,
 )
-from agents.optimization_agent import OptimizationAgent
 from agents.availability_agent import AvailabilityAgent
+from agents.relaxation_engine import RelaxationEngine
+from services import metrics_service, tracing_service
 
 
 class NegotiationAgent:
@@ -28,6 +30,7 @@ class NegotiationAgent:
         candidates: List[MeetingSlotCandidate],
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        on_compromise: Optional[Callable[[str, List[MeetingSlotCandidate]], None]] = None,
     ) -> Tuple[List[MeetingSlotCandidate], int]:
         """
         Negotiate to find best possible meeting times, handling conflicts.
@@ -36,6 +39,8 @@ class NegotiationAgent:
             candidates: Initial list of candidates (may have conflicts)
             participants: List of participants
             constraints: Scheduling constraints
+            on_compromise: Called with (strategy, candidates) as each
+                compromise pass finishes, before the final ranking
             
         Returns:
             Tuple of (negotiated_candidates, negotiation_rounds)
@@ -60,19 +65,39 @@ class NegotiationAgent:
                 final_candidates = NegotiationAgent._rescore_with_optional(
                     required_candidates, optional, constraints
                 )
+                NegotiationAgent._trace_strategy("required_first", negotiation_rounds, final_candidates)
                 return final_candidates, negotiation_rounds
         
         # Strategy 2: If no slots work for all required, suggest compromises
         if not candidates or all(not c.all_participants_available for c in candidates):
             negotiation_rounds += 1
             compromise_candidates = NegotiationAgent._suggest_compromises(
-                participants, constraints
-            )
-            return compromise_candidates[:constraints.max_candidates], negotiation_rounds
+                participants, constraints, on_compromise
+            )[:constraints.max_candidates]
+            NegotiationAgent._trace_strategy("compromise", negotiation_rounds, compromise_candidates)
+            return compromise_candidates, negotiation_rounds
         
         # Strategy 3: If we have good candidates, just return them
+        NegotiationAgent._trace_strategy("as_ranked", negotiation_rounds, candidates)
         return candidates, negotiation_rounds
     
+    @staticmethod
+    def _trace_strategy(
+        strategy: str,
+        negotiation_rounds: int,
+        candidates: List[MeetingSlotCandidate],
+    ) -> None:
+        """Record which negotiation strategy produced the final candidates."""
+        trace = tracing_service.active(logging.INFO)
+        if trace is not None:
+            trace.event(
+                "negotiation",
+                logging.INFO,
+                strategy=strategy,
+                rounds=negotiation_rounds,
+                candidates=len(candidates),
+            )
+    
     @staticmethod
     def _filter_for_required_participants(
         candidates: List[MeetingSlotCandidate],
@@ -126,15 +151,13 @@ class NegotiationAgent:
         
         rescored = []
         
-        for candidate in candidates:
-            # Count how many optional participants are available
-            available_optional = 0
-            for participant in optional_participants:
-                avail_score = AvailabilityAgent.get_participant_availability_score(
-                    candidate.slot, participant, constraints
-                )
-                if avail_score > 50:  # Reasonably available
-                    available_optional += 1
+        # Count how many optional participants are reasonably available
+        # (availability score above 50, i.e. no hard conflict) per candidate
+        available_counts = AvailabilityAgent.count_available_participants(
+            [candidate.slot for candidate in candidates], optional_participants
+        )
+        
+        for candidate, available_optional in zip(candidates, available_counts):
             
             # Boost score based on optional participant availability
             optional_ratio = (
@@ -174,6 +197,7 @@ class NegotiationAgent:
     def _suggest_compromises(
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        on_pass: Optional[Callable[[str, List[MeetingSlotCandidate]], None]] = None,
     ) -> List[MeetingSlotCandidate]:
         """
         Suggest compromise solutions when no perfect slot exists.
@@ -181,89 +205,18 @@ class NegotiationAgent:
         Args:
             participants: All participants
             constraints: Scheduling constraints
+            on_pass: Called with (strategy, candidates) after each relaxation
+                pass that found slots ("extended_hours", "reduced_buffer",
+                "shorter_meeting")
             
         Returns:
             List of compromise candidates
         """
-        # Strategy: Relax constraints progressively
+        # Strategy: Relax constraints progressively (hours, buffer, duration)
         compromises = []
-        
-        # 1. Try expanding working hours slightly
-        relaxed_constraints_1 = SchedulingConstraints(
-            duration_minutes=constraints.duration_minutes,
-            earliest_date=constraints.earliest_date,
-            latest_date=constraints.latest_date,
-            working_hours_start=max(7, constraints.working_hours_start - 1),
-            working_hours_end=min(19, constraints.working_hours_end + 1),
-            allowed_days=constraints.allowed_days,
-            buffer_minutes=max(0, constraints.buffer_minutes - 5),
-            timezone=constraints.timezone,
-            max_candidates=constraints.max_candidates,
-        )
-        
-        slots_1 = AvailabilityAgent.find_available_slots(
-            participants, relaxed_constraints_1
-        )
-        
-        if slots_1:
-            candidates_1 = OptimizationAgent.rank_candidates(
-                slots_1, participants, relaxed_constraints_1
-            )
-            for candidate in candidates_1[:3]:
-                # Mark as compromise
-                candidate.reasoning = f"Compromise: Extended hours. {candidate.reasoning}"
-                compromises.append(candidate)
-        
-        # 2. Try reducing buffer time
-        relaxed_constraints_2 = SchedulingConstraints(
-            duration_minutes=constraints.duration_minutes,
-            earliest_date=constraints.earliest_date,
-            latest_date=constraints.latest_date,
-            working_hours_start=constraints.working_hours_start,
-            working_hours_end=constraints.working_hours_end,
-            allowed_days=constraints.allowed_days,
-            buffer_minutes=max(0, constraints.buffer_minutes - 10),
-            timezone=constraints.timezone,
-            max_candidates=constraints.max_candidates,
-        )
-        
-        slots_2 = AvailabilityAgent.find_available_slots(
-            participants, relaxed_constraints_2
-        )
-        
-        if slots_2:
-            candidates_2 = OptimizationAgent.rank_candidates(
-                slots_2, participants, relaxed_constraints_2
-            )
-            for candidate in candidates_2[:3]:
-                candidate.reasoning = f"Compromise: Reduced buffer. {candidate.reasoning}"
-                compromises.append(candidate)
-        
-        # 3. Try shorter duration
-        if constraints.duration_minutes > 30:
-            relaxed_constraints_3 = SchedulingConstraints(
-                duration_minutes=max(15, constraints.duration_minutes - 15),
-                earliest_date=constraints.earliest_date,
-                latest_date=constraints.latest_date,
-                working_hours_start=constraints.working_hours_start,
-                working_hours_end=constraints.working_hours_end,
-                allowed_days=constraints.allowed_days,
-                buffer_minutes=constraints.buffer_minutes,
-                timezone=constraints.timezone,
-                max_candidates=constraints.max_candidates,
-            )
-            
-            slots_3 = AvailabilityAgent.find_available_slots(
-                participants, relaxed_constraints_3
-            )
-            
-            if slots_3:
-                candidates_3 = OptimizationAgent.rank_candidates(
-                    slots_3, participants, relaxed_constraints_3
-                )
-                for candidate in candidates_3[:3]:
-                    candidate.reasoning = f"Compromise: Shorter meeting ({relaxed_constraints_3.duration_minutes}min). {candidate.reasoning}"
-                    compromises.append(candidate)
+        with metrics_service.stage("compromises"):
+            for _, candidates in RelaxationEngine(participants, constraints).run(on_pass):
+                compromises.extend(candidates)
         
         # Remove duplicates and sort by score
         unique_compromises = NegotiationAgent._deduplicate_candidates(compromises)
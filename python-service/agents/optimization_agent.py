@@ -1,15 +1,24 @@
 """Optimization Agent: Ranks candidate slots using constraints and scoring."""
 
-from typing import List, Dict, Tuple, Any
+import heapq
+import logging
+from typing import List, Dict, Tuple, Any, Callable, Optional
 from datetime import datetime, timezone
 from schemas.scheduling import (
     Participant,
     TimeSlot,
     MeetingSlotCandidate,
     SchedulingConstraints,
+    EventCategory,
 )
-from agents.availability_agent import AvailabilityAgent
 from agents.preference_agent import PreferenceAgent
+from agents.preference_surface import PreferenceSurface
+from agents import lookup_tables
+from agents import scoring_kernel
+from agents import timezone_engine
+from agents.busy_index import to_epoch_us
+from agents.slot_context import SlotContext
+from services import metrics_service, tracing_service
 
 
 class OptimizationAgent:
@@ -28,31 +37,299 @@ class OptimizationAgent:
         available_slots: List[TimeSlot],
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        engine: str = "auto",
+        slot_facts: Optional[Dict[str, Any]] = None,
+        slot_memo: Optional[Dict[Tuple[int, int], Tuple[float, float, float]]] = None,
+        ranking: Optional[Dict[str, Any]] = None,
     ) -> List[MeetingSlotCandidate]:
         """
         Rank available time slots and return top candidates.
         
+        Ranking runs in three phases:
+        1. Numeric scoring of every slot (no candidate objects)
+        2. Top-K selection of (score, slot index) pairs with heapq.nlargest
+        3. Materialisation of MeetingSlotCandidate objects, breakdowns and
+           reasoning for the winners only
+        Phases are timed as metrics stages: "busy_factors", "preference" and
+        "slot_factors" (vector engine) and "materialize".
+        
+        Engines:
+        - "vector": Batch-compute busy-slot factors with the NumPy kernel
+        - "scalar": Evaluate each slot independently (reference implementation)
+        - "auto": "vector" when NumPy is installed, otherwise "scalar"
+        
         Args:
             available_slots: List of available time slots
             participants: List of participants
             constraints: Scheduling constraints
+            engine: Scoring engine ("auto", "vector" or "scalar")
+            slot_facts: Precomputed scoring_kernel slot facts for exactly
+                these slots (vector engine only)
+            slot_memo: Shared cache of constraint-free per-slot scores keyed
+                by (start_us, end_us); only valid for one participant list
+                and event category (vector engine only)
+            ranking: Filled with the "scores" of every slot and the
+                "top_indices" of the returned candidates, if given
             
         Returns:
             Sorted list of meeting slot candidates with scores
         """
-        candidates = []
+        if engine == "auto":
+            engine = "vector" if scoring_kernel.is_available() else "scalar"
+        scores, materialize = OptimizationAgent.score_slots(
+            available_slots, participants, constraints, engine, slot_facts, slot_memo
+        )
+        
+        with metrics_service.stage("materialize"):
+            top_indices = OptimizationAgent.top_indices(scores, constraints.max_candidates)
+            
+            trace = tracing_service.active(logging.INFO)
+            if trace is not None:
+                OptimizationAgent._trace_ranking(trace, engine, available_slots, scores, top_indices)
+            
+            if ranking is not None:
+                ranking["scores"] = scores
+                ranking["top_indices"] = top_indices
+            return [materialize(i) for i in top_indices]
+    
+    @staticmethod
+    def score_slots(
+        slots: List[TimeSlot],
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+        engine: str = "auto",
+        slot_facts: Optional[Dict[str, Any]] = None,
+        slot_memo: Optional[Dict[Tuple[int, int], Tuple[float, float, float]]] = None,
+    ) -> Tuple[List[float], Callable[[int], MeetingSlotCandidate]]:
+        """
+        Score slots without selecting or materialising candidates.
         
-        for slot in available_slots:
-            candidate = OptimizationAgent._evaluate_slot(
-                slot, participants, constraints
+        A slot's score does not depend on the other slots of the batch, so
+        any subset of a ranking can be re-scored on its own (see
+        services.rerank_service).
+        
+        Args:
+            slots: Time slots to evaluate
+            participants: List of participants
+            constraints: Scheduling constraints
+            engine: Scoring engine ("auto", "vector" or "scalar")
+            slot_facts: Precomputed slot facts (vector engine only)
+            slot_memo: Shared cache of constraint-free per-slot scores
+                (vector engine only)
+            
+        Returns:
+            Tuple of (overall scores in slot order, materialiser by slot index)
+        """
+        if engine == "auto":
+            engine = "vector" if scoring_kernel.is_available() else "scalar"
+        if engine == "vector":
+            return OptimizationAgent._score_slots_vectorized(
+                slots, participants, constraints, slot_facts, slot_memo
             )
-            candidates.append(candidate)
+        if engine == "scalar":
+            return OptimizationAgent._score_slots_scalar(slots, participants, constraints)
+        raise ValueError(f"Unknown scoring engine: {engine}")
+    
+    @staticmethod
+    def top_indices(scores: List[float], count: int) -> List[int]:
+        """
+        Get the indices of the best scores, best first.
         
-        # Sort by overall score (descending)
-        candidates.sort(key=lambda x: x.score, reverse=True)
+        Scores are compared as displayed (rounded); nlargest is stable, so
+        ties stay in slot order exactly like a full descending sort.
         
-        # Return top N candidates
-        return candidates[:constraints.max_candidates]
+        Args:
+            scores: Overall score per slot
+            count: Number of indices to return
+            
+        Returns:
+            Up to ``count`` slot indices
+        """
+        return heapq.nlargest(count, range(len(scores)), key=lambda i: round(scores[i], 2))
+    
+    @staticmethod
+    def _trace_ranking(
+        trace: "tracing_service.RequestTrace",
+        engine: str,
+        slots: List[TimeSlot],
+        scores: List[float],
+        top_indices: List[int],
+    ) -> None:
+        """Record the ranking decision (and every slot score at debug level)."""
+        if trace.enabled_for(logging.DEBUG):
+            for i, slot in enumerate(slots):
+                trace.event("slot_scored", slot=slot.start.isoformat(), score=round(scores[i], 2))
+        trace.event(
+            "ranking",
+            logging.INFO,
+            engine=engine,
+            slots_scored=len(slots),
+            selected=[
+                {"slot": slots[i].start.isoformat(), "score": round(scores[i], 2)}
+                for i in top_indices
+            ],
+        )
+    
+    @staticmethod
+    def _score_slots_scalar(
+        slots: List[TimeSlot],
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+    ) -> Tuple[List[float], Callable[[int], MeetingSlotCandidate]]:
+        """
+        Score slots one at a time with the scalar factor helpers.
+        
+        Returns:
+            Tuple of (overall scores in slot order, materialiser by slot index)
+        """
+        components = [
+            OptimizationAgent._score_slot(slot, participants, constraints)
+            for slot in slots
+        ]
+        
+        def materialize(i: int) -> MeetingSlotCandidate:
+            return OptimizationAgent._build_candidate(slots[i], components[i])
+        
+        return [c["score"] for c in components], materialize
+    
+    @staticmethod
+    def _score_slots_vectorized(
+        slots: List[TimeSlot],
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+        slot_facts: Optional[Dict[str, Any]] = None,
+        slot_memo: Optional[Dict[Tuple[int, int], Tuple[float, float, float]]] = None,
+    ) -> Tuple[List[float], Callable[[int], MeetingSlotCandidate]]:
+        """
+        Score a batch of slots using the vectorized scoring kernel.
+        
+        Busy-slot factors (availability, conflict proximity, fragmentation,
+        density and same-day gap bonus) come from array operations over the
+        whole batch, group preference scores from a compiled
+        PreferenceSurface; the remaining per-slot factors reuse the scalar
+        helpers.
+        Detail dictionaries are only assembled when a slot is materialised.
+        
+        Args:
+            slots: Time slots to evaluate
+            participants: List of participants
+            constraints: Scheduling constraints
+            slot_facts: Precomputed slot facts (computed here if None)
+            slot_memo: Cache of (preference, optimization, differentiation)
+                per slot, filled on the way
+            
+        Returns:
+            Tuple of (overall scores in slot order, materialiser by slot index)
+        """
+        if not slots:
+            return [], None
+        
+        with metrics_service.stage("busy_factors"):
+            if slot_facts is None:
+                slot_facts = scoring_kernel.compute_slot_facts(slots, participants)
+            factors = scoring_kernel.apply_constraints(slot_facts, constraints)
+        required_ids = [p.user_id for p in participants if p.is_required]
+        event_category = getattr(constraints, 'event_category', None)
+        
+        availability_factor = factors["availability_factor"].tolist()
+        proximity_factor = factors["proximity_factor"].tolist()
+        fragmentation_factor = factors["fragmentation_factor"].tolist()
+        density_score = factors["density_score"].tolist()
+        same_day_gap_bonus = factors["same_day_gap_bonus"].tolist()
+        
+        # Numeric phase: per-slot factors that do not depend on busy data
+        keys = (
+            [(to_epoch_us(slot.start), to_epoch_us(slot.end)) for slot in slots]
+            if slot_memo is not None else [None] * len(slots)
+        )
+        pending = [i for i, key in enumerate(keys) if key is None or key not in slot_memo]
+        with metrics_service.stage("preference"):
+            group_preferences = dict(zip(
+                pending,
+                PreferenceSurface(participants, event_category).scores([slots[i] for i in pending]),
+            ))
+        
+        preference_scores = []
+        optimization_factors = []
+        time_differentiations = []
+        scores = []
+        with metrics_service.stage("slot_factors"):
+            timezone_scores = dict(zip(
+                pending,
+                OptimizationAgent._calculate_timezone_scores([slots[i] for i in pending], participants),
+            ))
+            for i, slot in enumerate(slots):
+                key = keys[i]
+                if i not in group_preferences:
+                    preference_score, optimization_factor, time_differentiation = slot_memo[key]
+                else:
+                    preference_score = group_preferences[i]
+                    optimization_factor = OptimizationAgent._calculate_optimization_factors(
+                        slot, participants, constraints,
+                        density_score=density_score[i],
+                        timezone_score=timezone_scores[i],
+                    )["combined_score"] / 100.0
+                    time_differentiation = OptimizationAgent._calculate_time_slot_differentiation(
+                        slot, constraints
+                    )
+                    if key is not None:
+                        slot_memo[key] = (preference_score, optimization_factor, time_differentiation)
+                preference_scores.append(preference_score)
+                optimization_factors.append(optimization_factor)
+                time_differentiations.append(time_differentiation)
+                scores.append(
+                    OptimizationAgent._combine_score(
+                        availability_factor[i],
+                        preference_score / 100.0,
+                        proximity_factor[i],
+                        fragmentation_factor[i],
+                        optimization_factor,
+                        time_differentiation,
+                        same_day_gap_bonus[i],
+                    )
+                )
+        
+        def materialize(i: int) -> MeetingSlotCandidate:
+            min_gap_before = float(factors["min_gap_before"][i])
+            min_gap_after = float(factors["min_gap_after"][i])
+            components = {
+                "availability": {
+                    "factor": availability_factor[i],
+                    "conflicts": [
+                        user_id
+                        for user_id, row in zip(required_ids, factors["required_conflicts"])
+                        if row[i]
+                    ],
+                    "details": {
+                        "required_available": int(factors["required_available"][i]),
+                        "required_total": factors["required_total"],
+                        "optional_available": int(factors["optional_available"][i]),
+                        "optional_total": factors["optional_total"],
+                        "required_ratio": round(float(factors["required_ratio"][i]), 2),
+                        "optional_ratio": round(float(factors["optional_ratio"][i]), 2),
+                    },
+                },
+                "conflict_proximity": {
+                    "factor": proximity_factor[i],
+                    "details": {
+                        "min_gap_before_minutes": round(min_gap_before, 1) if min_gap_before != float('inf') else None,
+                        "min_gap_after_minutes": round(min_gap_after, 1) if min_gap_after != float('inf') else None,
+                        "has_overlap": bool(factors["has_overlap"][i]),
+                        "buffer_required": constraints.buffer_minutes,
+                    },
+                },
+                "fragmentation": OptimizationAgent._describe_fragmentation(
+                    fragmentation_factor[i], bool(participants)
+                ),
+                "same_day_gap_bonus": same_day_gap_bonus[i],
+                "preference_score": preference_scores[i],
+                "optimization_factor": optimization_factors[i],
+                "time_differentiation": time_differentiations[i],
+                "score": scores[i],
+            }
+            return OptimizationAgent._build_candidate(slots[i], components)
+        
+        return scores, materialize
     
     @staticmethod
     def _evaluate_slot(
@@ -78,13 +355,34 @@ class OptimizationAgent:
         Returns:
             Meeting slot candidate with detailed scoring
         """
+        return OptimizationAgent._build_candidate(
+            slot, OptimizationAgent._score_slot(slot, participants, constraints)
+        )
+    
+    @staticmethod
+    def _score_slot(
+        slot: TimeSlot,
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+    ) -> Dict[str, Any]:
+        """
+        Compute every scoring factor and the overall score for one slot.
+        
+        Args:
+            slot: Time slot to evaluate
+            participants: List of participants
+            constraints: Scheduling constraints
+            
+        Returns:
+            Dictionary of factor data and the unrounded overall "score"
+        """
+        # Busy-slot facts shared by every busy-dependent factor below
+        context = SlotContext(slot, participants)
+        
         # 1. Calculate availability ratio (not binary)
         availability_data = OptimizationAgent._calculate_availability_factor(
-            slot, participants, constraints
+            slot, participants, constraints, context
         )
-        availability_factor = availability_data["factor"]
-        conflicts = availability_data["conflicts"]
-        all_available = len(conflicts) == 0
         
         # 2. Calculate preference scores
         event_category = getattr(constraints, 'event_category', None)
@@ -94,35 +392,72 @@ class OptimizationAgent:
         preference_score = PreferenceAgent.aggregate_preference_scores(
             participant_preference_scores, participants
         )
-        # Normalize to 0-1 range
-        preference_factor = preference_score / 100.0
         
         # 3. Calculate conflict proximity score (back-to-back penalty)
         conflict_proximity_data = OptimizationAgent._calculate_conflict_proximity(
-            slot, participants, constraints
+            slot, participants, constraints, context
         )
-        conflict_proximity_factor = conflict_proximity_data["factor"]
         
         # 4. Calculate fragmentation score (calendar grouping)
         fragmentation_data = OptimizationAgent._calculate_fragmentation(
-            slot, participants
+            slot, participants, context
         )
-        fragmentation_factor = fragmentation_data["factor"]
         
         # 4b. Calculate same-day gap utilization bonus
         same_day_gap_bonus = OptimizationAgent._calculate_same_day_gap_bonus(
-            slot, participants, constraints
+            slot, participants, constraints, context
         )
         
         # 5. Calculate additional optimization factors
         optimization_factors = OptimizationAgent._calculate_optimization_factors(
-            slot, participants, constraints
+            slot, participants, constraints,
+            density_score=OptimizationAgent._calculate_density_score(
+                slot, participants, context
+            ),
         )
         optimization_factor = optimization_factors["combined_score"] / 100.0
         
-        # 6. Combine scores with realistic AI weights
-        # Availability: 35%, Preference: 25%, Conflict Proximity: 20%,
-        # Fragmentation: 15%, Optimization: 5%
+        # 6. Add time-slot differentiation for tie-breaking
+        time_differentiation = OptimizationAgent._calculate_time_slot_differentiation(
+            slot, constraints
+        )
+        
+        return {
+            "availability": availability_data,
+            "conflict_proximity": conflict_proximity_data,
+            "fragmentation": fragmentation_data,
+            "same_day_gap_bonus": same_day_gap_bonus,
+            "preference_score": preference_score,
+            "optimization_factor": optimization_factor,
+            "time_differentiation": time_differentiation,
+            "score": OptimizationAgent._combine_score(
+                availability_data["factor"],
+                preference_score / 100.0,
+                conflict_proximity_data["factor"],
+                fragmentation_data["factor"],
+                optimization_factor,
+                time_differentiation,
+                same_day_gap_bonus,
+            ),
+        }
+    
+    @staticmethod
+    def _combine_score(
+        availability_factor: float,
+        preference_factor: float,
+        conflict_proximity_factor: float,
+        fragmentation_factor: float,
+        optimization_factor: float,
+        time_differentiation: float,
+        same_day_gap_bonus: float,
+    ) -> float:
+        """
+        Combine normalised factors (0-1) into the overall score.
+        
+        Availability: 35%, Preference: 25%, Conflict Proximity: 20%,
+        Fragmentation: 15%, Optimization: 5%, plus the time-slot
+        differentiation (±3 points) and same-day gap bonus (up to +8 points).
+        """
         base_score = (
             availability_factor * 0.35 +
             preference_factor * 0.25 +
@@ -131,15 +466,43 @@ class OptimizationAgent:
             optimization_factor * 0.05
         ) * 100.0
         
-        # 6b. Add time-slot differentiation for tie-breaking (max ±0.5 points)
-        time_differentiation = OptimizationAgent._calculate_time_slot_differentiation(
-            slot, constraints
-        )
+        return base_score + time_differentiation + same_day_gap_bonus
+    
+    @staticmethod
+    def _build_candidate(
+        slot: TimeSlot,
+        components: Dict[str, Any],
+    ) -> MeetingSlotCandidate:
+        """
+        Materialise a scored slot into a candidate with breakdown and reasoning.
+        
+        Shared by the scalar and vectorized engines so both round and
+        explain scores identically.
+        
+        Args:
+            slot: Time slot that was scored
+            components: Factor data from _score_slot (or the vectorized equivalent)
+            
+        Returns:
+            Meeting slot candidate with detailed scoring
+        """
+        availability_data = components["availability"]
+        conflict_proximity_data = components["conflict_proximity"]
+        fragmentation_data = components["fragmentation"]
+        same_day_gap_bonus = components["same_day_gap_bonus"]
+        preference_score = components["preference_score"]
+        time_differentiation = components["time_differentiation"]
+        overall_score = components["score"]
         
-        # 6c. Add same-day gap bonus (up to +5 points for office hour gaps)
-        overall_score = base_score + time_differentiation + same_day_gap_bonus
+        availability_factor = availability_data["factor"]
+        conflicts = availability_data["conflicts"]
+        all_available = len(conflicts) == 0
+        preference_factor = preference_score / 100.0
+        conflict_proximity_factor = conflict_proximity_data["factor"]
+        fragmentation_factor = fragmentation_data["factor"]
+        optimization_factor = components["optimization_factor"]
         
-        # 7. Build detailed breakdown
+        # Build detailed breakdown
         breakdown = {
             "availability": round(availability_factor * 100, 2),
             "preference": round(preference_factor * 100, 2),
@@ -160,7 +523,7 @@ class OptimizationAgent:
             "fragmentation_details": fragmentation_data.get("details", {}),
         }
         
-        # 8. Generate reasoning
+        # Generate reasoning
         reasoning = OptimizationAgent._generate_reasoning(
             slot,
             availability_factor * 100,
@@ -192,37 +555,38 @@ class OptimizationAgent:
         slot: TimeSlot,
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        context: Optional[SlotContext] = None,
     ) -> Dict[str, Any]:
         """
         Calculate availability factor using participant ratio (not binary).
         
         Allows partial availability but heavily penalizes missing required participants.
+        A participant counts as available when the slot does not overlap any of
+        their busy slots (the proximity penalty never drops an overlap-free
+        availability score to 50 or below).
         
         Returns:
             Dictionary with factor (0-1), conflicts, and details
         """
-        required_participants = [p for p in participants if p.is_required]
-        optional_participants = [p for p in participants if not p.is_required]
+        context = SlotContext.ensure(context, slot, participants)
         
+        required_participants = []
+        optional_participants = []
         available_required = []
         available_optional = []
         conflicts = []
         
-        for participant in required_participants:
-            avail_score = AvailabilityAgent.get_participant_availability_score(
-                slot, participant, constraints
-            )
-            if avail_score > 50.0:  # Consider > 50% as "available"
-                available_required.append(participant.user_id)
-            elif avail_score == 0.0:  # Hard conflict
-                conflicts.append(participant.user_id)
-        
-        for participant in optional_participants:
-            avail_score = AvailabilityAgent.get_participant_availability_score(
-                slot, participant, constraints
-            )
-            if avail_score > 50.0:
-                available_optional.append(participant.user_id)
+        for participant, facts in zip(participants, context.participants):
+            if participant.is_required:
+                required_participants.append(participant)
+                if facts.overlap:  # Hard conflict
+                    conflicts.append(participant.user_id)
+                else:
+                    available_required.append(participant.user_id)
+            else:
+                optional_participants.append(participant)
+                if not facts.overlap:
+                    available_optional.append(participant.user_id)
         
         # Calculate factor
         required_ratio = (
@@ -259,6 +623,7 @@ class OptimizationAgent:
         slot: TimeSlot,
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        context: Optional[SlotContext] = None,
     ) -> Dict[str, Any]:
         """
         Calculate conflict proximity score (penalty for back-to-back meetings).
@@ -273,30 +638,12 @@ class OptimizationAgent:
         Returns:
             Dictionary with factor (0-1) and details
         """
-        proximity_scores = []
-        min_gap_before = float('inf')
-        min_gap_after = float('inf')
-        has_overlap = False
-        
-        for participant in participants:
-            for busy_slot in participant.calendar_summary.busy_slots:
-                # Check for overlap
-                if AvailabilityAgent._slots_overlap(
-                    slot.start, slot.end,
-                    busy_slot.start, busy_slot.end
-                ):
-                    has_overlap = True
-                    proximity_scores.append(0.15)  # Heavy penalty for overlap
-                    continue
-                
-                # Calculate gaps
-                gap_before = (slot.start - busy_slot.end).total_seconds() / 60
-                gap_after = (busy_slot.start - slot.end).total_seconds() / 60
-                
-                if 0 <= gap_before < min_gap_before:
-                    min_gap_before = gap_before
-                if 0 <= gap_after < min_gap_after:
-                    min_gap_after = gap_after
+        context = SlotContext.ensure(context, slot, participants)
+        
+        # Nearest non-overlapping busy slots on either side, across participants
+        min_gap_before = context.min_gap_before
+        min_gap_after = context.min_gap_after
+        has_overlap = context.has_overlap
         
         # Calculate proximity factor based on minimum gaps
         if has_overlap:
@@ -330,6 +677,7 @@ class OptimizationAgent:
     def _calculate_fragmentation(
         slot: TimeSlot,
         participants: List[Participant],
+        context: Optional[SlotContext] = None,
     ) -> Dict[str, Any]:
         """
         Calculate fragmentation score (calendar grouping quality).
@@ -345,31 +693,13 @@ class OptimizationAgent:
         Returns:
             Dictionary with factor (0-1) and details
         """
+        context = SlotContext.ensure(context, slot, participants)
         meeting_densities = []
         
-        for participant in participants:
-            nearby_count = 0
-            same_day_count = 0
-            close_time_count = 0  # Within 4 hours
-            
-            for busy_slot in participant.calendar_summary.busy_slots:
-                # Check if same day
-                if busy_slot.start.date() == slot.start.date():
-                    same_day_count += 1
-                    
-                    # Check if within 4 hours
-                    time_gap_minutes = min(
-                        abs((slot.start - busy_slot.end).total_seconds() / 60),
-                        abs((busy_slot.start - slot.end).total_seconds() / 60),
-                    )
-                    
-                    if time_gap_minutes <= 240:  # 4 hours
-                        close_time_count += 1
-                
-                # Check if nearby (within 1 day, 8 hours apart)
-                time_diff_hours = abs((slot.start - busy_slot.start).total_seconds() / 3600)
-                if time_diff_hours <= 24:
-                    nearby_count += 1
+        for facts in context.participants:
+            nearby_count = facts.nearby_count  # Starting within 24 hours
+            same_day_count = facts.same_day_count
+            close_time_count = facts.close_count  # Same day, within 4 hours
             
             # Calculate participant's fragmentation score
             if close_time_count >= 2:
@@ -393,10 +723,15 @@ class OptimizationAgent:
         # Average across participants
         avg_factor = sum(meeting_densities) / len(meeting_densities) if meeting_densities else 0.5
         
+        return OptimizationAgent._describe_fragmentation(avg_factor, bool(meeting_densities))
+    
+    @staticmethod
+    def _describe_fragmentation(avg_factor: float, has_participants: bool) -> Dict[str, Any]:
+        """Wrap an averaged fragmentation factor with its details."""
         return {
             "factor": avg_factor,
             "details": {
-                "avg_nearby_meetings": round(sum(meeting_densities) / len(meeting_densities), 2) if meeting_densities else 0,
+                "avg_nearby_meetings": round(avg_factor, 2) if has_participants else 0,
                 "grouping_quality": "high" if avg_factor >= 0.75 else "medium" if avg_factor >= 0.50 else "low",
             }
         }
@@ -406,6 +741,7 @@ class OptimizationAgent:
         slot: TimeSlot,
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        context: Optional[SlotContext] = None,
     ) -> float:
         """
         Calculate bonus for filling gaps during office hours on days with existing meetings.
@@ -422,6 +758,7 @@ class OptimizationAgent:
             slot: Time slot to evaluate
             participants: List of participants
             constraints: Scheduling constraints
+            context: Precomputed busy-slot facts (built here if None)
             
         Returns:
             Bonus points (0 to +8.0)
@@ -435,46 +772,25 @@ class OptimizationAgent:
         office_end = constraints.working_hours_end
         is_office_hours = office_start <= slot_hour < office_end
         
-        # DEBUG logging
-        print(f"🔍 Gap Bonus Debug: Slot {slot.start.strftime('%I:%M %p')} | Office hrs: {office_start}-{office_end} | Is office: {is_office_hours}")
-        
         if not is_office_hours:
             # Not during office hours - no bonus (or even penalty for extending day)
-            print(f"   ❌ Not office hours - no bonus")
+            trace = tracing_service.active()
+            if trace is not None:
+                trace.event("gap_bonus", slot=slot.start.isoformat(), office_hours=False, bonus=0.0)
             return 0.0
         
+        context = SlotContext.ensure(context, slot, participants)
+        
         # Check each participant for same-day meetings
-        for participant in participants:
-            same_day_meetings = []
-            
-            for busy_slot in participant.calendar_summary.busy_slots:
-                if busy_slot.start.date() == slot.start.date():
-                    same_day_meetings.append(busy_slot)
-            
-            print(f"   📅 Same-day meetings: {len(same_day_meetings)}")
-            if len(same_day_meetings) > 0:
-                for mtg in same_day_meetings:
-                    print(f"      • {mtg.start.strftime('%I:%M %p')} - {mtg.end.strftime('%I:%M %p')}")
-            
-            if len(same_day_meetings) > 0:
+        for facts in context.participants:
+            if facts.same_day_count > 0:
                 # There are meetings on this day - calculate gap filling bonus
                 
                 # Base bonus for filling a gap during office hours (increased from 3.0 to 5.0)
                 base_bonus = 5.0
                 
-                # Check if this fills a gap between meetings (better than start/end of day)
-                fills_middle_gap = False
-                for meeting in same_day_meetings:
-                    # Check if our slot is between existing meetings
-                    if meeting.end < slot.start:
-                        # There's a meeting before this slot
-                        for other_meeting in same_day_meetings:
-                            if other_meeting.start > slot.end:
-                                # There's also a meeting after - we're filling a middle gap!
-                                fills_middle_gap = True
-                                break
-                
-                if fills_middle_gap:
+                # Filling a gap between same-day meetings beats the start/end of day
+                if facts.fills_middle_gap:
                     # Extra bonus for filling middle gaps (best scenario) - increased from 5.0 to 8.0
                     bonus = base_bonus + 3.0  # Total: 8.0
                 else:
@@ -492,8 +808,17 @@ class OptimizationAgent:
         
         # Cap at 8.0 points maximum (increased from 5.0)
         final_bonus = min(8.0, max_bonus)
-        if final_bonus > 0:
-            print(f"   ✨ BONUS AWARDED: +{final_bonus:.1f} points")
+        
+        trace = tracing_service.active()
+        if trace is not None:
+            trace.event(
+                "gap_bonus",
+                slot=slot.start.isoformat(),
+                office_hours=True,
+                same_day_meetings=[facts.same_day_count for facts in context.participants],
+                fills_middle_gap=[facts.fills_middle_gap for facts in context.participants],
+                bonus=final_bonus,
+            )
         return final_bonus
     
     @staticmethod
@@ -501,6 +826,8 @@ class OptimizationAgent:
         slot: TimeSlot,
         participants: List[Participant],
         constraints: SchedulingConstraints,
+        density_score: Optional[float] = None,
+        timezone_score: Optional[float] = None,
     ) -> Dict[str, float]:
         """
         Calculate additional optimization factors beyond availability and preference.
@@ -509,6 +836,8 @@ class OptimizationAgent:
             slot: Time slot to evaluate
             participants: List of participants
             constraints: Scheduling constraints
+            density_score: Precomputed density score (computed here if None)
+            timezone_score: Precomputed timezone friendliness (computed here if None)
             
         Returns:
             Dictionary with optimization factor scores
@@ -536,16 +865,18 @@ class OptimizationAgent:
             factors["day_preference"] = 50.0
         
         # 3. Meeting density (prefer less crowded time periods)
-        density_score = OptimizationAgent._calculate_density_score(
-            slot, participants
-        )
+        if density_score is None:
+            density_score = OptimizationAgent._calculate_density_score(
+                slot, participants
+            )
         factors["density"] = density_score
         
         # 4. Timezone friendliness (for multi-timezone meetings)
-        tz_score = OptimizationAgent._calculate_timezone_score(
-            slot, participants
-        )
-        factors["timezone_friendliness"] = tz_score
+        if timezone_score is None:
+            timezone_score = OptimizationAgent._calculate_timezone_score(
+                slot, participants
+            )
+        factors["timezone_friendliness"] = timezone_score
         
         # 5. Recency preference (slightly favor sooner dates for urgency)
         days_from_now = (slot.start - datetime.now(timezone.utc)).days
@@ -568,25 +899,17 @@ class OptimizationAgent:
     def _calculate_density_score(
         slot: TimeSlot,
         participants: List[Participant],
+        context: Optional[SlotContext] = None,
     ) -> float:
         """
         Calculate density score based on nearby meetings.
         Prefer time slots with fewer adjacent meetings.
         """
+        context = SlotContext.ensure(context, slot, participants)
         total_density = 0
         
-        for participant in participants:
-            nearby_meetings = 0
-            
-            for busy_slot in participant.calendar_summary.busy_slots:
-                # Check if busy slot is within 2 hours of proposed slot
-                time_gap_minutes = min(
-                    abs((slot.start - busy_slot.end).total_seconds() / 60),
-                    abs((busy_slot.start - slot.end).total_seconds() / 60),
-                )
-                
-                if time_gap_minutes <= 120:  # Within 2 hours
-                    nearby_meetings += 1
+        for facts in context.participants:
+            nearby_meetings = facts.density_count  # Within 2 hours
             
             # Higher density = lower score
             if nearby_meetings == 0:
@@ -610,12 +933,49 @@ class OptimizationAgent:
         """
         Calculate timezone friendliness score.
         Penalize if meeting falls outside working hours for any participant.
+        
+        The slot start is read in each participant's timezone
+        (``calendar_summary.timezone``); the score is that of the least
+        friendly local hour.
         """
-        # For Phase 1, simplified version (assume all same timezone)
-        # In production, would convert slot time to each participant's timezone
-        hour = slot.start.hour
+        if not participants:
+            return OptimizationAgent._timezone_score_at(slot.start.hour)
+        
+        zones = {p.calendar_summary.timezone for p in participants}
+        return min(
+            OptimizationAgent._timezone_score_at(
+                timezone_engine.local_slot(slot, zone).start.hour
+            )
+            for zone in zones
+        )
+    
+    @staticmethod
+    def _calculate_timezone_scores(
+        slots: List[TimeSlot],
+        participants: List[Participant],
+    ) -> List[float]:
+        """
+        Calculate the timezone friendliness score of many slots at once.
         
-        # Check if reasonable time for most timezones (8 AM - 6 PM)
+        Same result as _calculate_timezone_score per slot, with local hours
+        mapped in bulk by timezone_engine (one lookup per distinct timezone).
+        """
+        if not participants:
+            return [OptimizationAgent._timezone_score_at(slot.start.hour) for slot in slots]
+        
+        minutes = timezone_engine.epoch_minutes(slots)
+        hour_scores = [OptimizationAgent._timezone_score_at(hour) for hour in range(24)]
+        scores = None
+        for zone in dict.fromkeys(p.calendar_summary.timezone for p in participants):
+            _, hours = timezone_engine.local_fields(minutes, zone)
+            zone_scores = [hour_scores[hour] for hour in hours]
+            scores = zone_scores if scores is None else list(map(min, scores, zone_scores))
+        return scores
+    
+    @staticmethod
+    def _timezone_score_at(hour: int) -> float:
+        """Timezone friendliness rule for a slot starting at a local hour."""
+        # Check if reasonable working time (8 AM - 6 PM)
         if 8 <= hour <= 18:
             return 100.0
         elif 7 <= hour < 8 or 18 < hour <= 19:
@@ -718,6 +1078,9 @@ class OptimizationAgent:
         - Distance from ideal meeting times
         - Within-hour granularity
         
+        Values are memoized per event category in a weekday x minute-of-day
+        lookup table (see _time_slot_differentiation_at for the rule).
+        
         Args:
             slot: Time slot to evaluate
             constraints: Scheduling constraints
@@ -725,11 +1088,23 @@ class OptimizationAgent:
         Returns:
             Score adjustment from -3.0 to +3.0
         """
+        return lookup_tables.get_table(
+            OptimizationAgent._time_slot_differentiation_at,
+            getattr(constraints, 'event_category', None),
+        ).at(slot.start)
+    
+    @staticmethod
+    def _time_slot_differentiation_at(
+        event_category: Optional[EventCategory],
+        weekday: int,
+        hour: int,
+        minute: int,
+    ) -> float:
+        """Differentiation rule for a slot starting at (weekday, hour, minute)."""
         score_adjustment = 0.0
         
         # 1. Minute preference (±0.8 points)
         # Much stronger preference for round hours
-        minute = slot.start.minute
         if minute == 0:
             score_adjustment += 0.8  # Top of the hour
         elif minute == 30:
@@ -742,12 +1117,7 @@ class OptimizationAgent:
         
         # 2. Hour positioning within day (±1.2 points)
         # Strong preference for ideal meeting times
-        hour = slot.start.hour
-        event_category = getattr(constraints, 'event_category', None)
-        
         if event_category:
-            from schemas.scheduling import EventCategory
-            
             if event_category == EventCategory.MEETING:
                 # Strong preference hierarchy for business meetings
                 if hour == 10:  # Sweet spot
@@ -783,7 +1153,7 @@ class OptimizationAgent:
         
         # 3. Day of week preference (±0.4 points)
         # Stronger mid-week preference
-        weekday = slot.start.weekday()  # 0=Monday, 4=Friday
+        # weekday: 0=Monday, 4=Friday
         if weekday == 2:  # Wednesday - best
             score_adjustment += 0.4
         elif weekday in [1, 3]:  # Tue, Thu - good
@@ -1,6 +1,6 @@
 """Preference Agent: Learns and applies user preferences from historical behavior."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from schemas.scheduling import (
     Participant,
@@ -9,6 +9,7 @@ from schemas.scheduling import (
     DayOfWeek,
     EventCategory,
 )
+from agents import lookup_tables, timezone_engine
 
 
 class PreferenceAgent:
@@ -31,6 +32,10 @@ class PreferenceAgent:
         """
         Score a time slot based on all participants' preferences and event category.
         
+        Each participant's hours and days are read in their own timezone
+        (``calendar_summary.timezone``), converted via the cached offset
+        tables of timezone_engine.
+        
         Args:
             slot: Time slot to score
             participants: List of participants with preference patterns
@@ -43,15 +48,16 @@ class PreferenceAgent:
         
         for participant in participants:
             preference_pattern = participant.calendar_summary.preference_patterns
+            local_slot = timezone_engine.local_slot(slot, participant.calendar_summary.timezone)
             
             if preference_pattern is None:
                 # No preference data, use category-based baseline
                 scores[participant.user_id] = PreferenceAgent._score_category_fit(
-                    slot, event_category
+                    local_slot, event_category
                 ) if event_category else 50.0
             else:
                 score = PreferenceAgent._calculate_preference_score(
-                    slot, preference_pattern, event_category
+                    local_slot, preference_pattern, event_category
                 )
                 scores[participant.user_id] = score
         
@@ -67,7 +73,7 @@ class PreferenceAgent:
         Calculate preference score for a single participant.
         
         Args:
-            slot: Time slot to evaluate
+            slot: Time slot to evaluate, in the participant's timezone
             pattern: Learned preference pattern
             event_category: Optional event category
             
@@ -114,6 +120,9 @@ class PreferenceAgent:
         - Health: Daytime preferred
         - Focus: Morning or dedicated blocks
         
+        Values are memoized per category in a weekday x minute-of-day
+        lookup table (see _category_fit_at for the rule itself).
+        
         Args:
             slot: Time slot to evaluate
             category: Event category
@@ -121,12 +130,19 @@ class PreferenceAgent:
         Returns:
             Score from 0-100
         """
-        hour = slot.start.hour
-        minute = slot.start.minute
-        is_weekend = slot.start.weekday() in [5, 6]
-        
-        # Convert to fractional time for precise scoring
-        time_decimal = hour + minute / 60.0
+        return lookup_tables.get_table(
+            PreferenceAgent._category_fit_at, category
+        ).at(slot.start)
+    
+    @staticmethod
+    def _category_fit_at(
+        category: EventCategory,
+        weekday: int,
+        hour: int,
+        minute: int,
+    ) -> float:
+        """Category fit rule for a slot starting at (weekday, hour, minute)."""
+        is_weekend = weekday in [5, 6]
         
         if category == EventCategory.MEETING:
             # Business meetings - best during core business hours
@@ -301,17 +317,30 @@ class PreferenceAgent:
         pattern: PreferencePattern,
     ) -> float:
         """Score based on preferred hours with minute-level precision."""
-        slot_hour = slot.start.hour
-        slot_minute = slot.start.minute
+        return lookup_tables.get_table(
+            PreferenceAgent._time_preference_at,
+            (pattern.preferred_hours_start, pattern.preferred_hours_end),
+            weekly=False,
+        ).at(slot.start)
+    
+    @staticmethod
+    def _time_preference_at(
+        preferred_hours: Tuple[int, int],
+        weekday: int,
+        slot_hour: int,
+        slot_minute: int,
+    ) -> float:
+        """Preferred-hours rule for a slot starting at (hour, minute)."""
+        preferred_hours_start, preferred_hours_end = preferred_hours
         
         # Convert to fractional hour for precise scoring
         slot_time = slot_hour + slot_minute / 60.0
         
         # Check if within preferred time window
-        if pattern.preferred_hours_start <= slot_hour < pattern.preferred_hours_end:
+        if preferred_hours_start <= slot_hour < preferred_hours_end:
             # Within preferred window - score based on how centered it is
-            window_size = pattern.preferred_hours_end - pattern.preferred_hours_start
-            window_center = pattern.preferred_hours_start + window_size / 2
+            window_size = preferred_hours_end - preferred_hours_start
+            window_center = preferred_hours_start + window_size / 2
             distance_from_center = abs(slot_time - window_center)
             
             # Score decreases as we move away from center
@@ -333,10 +362,10 @@ class PreferenceAgent:
             return max(80.0, min(100.0, center_score + minute_bonus))
         else:
             # Outside preferred window - calculate penalty based on distance
-            if slot_time < pattern.preferred_hours_start:
-                distance = pattern.preferred_hours_start - slot_time
+            if slot_time < preferred_hours_start:
+                distance = preferred_hours_start - slot_time
             else:
-                distance = slot_time - pattern.preferred_hours_end
+                distance = slot_time - preferred_hours_end
             
             # Penalize based on distance (max penalty at 4+ hours away)
             penalty = min(distance * 15, 60)
@@ -348,18 +377,30 @@ class PreferenceAgent:
         pattern: PreferencePattern,
     ) -> float:
         """Score based on morning person vs night owl tendency."""
-        slot_hour = slot.start.hour
-        
+        return lookup_tables.get_table(
+            PreferenceAgent._morning_preference_at,
+            pattern.morning_person_score,
+            weekly=False,
+        ).at(slot.start)
+    
+    @staticmethod
+    def _morning_preference_at(
+        morning_person_score: float,
+        weekday: int,
+        slot_hour: int,
+        slot_minute: int,
+    ) -> float:
+        """Morning/evening rule for a slot starting at (hour, minute)."""
         # Define morning (6-11) and afternoon/evening (14-18)
         is_morning = 6 <= slot_hour < 12
         is_afternoon = 14 <= slot_hour < 19
         
         if is_morning:
             # Morning slots favored by morning people
-            return pattern.morning_person_score * 100
+            return morning_person_score * 100
         elif is_afternoon:
             # Afternoon slots favored by night owls
-            return (1.0 - pattern.morning_person_score) * 100
+            return (1.0 - morning_person_score) * 100
         else:
             # Midday or very early/late - neutral
             return 50.0
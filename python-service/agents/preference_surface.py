@@ -0,0 +1,169 @@
+"""Preference Surface: Compiled group preference scoring for many slots."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from schemas.scheduling import EventCategory, Participant, PreferencePattern, TimeSlot
+from agents import timezone_engine
+from agents.preference_agent import PreferenceAgent
+
+# Lazy import so preference scoring keeps working without NumPy
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+
+# Everything a group's preference scores read from a slot: the local minute
+# of the week of its start in each distinct participant timezone, and its length
+CellKey = Tuple[object, ...]
+
+# A Monday 00:00; profiles are evaluated on slots placed at a cell's local
+# minute of this week (rules read nothing but weekday, time and length)
+_REFERENCE_WEEK = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class PreferenceSurface:
+    """
+    Group preference scores of one participant list, compiled for reuse.
+
+    A participant's preference score depends on a slot only through its
+    local start weekday, hour and minute (in the participant's timezone)
+    and its length, so each participant is a surface over those cells.
+    Local times of a whole batch come from timezone_engine in one lookup
+    per distinct timezone. Surfaces are evaluated only on the cells
+    the scored slots actually touch (a dense weekday x minute-of-day
+    surface would cost 10080 rule evaluations per participant), once per
+    distinct preference pattern and timezone, and kept for later batches.
+
+    The group score of every cell is then one weighted reduction over the
+    participant rows. Rows are accumulated in participant order, exactly
+    like ``aggregate_preference_scores`` does, so results are identical to
+    ``aggregate_preference_scores(score_slot_preferences(...))`` per slot.
+    """
+
+    def __init__(
+        self,
+        participants: Sequence[Participant],
+        event_category: Optional[EventCategory] = None,
+    ):
+        """
+        Args:
+            participants: Participants with their preference patterns
+            event_category: Optional event category for category-aware scoring
+        """
+        self.participants = list(participants)
+        self.event_category = event_category
+
+        # Distinct timezones, and scoring profiles: one per pattern and
+        # timezone (patternless participants of a timezone share one)
+        self._zones: List[str] = []
+        self._patterns: List[Tuple[Optional[PreferencePattern], str]] = []
+        profile_of: Dict[Tuple[Optional[int], str], int] = {}
+        rows: List[int] = []
+        for participant in self.participants:
+            pattern = participant.calendar_summary.preference_patterns
+            zone = participant.calendar_summary.timezone
+            if zone not in self._zones:
+                self._zones.append(zone)
+            key = (id(pattern) if pattern is not None else None, zone)
+            if key not in profile_of:
+                profile_of[key] = len(self._patterns)
+                self._patterns.append((pattern, zone))
+            rows.append(profile_of[key])
+
+        # Scores are looked up by user_id, so a repeated id uses its last row
+        last_row = {p.user_id: row for p, row in zip(self.participants, rows)}
+        self._rows = [last_row[p.user_id] for p in self.participants]
+        self._weights = [1.0 if p.is_required else 0.5 for p in self.participants]
+
+        self._cells: Dict[CellKey, int] = {}
+        self._group: List[float] = []
+
+    def cells(self, slots: Sequence[TimeSlot]) -> List[CellKey]:
+        """Get the surface cell of each slot."""
+        minutes = timezone_engine.epoch_minutes(slots)
+        columns = []
+        for zone in self._zones:
+            week = timezone_engine.week_minutes(minutes, zone)
+            columns.append(week.tolist() if np is not None else week)
+        columns.append([slot.end - slot.start for slot in slots])
+        return list(zip(*columns))
+
+    def scores(self, slots: Sequence[TimeSlot]) -> List[float]:
+        """
+        Get the group preference score of each slot.
+
+        Args:
+            slots: Time slots to score
+
+        Returns:
+            Aggregated preference scores (0-100) in slot order
+        """
+        if not self.participants:
+            return [50.0] * len(slots)
+
+        keys = self.cells(slots)
+        fresh = []
+        for key in keys:
+            if key not in self._cells:
+                self._cells[key] = len(self._group) + len(fresh)
+                fresh.append(key)
+        if fresh:
+            self._group.extend(self._compile(fresh))
+        return [self._group[self._cells[key]] for key in keys]
+
+    def _compile(self, keys: List[CellKey]) -> List[float]:
+        """Evaluate every profile on new cells and reduce them to group scores."""
+        # 1. Local slots per timezone: a profile reads only its own timezone's
+        #    part of a cell, so it is evaluated once per distinct local cell
+        #    (cells that differ elsewhere, e.g. across another zone's DST
+        #    change, reuse the value)
+        local = {}
+        for column, zone in enumerate(self._zones):
+            positions: Dict[Tuple[int, timedelta], int] = {}
+            local_slots = []
+            index = []
+            for key in keys:
+                local_key = (key[column], key[-1])
+                if local_key not in positions:
+                    positions[local_key] = len(local_slots)
+                    start = _REFERENCE_WEEK + timedelta(minutes=key[column])
+                    local_slots.append(
+                        TimeSlot.model_construct(start=start, end=start + key[-1], timezone=zone)
+                    )
+                index.append(positions[local_key])
+            local[zone] = (local_slots, index)
+
+        # 2. Profile rows on the new cells
+        rows = []
+        for pattern, zone in self._patterns:
+            local_slots, index = local[zone]
+            if pattern is None:
+                values = [
+                    PreferenceAgent._score_category_fit(slot, self.event_category)
+                    if self.event_category else 50.0
+                    for slot in local_slots
+                ]
+            else:
+                values = [
+                    PreferenceAgent._calculate_preference_score(slot, pattern, self.event_category)
+                    for slot in local_slots
+                ]
+            rows.append([values[position] for position in index])
+
+        # 3. Weighted reduction in participant order, as aggregate_preference_scores
+        total_weight = 0.0
+        for weight in self._weights:
+            total_weight += weight
+
+        if np is None:
+            weighted = [0.0] * len(keys)
+            for row, weight in zip(self._rows, self._weights):
+                weighted = [acc + score * weight for acc, score in zip(weighted, rows[row])]
+            return [value / total_weight for value in weighted]
+
+        matrix = np.array(rows, dtype=np.float64)
+        weighted = np.zeros(len(keys))
+        for row, weight in zip(self._rows, self._weights):
+            weighted += matrix[row] * weight
+        return (weighted / total_weight).tolist()
@@ -0,0 +1,238 @@
+"""Relaxation Engine: Shares scoring work across negotiation compromise passes."""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Dict, List, Optional, Tuple
+from schemas.scheduling import (
+    Participant,
+    TimeSlot,
+    MeetingSlotCandidate,
+    SchedulingConstraints,
+)
+from agents.availability_agent import AvailabilityAgent
+from agents.optimization_agent import OptimizationAgent
+from agents.busy_index import to_epoch_us
+from agents import scoring_kernel
+from services import metrics_service
+
+
+# Threads used to run independent relaxation groups concurrently (1 = inline)
+RELAXATION_WORKERS = int(
+    os.getenv("SCHEDULER_RELAXATION_WORKERS", str(min(2, os.cpu_count() or 1)))
+)
+
+# Candidates kept from each relaxation pass
+CANDIDATES_PER_PASS = 3
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Create the relaxation thread pool on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=RELAXATION_WORKERS, thread_name_prefix="relaxation"
+            )
+        return _pool
+
+
+class RelaxationEngine:
+    """
+    Runs the compromise passes of one negotiation.
+
+    Each pass relaxes a single knob of the original constraints:
+    - "extended_hours": Working hours +-1h (within 7-19), buffer -5 min
+    - "reduced_buffer": Buffer -10 min
+    - "shorter_meeting": Duration -15 min (only for meetings over 30 min)
+
+    Busy-slot facts (overlaps, gaps, fragmentation, density) and per-slot
+    preference scores do not depend on hours or buffer, so passes with the
+    same duration are scored from one kernel pass over the union of their
+    slots; only buffer/hour dependent factors are re-evaluated per pass.
+    Passes with different durations share nothing and run concurrently.
+
+    Results are identical to ranking every relaxed constraint set from
+    scratch.
+    """
+
+    def __init__(
+        self,
+        participants: List[Participant],
+        constraints: SchedulingConstraints,
+    ):
+        self.participants = participants
+        self.passes = RelaxationEngine.relaxations(constraints)
+
+    @staticmethod
+    def relaxations(
+        constraints: SchedulingConstraints,
+    ) -> List[Tuple[str, SchedulingConstraints, str]]:
+        """
+        Build the relaxed constraint sets, in pass order.
+
+        Args:
+            constraints: Original scheduling constraints
+
+        Returns:
+            List of (strategy, relaxed constraints, reasoning label)
+        """
+        passes = []
+
+        # 1. Try expanding working hours slightly
+        passes.append(("extended_hours", SchedulingConstraints(
+            duration_minutes=constraints.duration_minutes,
+            earliest_date=constraints.earliest_date,
+            latest_date=constraints.latest_date,
+            working_hours_start=max(7, constraints.working_hours_start - 1),
+            working_hours_end=min(19, constraints.working_hours_end + 1),
+            allowed_days=constraints.allowed_days,
+            buffer_minutes=max(0, constraints.buffer_minutes - 5),
+            timezone=constraints.timezone,
+            max_candidates=constraints.max_candidates,
+            working_hours_mode=constraints.working_hours_mode,
+        ), "Extended hours"))
+
+        # 2. Try reducing buffer time
+        passes.append(("reduced_buffer", SchedulingConstraints(
+            duration_minutes=constraints.duration_minutes,
+            earliest_date=constraints.earliest_date,
+            latest_date=constraints.latest_date,
+            working_hours_start=constraints.working_hours_start,
+            working_hours_end=constraints.working_hours_end,
+            allowed_days=constraints.allowed_days,
+            buffer_minutes=max(0, constraints.buffer_minutes - 10),
+            timezone=constraints.timezone,
+            max_candidates=constraints.max_candidates,
+            working_hours_mode=constraints.working_hours_mode,
+        ), "Reduced buffer"))
+
+        # 3. Try shorter duration
+        if constraints.duration_minutes > 30:
+            shorter = SchedulingConstraints(
+                duration_minutes=max(15, constraints.duration_minutes - 15),
+                earliest_date=constraints.earliest_date,
+                latest_date=constraints.latest_date,
+                working_hours_start=constraints.working_hours_start,
+                working_hours_end=constraints.working_hours_end,
+                allowed_days=constraints.allowed_days,
+                buffer_minutes=constraints.buffer_minutes,
+                timezone=constraints.timezone,
+                max_candidates=constraints.max_candidates,
+                working_hours_mode=constraints.working_hours_mode,
+            )
+            passes.append((
+                "shorter_meeting", shorter, f"Shorter meeting ({shorter.duration_minutes}min)"
+            ))
+
+        return passes
+
+    def run(
+        self,
+        on_pass: Optional[Callable[[str, List[MeetingSlotCandidate]], None]] = None,
+    ) -> List[Tuple[str, List[MeetingSlotCandidate]]]:
+        """
+        Run every pass and collect its top compromise candidates.
+
+        Args:
+            on_pass: Called with (strategy, candidates) as soon as each pass
+                (in pass order) has its candidates
+
+        Returns:
+            (strategy, candidates) for each pass that found slots, in pass
+            order; candidates are marked as compromises in their reasoning
+        """
+        metrics_service.count("relaxation_passes", len(self.passes))
+
+        # Group passes that can share slot facts (same duration)
+        groups: Dict[int, List[int]] = {}
+        for position, (_, relaxed, _) in enumerate(self.passes):
+            groups.setdefault(relaxed.duration_minutes, []).append(position)
+
+        # Run the groups, concurrently when there is more than one
+        futures: Dict[int, Future] = {}
+        if RELAXATION_WORKERS > 1 and len(groups) > 1:
+            pool = _get_pool()
+            for positions in groups.values():
+                # Each job gets a copy of the context so tracing and metrics follow it
+                future = pool.submit(copy_context().run, self._run_group, positions)
+                for position in positions:
+                    futures[position] = future
+        else:
+            for positions in groups.values():
+                future = Future()
+                future.set_result(self._run_group(positions))
+                for position in positions:
+                    futures[position] = future
+
+        results = []
+        for position, (strategy, _, _) in enumerate(self.passes):
+            candidates = futures[position].result()[position]
+            if candidates is None:
+                continue
+            if on_pass is not None:
+                on_pass(strategy, candidates)
+            results.append((strategy, candidates))
+        return results
+
+    def _run_group(self, positions: List[int]) -> Dict[int, Optional[List[MeetingSlotCandidate]]]:
+        """
+        Run passes that share a duration.
+
+        Args:
+            positions: Indexes into self.passes
+
+        Returns:
+            Marked candidates per pass (None when the pass found no slots)
+        """
+        slots_by_pass = {
+            position: AvailabilityAgent.find_available_slots(
+                self.participants, self.passes[position][1]
+            )
+            for position in positions
+        }
+
+        # Distinct slots of the whole group, scored once
+        slot_facts = None
+        slot_rows: Dict[Tuple[int, int], int] = {}
+        slot_memo: Dict[Tuple[int, int], Tuple[float, float, float]] = {}
+        if scoring_kernel.is_available():
+            union: List[TimeSlot] = []
+            for slots in slots_by_pass.values():
+                for slot in slots:
+                    key = (to_epoch_us(slot.start), to_epoch_us(slot.end))
+                    if key not in slot_rows:
+                        slot_rows[key] = len(union)
+                        union.append(slot)
+            if union:
+                slot_facts = scoring_kernel.compute_slot_facts(union, self.participants)
+
+        results: Dict[int, Optional[List[MeetingSlotCandidate]]] = {}
+        for position in positions:
+            _, relaxed, label = self.passes[position]
+            slots = slots_by_pass[position]
+            if not slots:
+                results[position] = None
+                continue
+
+            if slot_facts is not None:
+                rows = [slot_rows[(to_epoch_us(s.start), to_epoch_us(s.end))] for s in slots]
+                ranked = OptimizationAgent.rank_candidates(
+                    slots, self.participants, relaxed,
+                    engine="vector",
+                    slot_facts=scoring_kernel.take_rows(slot_facts, rows),
+                    slot_memo=slot_memo,
+                )
+            else:
+                ranked = OptimizationAgent.rank_candidates(slots, self.participants, relaxed)
+
+            candidates = ranked[:CANDIDATES_PER_PASS]
+            for candidate in candidates:
+                # Mark as compromise
+                candidate.reasoning = f"Compromise: {label}. {candidate.reasoning}"
+            results[position] = candidates
+        return results
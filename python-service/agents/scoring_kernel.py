@@ -0,0 +1,328 @@
+"""Scoring Kernel: Vectorized busy-slot factors for batches of candidate slots."""
+
+from typing import Any, Dict, List, Sequence
+from schemas.scheduling import (
+    Participant,
+    TimeSlot,
+    SchedulingConstraints,
+    EventCategory,
+)
+from agents.busy_index import (
+    BusyIndex,
+    CONTEXT_REACH_US,
+    MICROSECONDS_PER_MINUTE,
+    to_epoch_us,
+)
+from services import metrics_service
+
+# Lazy import so the scalar scoring path keeps working without NumPy
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+
+_DAY_US = 24 * 60 * MICROSECONDS_PER_MINUTE
+
+# Upper bound on (slots x busy slots) cells materialised per matrix pass
+_MAX_MATRIX_CELLS = 1 << 20
+
+
+def is_available() -> bool:
+    """Check if the vectorized kernel can run (NumPy installed)."""
+    return np is not None
+
+
+def _to_minutes(delta_us: "np.ndarray") -> "np.ndarray":
+    """Convert microsecond deltas to minutes exactly like ``total_seconds() / 60``."""
+    return delta_us / 1_000_000 / 60
+
+
+def compute_busy_factors(
+    slots: List[TimeSlot],
+    participants: List[Participant],
+    constraints: SchedulingConstraints,
+) -> Dict[str, Any]:
+    """
+    Compute every busy-slot dependent scoring factor for a batch of slots.
+
+    Equivalent to ``apply_constraints(compute_slot_facts(slots, participants),
+    constraints)``.
+
+    Args:
+        slots: Candidate slots to score
+        participants: List of participants
+        constraints: Scheduling constraints
+
+    Returns:
+        Dictionary of per-slot arrays (see apply_constraints)
+    """
+    return apply_constraints(compute_slot_facts(slots, participants), constraints)
+
+
+def compute_slot_facts(
+    slots: List[TimeSlot],
+    participants: List[Participant],
+) -> Dict[str, Any]:
+    """
+    Compute the busy-slot facts of a batch of slots that no constraint affects.
+
+    Slot and busy boundaries are loaded into int64 epoch-microsecond arrays.
+    Overlaps and nearest gaps use per-participant searchsorted passes over
+    the sorted busy index; same-day, 2h/4h/24h window counts and middle-gap
+    detection use a (slots x busy) matrix restricted to busy slots near the
+    batch. Results match the scalar OptimizationAgent helpers exactly.
+
+    Every fact depends only on a slot's own start and end, so facts computed
+    for a larger batch can be reused for any subset (see take_rows).
+
+    Args:
+        slots: Candidate slots to score
+        participants: List of participants
+
+    Returns:
+        Dictionary of per-slot arrays:
+        - slot_hours
+        - availability_factor, required_available, optional_available
+        - required_conflicts (bool matrix, one row per required participant)
+        - min_gap_before, min_gap_after, has_overlap
+        - fragmentation_factor, density_score
+        - gap_bonus_base, has_same_day (same-day gap bonus before the
+          category bonus and office-hours cut-off)
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for the vectorized scoring kernel")
+
+    slot_count = len(slots)
+    slot_starts = np.fromiter((to_epoch_us(slot.start) for slot in slots), np.int64, slot_count)
+    slot_ends = np.fromiter((to_epoch_us(slot.end) for slot in slots), np.int64, slot_count)
+    slot_days = np.fromiter((slot.start.toordinal() for slot in slots), np.int64, slot_count)
+    slot_hours = np.fromiter((slot.start.hour for slot in slots), np.int64, slot_count)
+
+    # Busy slots beyond the context reach of every slot can only affect the
+    # nearest-gap lookups, which are answered from the full index
+    window_start = int(slot_starts.min()) - CONTEXT_REACH_US if slot_count else 0
+    window_end = int(slot_ends.max()) + CONTEXT_REACH_US if slot_count else 0
+    chunk = max(1, _MAX_MATRIX_CELLS // max(1, max(
+        (BusyIndex.for_summary(p.calendar_summary).size for p in participants),
+        default=1,
+    )))
+
+    required_available = np.zeros(slot_count, np.int64)
+    optional_available = np.zeros(slot_count, np.int64)
+    required_conflicts = []
+    has_overlap = np.zeros(slot_count, bool)
+    gap_before_us = np.full(slot_count, np.iinfo(np.int64).max, np.int64)
+    gap_after_us = np.full(slot_count, np.iinfo(np.int64).max, np.int64)
+    fragmentation_sum = np.zeros(slot_count)
+    density_sum = np.zeros(slot_count)
+    max_bonus = np.zeros(slot_count)
+    has_same_day = np.zeros(slot_count, bool)
+
+    for participant in participants:
+        index = BusyIndex.for_summary(participant.calendar_summary)
+
+        # 1. Hard overlap against merged raw busy runs
+        merged_starts, merged_ends = (np.asarray(a, np.int64) for a in index.merged(0))
+        if merged_starts.size:
+            position = np.searchsorted(merged_starts, slot_ends, side="left")
+            overlap = (position > 0) & (merged_ends[np.maximum(position - 1, 0)] > slot_starts)
+        else:
+            overlap = np.zeros(slot_count, bool)
+
+        if participant.is_required:
+            required_available += ~overlap
+            required_conflicts.append(overlap)
+        else:
+            optional_available += ~overlap
+        has_overlap |= overlap
+
+        # 2. Nearest busy slot ending before / starting after each slot
+        if index.size:
+            sorted_ends = np.asarray(index.sorted_ends, np.int64)
+            starts = np.asarray(index.starts, np.int64)
+
+            position = np.searchsorted(sorted_ends, slot_starts, side="right")
+            found = position > 0
+            gap = slot_starts - sorted_ends[np.maximum(position - 1, 0)]
+            gap_before_us = np.where(found, np.minimum(gap_before_us, gap), gap_before_us)
+
+            position = np.searchsorted(starts, slot_ends, side="left")
+            found = position < index.size
+            gap = starts[np.minimum(position, index.size - 1)] - slot_ends
+            gap_after_us = np.where(found, np.minimum(gap_after_us, gap), gap_after_us)
+
+        # 3. Window counts over busy slots near the batch
+        lo, hi = index.window(window_start, window_end)
+        metrics_service.count("busy_slots_scanned", hi - lo)
+        busy_starts = np.asarray(index.starts[lo:hi], np.int64)
+        busy_ends = np.asarray(index.ends[lo:hi], np.int64)
+        busy_days = np.asarray(index.start_days[lo:hi], np.int64)
+
+        same_day_count = np.zeros(slot_count, np.int64)
+        close_count = np.zeros(slot_count, np.int64)
+        nearby_count = np.zeros(slot_count, np.int64)
+        density_count = np.zeros(slot_count, np.int64)
+        fills_middle_gap = np.zeros(slot_count, bool)
+
+        if busy_starts.size:
+            for first in range(0, slot_count, chunk):
+                rows = slice(first, first + chunk)
+                starts_col = slot_starts[rows, None]
+                ends_col = slot_ends[rows, None]
+
+                edge_gap = np.minimum(
+                    np.abs(starts_col - busy_ends),
+                    np.abs(busy_starts - ends_col),
+                )
+                same_day = slot_days[rows, None] == busy_days
+
+                same_day_count[rows] = same_day.sum(axis=1)
+                close_count[rows] = (same_day & (edge_gap <= 240 * MICROSECONDS_PER_MINUTE)).sum(axis=1)
+                nearby_count[rows] = (np.abs(starts_col - busy_starts) <= _DAY_US).sum(axis=1)
+                density_count[rows] = (edge_gap <= 120 * MICROSECONDS_PER_MINUTE).sum(axis=1)
+                fills_middle_gap[rows] = (
+                    (same_day & (busy_ends < starts_col)).any(axis=1)
+                    & (same_day & (busy_starts > ends_col)).any(axis=1)
+                )
+
+        # Fragmentation (mirrors OptimizationAgent._calculate_fragmentation)
+        fragmentation = np.select(
+            [close_count >= 2, close_count == 1, same_day_count >= 1, nearby_count >= 1],
+            [0.90 + np.minimum(close_count * 0.05, 0.10), 0.75, 0.55, 0.40],
+            default=0.30,
+        )
+        fragmentation_sum = fragmentation_sum + fragmentation
+
+        # Density (mirrors OptimizationAgent._calculate_density_score)
+        density = np.select(
+            [density_count == 0, density_count == 1, density_count == 2],
+            [100.0, 80.0, 60.0],
+            default=40.0,
+        )
+        density_sum = density_sum + density
+
+        # Same-day gap bonus (mirrors OptimizationAgent._calculate_same_day_gap_bonus);
+        # the category bonus is the same for every participant, so it is
+        # added to the maximum later
+        bonus = np.where(
+            same_day_count > 0,
+            5.0 + np.where(fills_middle_gap, 3.0, 0.0),
+            0.0,
+        )
+        max_bonus = np.maximum(max_bonus, bonus)
+        has_same_day |= same_day_count > 0
+
+    # Availability factor (mirrors OptimizationAgent._calculate_availability_factor)
+    required_total = sum(1 for p in participants if p.is_required)
+    optional_total = len(participants) - required_total
+    required_ratio = required_available / required_total if required_total else np.ones(slot_count)
+    optional_ratio = optional_available / optional_total if optional_total else np.ones(slot_count)
+    availability_factor = np.where(
+        required_ratio == 1.0,
+        0.70 + 0.30 * optional_ratio,
+        0.50 * required_ratio,
+    )
+
+    no_gap = np.iinfo(np.int64).max
+    participant_count = len(participants)
+
+    return {
+        "slot_hours": slot_hours,
+        "availability_factor": availability_factor,
+        "required_available": required_available,
+        "optional_available": optional_available,
+        "required_total": required_total,
+        "optional_total": optional_total,
+        "required_ratio": required_ratio,
+        "optional_ratio": optional_ratio,
+        "required_conflicts": required_conflicts,
+        "min_gap_before": np.where(gap_before_us == no_gap, np.inf, _to_minutes(gap_before_us)),
+        "min_gap_after": np.where(gap_after_us == no_gap, np.inf, _to_minutes(gap_after_us)),
+        "has_overlap": has_overlap,
+        "fragmentation_factor": (
+            fragmentation_sum / participant_count if participant_count else np.full(slot_count, 0.5)
+        ),
+        "density_score": (
+            density_sum / participant_count if participant_count else np.full(slot_count, 50.0)
+        ),
+        "gap_bonus_base": max_bonus,
+        "has_same_day": has_same_day,
+    }
+
+
+def apply_constraints(
+    facts: Dict[str, Any],
+    constraints: SchedulingConstraints,
+) -> Dict[str, Any]:
+    """
+    Turn slot facts into scoring factors for one set of constraints.
+
+    Only the buffer (conflict proximity), working hours and event category
+    (same-day gap bonus) enter here, so relaxing them re-uses the facts.
+
+    Args:
+        facts: Output of compute_slot_facts (or take_rows)
+        constraints: Scheduling constraints
+
+    Returns:
+        The facts plus:
+        - proximity_factor, same_day_gap_bonus
+    """
+    # Conflict proximity factor (mirrors OptimizationAgent._calculate_conflict_proximity)
+    has_overlap = facts["has_overlap"]
+    min_gap = np.minimum(facts["min_gap_before"], facts["min_gap_after"])
+    buffer_minutes = constraints.buffer_minutes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        proximity_factor = np.select(
+            [
+                has_overlap,
+                np.isinf(min_gap),
+                min_gap >= buffer_minutes,
+                min_gap >= 5,
+            ],
+            [
+                0.15,
+                1.0,
+                0.85 + 0.10 * np.minimum(min_gap / 60, 1.0),
+                0.60 + 0.25 * (min_gap / buffer_minutes),
+            ],
+            default=0.35 + 0.25 * (min_gap / 5.0),
+        )
+
+    meeting_bonus = 1.0 if constraints.event_category == EventCategory.MEETING else 0.0
+    slot_hours = facts["slot_hours"]
+    is_office_hours = (
+        (constraints.working_hours_start <= slot_hours)
+        & (slot_hours < constraints.working_hours_end)
+    )
+    max_bonus = np.where(facts["has_same_day"], facts["gap_bonus_base"] + meeting_bonus, 0.0)
+
+    return {
+        **facts,
+        "proximity_factor": proximity_factor,
+        "same_day_gap_bonus": np.where(is_office_hours, np.minimum(8.0, max_bonus), 0.0),
+    }
+
+
+def take_rows(facts: Dict[str, Any], rows: Sequence[int]) -> Dict[str, Any]:
+    """
+    Select the facts of a subset of slots, in the given order.
+
+    Args:
+        facts: Output of compute_slot_facts
+        rows: Positions of the wanted slots in the fact arrays
+
+    Returns:
+        Facts for exactly those slots
+    """
+    index = np.asarray(rows, np.int64)
+    subset = {}
+    for key, value in facts.items():
+        if key == "required_conflicts":
+            subset[key] = [row[index] for row in value]
+        elif isinstance(value, np.ndarray):
+            subset[key] = value[index]
+        else:
+            subset[key] = value
+    return subset
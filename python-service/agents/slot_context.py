@@ -0,0 +1,154 @@
+"""Slot Context: Single-pass busy-slot facts shared by the scoring factors."""
+
+from typing import List, Optional
+from schemas.scheduling import Participant, TimeSlot
+from agents.busy_index import (
+    BusyIndex,
+    CONTEXT_REACH_US,
+    MICROSECONDS_PER_MINUTE,
+    to_epoch_us,
+    to_minutes,
+)
+
+
+_DAY_US = 24 * 60 * MICROSECONDS_PER_MINUTE
+_CLOSE_US = 240 * MICROSECONDS_PER_MINUTE  # Fragmentation "close" window (4h)
+_DENSE_US = 120 * MICROSECONDS_PER_MINUTE  # Density "nearby" window (2h)
+
+
+class ParticipantSlotContext:
+    """
+    Busy-slot facts about one candidate slot for one participant.
+
+    Attributes:
+        overlap: Slot overlaps one of the participant's busy slots
+        gap_before: Minutes since the latest busy slot ending before the slot
+        gap_after: Minutes until the earliest busy slot starting after the slot
+        same_day_count: Busy slots starting on the slot's date
+        close_count: Same-day busy slots within 4 hours of the slot
+        nearby_count: Busy slots starting within 24 hours of the slot start
+        density_count: Busy slots within 2 hours of the slot
+        fills_middle_gap: Slot sits between two same-day busy slots
+    """
+
+    __slots__ = (
+        "overlap",
+        "gap_before",
+        "gap_after",
+        "same_day_count",
+        "close_count",
+        "nearby_count",
+        "density_count",
+        "fills_middle_gap",
+    )
+
+    def __init__(self, index: BusyIndex, start: int, end: int, day: int):
+        """
+        Args:
+            index: Participant's busy index
+            start: Slot start in epoch microseconds
+            end: Slot end in epoch microseconds
+            day: Ordinal of the slot's start date
+        """
+        self.overlap = index.overlaps(start, end)
+
+        gap_before = index.gap_before(start)
+        gap_after = index.gap_after(end)
+        self.gap_before = to_minutes(gap_before) if gap_before is not None else float('inf')
+        self.gap_after = to_minutes(gap_after) if gap_after is not None else float('inf')
+
+        same_day_count = 0
+        close_count = 0
+        nearby_count = 0
+        density_count = 0
+        has_before = False
+        has_after = False
+
+        # Single pass over the busy slots that can reach any counting window
+        starts = index.starts
+        ends = index.ends
+        start_days = index.start_days
+        lo, hi = index.window(start - CONTEXT_REACH_US, end + CONTEXT_REACH_US)
+        for position in range(lo, hi):
+            busy_start = starts[position]
+            busy_end = ends[position]
+            edge_gap = min(abs(start - busy_end), abs(busy_start - end))
+
+            if start_days[position] == day:
+                same_day_count += 1
+                if edge_gap <= _CLOSE_US:
+                    close_count += 1
+                if busy_end < start:
+                    has_before = True
+                if busy_start > end:
+                    has_after = True
+
+            if abs(start - busy_start) <= _DAY_US:
+                nearby_count += 1
+            if edge_gap <= _DENSE_US:
+                density_count += 1
+
+        self.same_day_count = same_day_count
+        self.close_count = close_count
+        self.nearby_count = nearby_count
+        self.density_count = density_count
+        self.fills_middle_gap = has_before and has_after
+
+
+class SlotContext:
+    """
+    Busy-slot facts about one candidate slot, computed once for all factors.
+
+    Availability, conflict proximity, fragmentation, density and the
+    same-day gap bonus all read from the same context instead of each
+    re-scanning every participant's busy slots.
+    """
+
+    __slots__ = ("slot", "start", "end", "day", "participants")
+
+    def __init__(self, slot: TimeSlot, participants: List[Participant]):
+        """
+        Args:
+            slot: Candidate time slot
+            participants: Participants in evaluation order
+        """
+        self.slot = slot
+        self.start = to_epoch_us(slot.start)
+        self.end = to_epoch_us(slot.end)
+        self.day = slot.start.toordinal()
+        self.participants: List[ParticipantSlotContext] = [
+            ParticipantSlotContext(
+                BusyIndex.for_summary(participant.calendar_summary),
+                self.start,
+                self.end,
+                self.day,
+            )
+            for participant in participants
+        ]
+
+    @classmethod
+    def ensure(
+        cls,
+        context: Optional["SlotContext"],
+        slot: TimeSlot,
+        participants: List[Participant],
+    ) -> "SlotContext":
+        """Return ``context`` if given, otherwise build one for the slot."""
+        if context is None:
+            context = cls(slot, participants)
+        return context
+
+    @property
+    def has_overlap(self) -> bool:
+        """Any participant has a busy slot overlapping the candidate."""
+        return any(p.overlap for p in self.participants)
+
+    @property
+    def min_gap_before(self) -> float:
+        """Smallest gap (minutes) since a busy slot ended, across participants."""
+        return min((p.gap_before for p in self.participants), default=float('inf'))
+
+    @property
+    def min_gap_after(self) -> float:
+        """Smallest gap (minutes) until a busy slot starts, across participants."""
+        return min((p.gap_after for p in self.participants), default=float('inf'))
@@ -0,0 +1,319 @@
+"""Timezone Engine: Cached UTC-offset transitions for bulk local-time lookups."""
+
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Collection, Dict, List, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from schemas.scheduling import TimeSlot
+from agents.busy_index import MICROSECONDS_PER_MINUTE, to_epoch_us
+from agents.interval_set import IntervalSet
+
+# Lazy import so local-time lookups keep working without NumPy
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# 1970-01-01 was a Thursday: local epoch minute m falls on minute
+# (m + _EPOCH_WEEK_SHIFT) % MINUTES_PER_WEEK of a Monday-based week
+_EPOCH_WEEK_SHIFT = 3 * MINUTES_PER_DAY
+
+# Offsets are sampled at this step when a table is built; real zones never
+# change their offset twice within it
+_SAMPLE_MINUTES = 6 * 60
+
+# Offset tables kept at once (one per distinct zone and year range)
+MAX_TABLES = 256
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _zone(name: str):
+    """Get the tzinfo of a timezone name (unknown names are treated as UTC)."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        # OSError: names of tzdata directories ("America") or too long for a path
+        return timezone.utc
+
+
+def _offset_minutes(tz, minute: int) -> int:
+    """UTC offset of a timezone at an epoch minute, in whole minutes."""
+    offset = (_EPOCH + timedelta(minutes=minute)).astimezone(tz).utcoffset()
+    return int(offset.total_seconds() // 60)
+
+
+def _year_start(year: int) -> int:
+    """Epoch minute of January 1st (UTC) of a year."""
+    return int((datetime(year, 1, 1, tzinfo=timezone.utc) - _EPOCH).total_seconds() // 60)
+
+
+class OffsetTable:
+    """
+    UTC offsets of one timezone over whole UTC years.
+
+    The zone is converted with ``zoneinfo`` only while the table is built:
+    offsets are sampled every few hours and each change is narrowed down
+    to the exact minute, leaving a sorted list of transitions. Converting
+    an epoch minute is then one bisection (or ``searchsorted`` over a
+    whole array) plus an addition.
+
+    Attributes:
+        zone: Timezone name
+        start: First covered epoch minute (January 1st of the first year)
+        end: First epoch minute after the covered range
+        transitions: Epoch minutes at which an offset starts (the first
+            is ``start``)
+        offsets: UTC offset in minutes from each transition on
+    """
+
+    __slots__ = ("zone", "start", "end", "transitions", "offsets", "_arrays")
+
+    def __init__(self, zone: str, first_year: int, last_year: int):
+        """
+        Args:
+            zone: IANA timezone name
+            first_year: First UTC year covered
+            last_year: Last UTC year covered
+        """
+        tz = _zone(zone)
+        self.zone = zone
+        self.start = _year_start(first_year)
+        self.end = _year_start(last_year + 1)
+        self.transitions: List[int] = [self.start]
+        self.offsets: List[int] = [_offset_minutes(tz, self.start)]
+
+        previous = self.start
+        for sample in range(self.start + _SAMPLE_MINUTES, self.end + _SAMPLE_MINUTES, _SAMPLE_MINUTES):
+            sample = min(sample, self.end - 1)
+            if _offset_minutes(tz, sample) != self.offsets[-1]:
+                # The offset changed within (previous, sample]: find the minute
+                low, high = previous, sample
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if _offset_minutes(tz, middle) == self.offsets[-1]:
+                        low = middle
+                    else:
+                        high = middle
+                self.transitions.append(high)
+                self.offsets.append(_offset_minutes(tz, high))
+            previous = sample
+        self._arrays = None
+
+    def offset_at(self, minute: int) -> int:
+        """Get the UTC offset (minutes) at an epoch minute."""
+        return self.offsets[max(0, bisect_right(self.transitions, minute) - 1)]
+
+    def local_minutes(self, minutes: Sequence[int]):
+        """
+        Convert epoch minutes to local wall-clock epoch minutes.
+
+        Args:
+            minutes: UTC epoch minutes (inside the covered years)
+
+        Returns:
+            Local epoch minutes: a NumPy int64 array, or a list without NumPy
+        """
+        if np is None:
+            return [minute + self.offset_at(minute) for minute in minutes]
+        if self._arrays is None:
+            self._arrays = (
+                np.array(self.transitions, dtype=np.int64),
+                np.array(self.offsets, dtype=np.int64),
+            )
+        transitions, offsets = self._arrays
+        minutes = np.asarray(minutes, dtype=np.int64)
+        positions = np.maximum(np.searchsorted(transitions, minutes, side="right") - 1, 0)
+        return minutes + offsets[positions]
+
+
+_tables: Dict[Tuple[str, int, int], OffsetTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(zone: str, first_year: int, last_year: int) -> OffsetTable:
+    """
+    Get the shared offset table of a zone, creating it on first use.
+
+    Args:
+        zone: IANA timezone name
+        first_year: First UTC year the table must cover
+        last_year: Last UTC year the table must cover
+
+    Returns:
+        The table for (zone, first_year, last_year)
+    """
+    key = (zone, first_year, last_year)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            # Oldest tables go first; a dropped table is simply rebuilt
+            while len(_tables) >= MAX_TABLES:
+                del _tables[next(iter(_tables))]
+            table = _tables[key] = OffsetTable(zone, first_year, last_year)
+        return table
+
+
+def clear_tables() -> None:
+    """Drop every shared table (frees memory; never needed for correctness)."""
+    with _tables_lock:
+        _tables.clear()
+
+
+def _year_of(minute: int) -> int:
+    """UTC year of an epoch minute."""
+    return (_EPOCH + timedelta(minutes=minute)).year
+
+
+def epoch_minutes(slots: Sequence[TimeSlot]) -> List[int]:
+    """Get the UTC epoch minute of each slot's start."""
+    return [to_epoch_us(slot.start) // MICROSECONDS_PER_MINUTE for slot in slots]
+
+
+def week_minutes(minutes: Sequence[int], zone: str):
+    """
+    Map UTC epoch minutes to local minutes of the week in bulk.
+
+    The offset table covers the years the minutes span and is shared by
+    every later call for the same zone, so a batch costs one vectorized
+    lookup per distinct timezone rather than a ``zoneinfo`` conversion per
+    slot and participant.
+
+    Args:
+        minutes: UTC epoch minutes (e.g. from epoch_minutes)
+        zone: IANA timezone name (unknown names are treated as UTC)
+
+    Returns:
+        Local minute of the week (Monday 00:00 is 0) per input minute: a
+        NumPy int64 array, or a list without NumPy
+    """
+    if len(minutes) == 0:
+        return np.zeros(0, dtype=np.int64) if np is not None else []
+    table = get_table(zone, _year_of(min(minutes)), _year_of(max(minutes)))
+    local = table.local_minutes(minutes)
+    if np is None:
+        return [(minute + _EPOCH_WEEK_SHIFT) % MINUTES_PER_WEEK for minute in local]
+    return (local + _EPOCH_WEEK_SHIFT) % MINUTES_PER_WEEK
+
+
+def local_fields(minutes: Sequence[int], zone: str) -> Tuple[List[int], List[int]]:
+    """
+    Map UTC epoch minutes to local weekdays and hours in bulk.
+
+    Args:
+        minutes: UTC epoch minutes
+        zone: IANA timezone name
+
+    Returns:
+        Tuple of (weekday with Monday as 0, hour of day) lists
+    """
+    week = week_minutes(minutes, zone)
+    if np is None:
+        return (
+            [minute // MINUTES_PER_DAY for minute in week],
+            [minute % MINUTES_PER_DAY // 60 for minute in week],
+        )
+    return (week // MINUTES_PER_DAY).tolist(), (week % MINUTES_PER_DAY // 60).tolist()
+
+
+def local_offset(value: datetime, zone: str) -> int:
+    """
+    Get a timezone's UTC offset (minutes) at one instant.
+
+    Args:
+        value: Instant (naive datetimes are read as UTC)
+        zone: IANA timezone name
+
+    Returns:
+        Offset in minutes
+    """
+    minute = to_epoch_us(value) // MICROSECONDS_PER_MINUTE
+    year = _year_of(minute)
+    return get_table(zone, year, year).offset_at(minute)
+
+
+def working_intervals(
+    zone: str,
+    first_day: date,
+    last_day: date,
+    start_hour: int,
+    end_hour: int,
+    weekdays: Collection[int],
+) -> IntervalSet:
+    """
+    Get a timezone's daily working hours as UTC intervals.
+
+    Each allowed local day contributes [start_hour:00, end_hour:00) on the
+    zone's wall clock, so the intervals follow the zone's DST changes.
+
+    Args:
+        zone: IANA timezone name (unknown names are treated as UTC)
+        first_day: First local date
+        last_day: Last local date (inclusive)
+        start_hour: Local start hour
+        end_hour: Local end hour (days with end_hour <= start_hour are empty)
+        weekdays: Allowed local weekdays (Monday is 0)
+
+    Returns:
+        Working hours in epoch microseconds
+    """
+    tz = _zone(zone)
+    intervals: List[Tuple[int, int]] = []
+    day = first_day
+    while day <= last_day:
+        if day.weekday() in weekdays:
+            intervals.append((
+                to_epoch_us(datetime.combine(day, time(start_hour), tzinfo=tz)),
+                to_epoch_us(datetime.combine(day, time(end_hour), tzinfo=tz)),
+            ))
+        day += timedelta(days=1)
+    return IntervalSet(intervals)
+
+
+_fixed_zones: Dict[int, timezone] = {0: timezone.utc}
+
+
+def _fixed_zone(offset: int) -> timezone:
+    """Get a fixed-offset tzinfo (shared per offset)."""
+    tz = _fixed_zones.get(offset)
+    if tz is None:
+        tz = _fixed_zones[offset] = timezone(timedelta(minutes=offset))
+    return tz
+
+
+def local_slot(slot: TimeSlot, zone: str) -> TimeSlot:
+    """
+    Express a slot in a participant's timezone.
+
+    The result is the same instant with start and end carrying the zone's
+    offset at the slot start, so ``start.hour`` / ``start.weekday()`` read
+    the participant's wall clock while durations and comparisons are
+    unchanged.
+
+    Args:
+        slot: Time slot
+        zone: IANA timezone name
+
+    Returns:
+        Local copy of the slot (the slot itself if it already has that offset)
+    """
+    start, end = slot.start, slot.end
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+        end = end.replace(tzinfo=timezone.utc) if end.tzinfo is None else end
+    tz = _fixed_zone(local_offset(start, zone))
+    if start.utcoffset() == tz.utcoffset(None) and start is slot.start:
+        return slot
+    return TimeSlot.model_construct(
+        start=start.astimezone(tz),
+        end=end.astimezone(tz),
+        timezone=zone,
+    )
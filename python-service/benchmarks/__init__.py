@@ -0,0 +1,26 @@
+"""
+Benchmarks for the scheduling service.
+
+Seeded generators build realistic requests (busy density, calendar span,
+timezones, event categories; see generators.SCENARIOS) and every case
+times one stage on them: POST /schedule end to end, the whole pipeline,
+request decoding and each agent (see cases.CASES). Results are JSON so
+runs of two commits can be compared:
+
+    python -m benchmarks run --output before.json
+    python -m benchmarks run --output after.json
+    python -m benchmarks compare before.json after.json
+"""
+
+from benchmarks.generators import SCENARIOS, Scenario, generate_request, generate_request_payload
+from benchmarks.runner import compare, measure, run_benchmarks
+
+__all__ = [
+    "SCENARIOS",
+    "Scenario",
+    "compare",
+    "generate_request",
+    "generate_request_payload",
+    "measure",
+    "run_benchmarks",
+]
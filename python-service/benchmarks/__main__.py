@@ -0,0 +1,83 @@
+"""
+Command line entry point.
+
+    python -m benchmarks run [--scenarios small,team] [--cases pipeline,availability]
+                             [--repeat 5] [--sample-seconds 0.1] [--output results.json]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.05] [--fail-slower]
+    python -m benchmarks list
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+
+from benchmarks.cases import CASES
+from benchmarks.generators import SCENARIOS
+from benchmarks.runner import DEFAULT_THRESHOLD, compare, format_comparison, run_benchmarks
+
+
+def _names(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated option (None keeps the default: everything)."""
+    return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark command line; returns the exit status."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Scheduling service benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmarks and write JSON results")
+    run.add_argument("--scenarios", help="Comma-separated scenario names (default: all)")
+    run.add_argument("--cases", help="Comma-separated case names (default: all)")
+    run.add_argument("--repeat", type=int, default=5, help="Samples per case (default: 5)")
+    run.add_argument("--sample-seconds", type=float, default=0.1, help="Target seconds per sample")
+    run.add_argument("--output", help="Write the JSON results to this file")
+
+    diff = commands.add_parser("compare", help="Compare two JSON results files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="Relative median change treated as noise (default: 0.05)")
+    diff.add_argument("--fail-slower", action="store_true", help="Exit with 1 if any case got slower")
+
+    commands.add_parser("list", help="List scenarios and cases")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        for name, scenario in SCENARIOS.items():
+            print(f"scenario {name}: {scenario.model_dump_json()}")
+        for name, factory in CASES.items():
+            print(f"case {name}: {factory.__doc__}")
+        return 0
+
+    if args.command == "run":
+        # Failing cases are recorded in the results; skip the pipeline's tracebacks
+        logging.getLogger("services.scheduling_pipeline").setLevel(logging.CRITICAL)
+        try:
+            results = run_benchmarks(
+                _names(args.scenarios), _names(args.cases), args.repeat, args.sample_seconds,
+                log=lambda line: print(line, file=sys.stderr),
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print(format_comparison(rows))
+    return 1 if args.fail_slower and any(row["verdict"] == "slower" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
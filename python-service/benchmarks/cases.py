@@ -0,0 +1,172 @@
+"""Benchmark cases: end-to-end /schedule and per-agent micro-benchmarks."""
+
+import json
+from typing import Any, Callable, Dict
+
+from schemas.scheduling import ScheduleRequest
+from agents.availability_agent import AvailabilityAgent
+from agents.busy_index import BusyIndex
+from agents.negotiation_agent import NegotiationAgent
+from agents.optimization_agent import OptimizationAgent
+from agents.preference_surface import PreferenceSurface
+from benchmarks.generators import Scenario, generate_request_payload
+from services import calendar_cache_service, request_decoder, scheduling_pipeline
+
+
+class Workload:
+    """
+    One scenario's generated request, shared by every case.
+
+    Intermediate results (available slots, ranked candidates) are computed
+    once and fed to the cases of later stages, so each micro-benchmark
+    times only its own agent.
+
+    Attributes:
+        scenario: Scenario the request was generated from
+        payload: JSON-compatible request body
+        body: Encoded request body
+        request: Validated request (busy indexes built on first use)
+    """
+
+    def __init__(self, scenario: Scenario):
+        self.scenario = scenario
+        self.payload = generate_request_payload(scenario)
+        self.body = json.dumps(self.payload).encode()
+        self.request = ScheduleRequest.model_validate_json(self.body)
+        self._available_slots = None
+        self._ranked = None
+
+    @property
+    def available_slots(self):
+        if self._available_slots is None:
+            self._available_slots = AvailabilityAgent.find_available_slots(
+                self.request.participants, self.request.constraints
+            )
+        return self._available_slots
+
+    @property
+    def ranked(self):
+        if self._ranked is None:
+            self._ranked = OptimizationAgent.rank_candidates(
+                self.available_slots, self.request.participants, self.request.constraints
+            )
+        return self._ranked
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the generated request for the results file."""
+        return {
+            "participants": len(self.request.participants),
+            "busy_slots": sum(len(p.calendar_summary.busy_slots) for p in self.request.participants),
+            "body_bytes": len(self.body),
+            "event_category": self.request.constraints.event_category.value,
+        }
+
+
+def _decode_pydantic(workload: Workload) -> Callable[[], Any]:
+    """Plain pydantic validation of the body plus busy index builds."""
+    def run() -> None:
+        request = ScheduleRequest.model_validate_json(workload.body)
+        for participant in request.participants:
+            BusyIndex.for_summary(participant.calendar_summary)
+    return run
+
+
+def _decode_compact(workload: Workload) -> Callable[[], Any]:
+    """Compact decoding of the body plus busy index builds."""
+    def run() -> None:
+        request = request_decoder.decode_schedule_request(workload.body)
+        for participant in request.participants:
+            BusyIndex.for_summary(participant.calendar_summary)
+    return run
+
+
+def _calendar_hash(workload: Workload) -> Callable[[], Any]:
+    """Calendar cache hashes of every (indexed) summary."""
+    summaries = [p.calendar_summary for p in workload.request.participants]
+
+    def run() -> None:
+        for summary in summaries:
+            calendar_cache_service.summary_hash(summary)
+    return run
+
+
+def _availability(workload: Workload) -> Callable[[], Any]:
+    """AvailabilityAgent.find_available_slots (busy indexes already built)."""
+    request = workload.request
+
+    def run() -> None:
+        AvailabilityAgent.find_available_slots(request.participants, request.constraints)
+    return run
+
+
+def _preference(workload: Workload) -> Callable[[], Any]:
+    """Group preference scores of every available slot (fresh surface per run)."""
+    request = workload.request
+    slots = workload.available_slots
+
+    def run() -> None:
+        PreferenceSurface(request.participants, request.constraints.event_category).scores(slots)
+    return run
+
+
+def _optimization(workload: Workload) -> Callable[[], Any]:
+    """OptimizationAgent.rank_candidates over the available slots."""
+    request = workload.request
+    slots = workload.available_slots
+
+    def run() -> None:
+        OptimizationAgent.rank_candidates(slots, request.participants, request.constraints)
+    return run
+
+
+def _negotiation(workload: Workload) -> Callable[[], Any]:
+    """NegotiationAgent.negotiate_schedule over the ranked candidates."""
+    request = workload.request
+    ranked = workload.ranked
+
+    def run() -> None:
+        NegotiationAgent.negotiate_schedule(
+            [candidate.model_copy() for candidate in ranked], request.participants, request.constraints
+        )
+    return run
+
+
+def _pipeline(workload: Workload) -> Callable[[], Any]:
+    """The whole agent pipeline on a validated request."""
+    request = workload.request
+
+    def run() -> None:
+        scheduling_pipeline.run_schedule(request)
+    return run
+
+
+def _http_schedule(workload: Workload) -> Callable[[], Any]:
+    """POST /schedule through the ASGI app: decoding, caches, executor, encoding."""
+    # Lazy imports: the app (and the test client's httpx) only load when needed
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)
+    headers = {"content-type": "application/json"}
+
+    def run() -> None:
+        response = client.post("/schedule", content=workload.body, headers=headers)
+        if response.status_code != 200:
+            raise scheduling_pipeline.SchedulingError(
+                status_code=response.status_code, detail=response.text[:200]
+            )
+    return run
+
+
+# Case name -> factory taking the workload and returning the callable to time
+CASES: Dict[str, Callable[[Workload], Callable[[], Any]]] = {
+    "http_schedule": _http_schedule,
+    "pipeline": _pipeline,
+    "decode_pydantic": _decode_pydantic,
+    "decode_compact": _decode_compact,
+    "calendar_hash": _calendar_hash,
+    "availability": _availability,
+    "preference": _preference,
+    "optimization": _optimization,
+    "negotiation": _negotiation,
+}
@@ -0,0 +1,241 @@
+"""Seeded generators of realistic scheduling requests for benchmarks."""
+
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from pydantic import BaseModel, Field
+
+from schemas.scheduling import DayOfWeek, EventCategory, ScheduleRequest
+
+
+# Monday; calendars and scheduling windows are laid out from here
+BASE_DATE = date(2026, 3, 2)
+
+# Meeting lengths in minutes, weighted towards half-hour and hour meetings
+MEETING_DURATIONS = [15, 30, 30, 30, 45, 60, 60, 60, 90, 120]
+
+WEEKDAYS = [
+    DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY, DayOfWeek.THURSDAY,
+    DayOfWeek.FRIDAY, DayOfWeek.SATURDAY, DayOfWeek.SUNDAY,
+]
+
+
+class Scenario(BaseModel):
+    """Shape of a generated scheduling request."""
+    name: str = Field(..., description="Scenario identifier")
+    participants: int = Field(..., ge=1, description="Number of participants")
+    meetings_per_day: float = Field(
+        default=5.0,
+        ge=0.0,
+        description="Average busy slots per participant and working day (busy density)"
+    )
+    span_days: int = Field(
+        default=28,
+        ge=1,
+        description="Days of calendar history and future covered by busy slots"
+    )
+    window_days: int = Field(
+        default=7,
+        ge=1,
+        description="Length of the scheduling window (inside the calendar span)"
+    )
+    timezones: List[str] = Field(
+        default_factory=lambda: ["UTC"],
+        description="IANA timezones participants are spread over"
+    )
+    categories: List[EventCategory] = Field(
+        default_factory=lambda: [EventCategory.MEETING],
+        description="Event categories; the request's category is drawn from these"
+    )
+    duration_minutes: int = Field(default=30, description="Requested meeting duration")
+    buffer_minutes: int = Field(default=0, description="Requested buffer around meetings")
+    optional_ratio: float = Field(
+        default=0.25,
+        ge=0.0,
+        le=1.0,
+        description="Share of optional participants"
+    )
+    seed: int = Field(default=0, description="Random seed; equal scenarios generate equal requests")
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(name="small", participants=3, meetings_per_day=4, span_days=28, window_days=7),
+        Scenario(
+            name="team",
+            participants=8,
+            meetings_per_day=6,
+            span_days=60,
+            window_days=14,
+            timezones=["Europe/London", "Europe/Berlin", "America/New_York"],
+            categories=[EventCategory.MEETING, EventCategory.WORK],
+            seed=1,
+        ),
+        Scenario(
+            name="cross_timezone",
+            participants=12,
+            meetings_per_day=5,
+            span_days=60,
+            window_days=14,
+            timezones=[
+                "America/Los_Angeles", "America/New_York", "Europe/London",
+                "Europe/Berlin", "Asia/Kolkata", "Asia/Tokyo",
+            ],
+            categories=[EventCategory.MEETING, EventCategory.SOCIAL],
+            duration_minutes=60,
+            seed=2,
+        ),
+        Scenario(
+            name="large",
+            participants=30,
+            meetings_per_day=4,
+            span_days=120,
+            window_days=14,
+            timezones=["Europe/London", "Europe/Berlin", "America/New_York", "Asia/Kolkata"],
+            categories=[EventCategory.MEETING, EventCategory.FOCUS_TIME, EventCategory.WORK],
+            buffer_minutes=10,
+            optional_ratio=0.8,
+            seed=3,
+        ),
+        Scenario(
+            name="payload_2mb",
+            participants=40,
+            meetings_per_day=4,
+            span_days=180,
+            window_days=14,
+            timezones=["Europe/London", "Europe/Berlin", "America/New_York", "Asia/Kolkata"],
+            categories=[EventCategory.MEETING],
+            optional_ratio=0.8,
+            seed=4,
+        ),
+    ]
+}
+
+
+def generate_request_payload(scenario: Scenario) -> Dict[str, Any]:
+    """
+    Generate the JSON body of a /schedule request.
+
+    Calendars look like real work calendars: meetings on quarter hours
+    within each participant's local working day (daily stand-ups, weekly
+    recurring meetings and ad-hoc meetings, some overlapping), with slot
+    times sent in the participant's local UTC offset.
+
+    Args:
+        scenario: Request shape
+
+    Returns:
+        JSON-compatible request body (same scenario, same body)
+    """
+    rng = random.Random(f"{scenario.name}:{scenario.seed}")
+    span_start = BASE_DATE - timedelta(days=scenario.span_days // 2)
+    window_start = datetime.combine(BASE_DATE, time(0), tzinfo=timezone.utc)
+
+    optional_count = int(scenario.participants * scenario.optional_ratio)
+    participants = []
+    for i in range(scenario.participants):
+        user_id = f"user{i:03d}"
+        tz_name = scenario.timezones[i % len(scenario.timezones)]
+        participants.append({
+            "user_id": user_id,
+            "email": f"{user_id}@example.com",
+            "name": f"User {i}",
+            "is_required": i < scenario.participants - optional_count,
+            "calendar_summary": _calendar_summary(
+                rng, user_id, tz_name, span_start, scenario.span_days, scenario.meetings_per_day
+            ),
+        })
+
+    category = rng.choice(scenario.categories)
+    return {
+        "meeting_id": f"bench-{scenario.name}-{scenario.seed}",
+        "participants": participants,
+        "constraints": {
+            "duration_minutes": scenario.duration_minutes,
+            "earliest_date": window_start.isoformat(),
+            "latest_date": (window_start + timedelta(days=scenario.window_days)).isoformat(),
+            "buffer_minutes": scenario.buffer_minutes,
+            "event_category": category.value,
+        },
+    }
+
+
+def generate_request(scenario: Scenario) -> ScheduleRequest:
+    """Generate a validated scheduling request (see generate_request_payload)."""
+    return ScheduleRequest.model_validate(generate_request_payload(scenario))
+
+
+def _calendar_summary(
+    rng: random.Random,
+    user_id: str,
+    tz_name: str,
+    span_start: date,
+    span_days: int,
+    meetings_per_day: float,
+) -> Dict[str, Any]:
+    """Generate one participant's calendar summary."""
+    tz = ZoneInfo(tz_name)
+    day_start = rng.choice([7, 8, 8, 9, 9, 10])
+    day_end = day_start + rng.choice([8, 8, 9, 10])
+
+    # Recurring meetings: (weekday or None for every working day, start minute, length)
+    recurring = []
+    if rng.random() < 0.7:
+        recurring.append((None, day_start * 60 + rng.choice([0, 15, 30]), 15))
+    for _ in range(rng.randint(1, 4)):
+        recurring.append((
+            rng.randrange(5),
+            rng.randrange(day_start * 4, day_end * 4 - 2) * 15,
+            rng.choice([30, 60]),
+        ))
+
+    busy: List[Dict[str, str]] = []
+    hour_counts: Dict[int, int] = {}
+    for offset in range(span_days):
+        day = span_start + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        meetings = [(start, length) for weekday, start, length in recurring if weekday in (None, day.weekday())]
+        ad_hoc = max(0, round(rng.gauss(meetings_per_day - len(meetings), 1.5)))
+        for _ in range(ad_hoc):
+            meetings.append((
+                rng.randrange(day_start * 4, day_end * 4 - 1) * 15,
+                rng.choice(MEETING_DURATIONS),
+            ))
+        for start_minute, length in sorted(meetings):
+            start = datetime.combine(day, time(0), tzinfo=tz) + timedelta(minutes=start_minute)
+            busy.append({
+                "start": start.isoformat(),
+                "end": (start + timedelta(minutes=length)).isoformat(),
+                "timezone": tz_name,
+            })
+            hour_counts[start.hour] = hour_counts.get(start.hour, 0) + 1
+
+    weeks = max(1.0, span_days / 7)
+    return {
+        "user_id": user_id,
+        "timezone": tz_name,
+        "busy_slots": busy,
+        "weekly_meeting_count": round(len(busy) / weeks),
+        "peak_meeting_hours": sorted(hour_counts, key=lambda hour: -hour_counts[hour])[:3],
+        "preference_patterns": _preference_patterns(rng, day_start, day_end),
+        "compression_period_days": span_days,
+    }
+
+
+def _preference_patterns(rng: random.Random, day_start: int, day_end: int) -> Optional[Dict[str, Any]]:
+    """Generate learned preferences (none for some participants)."""
+    if rng.random() < 0.2:
+        return None
+    return {
+        "preferred_days": [day.value for day in rng.sample(WEEKDAYS[:5], rng.randint(2, 5))],
+        "preferred_hours_start": day_start + rng.choice([0, 1]),
+        "preferred_hours_end": min(23, day_end - rng.choice([0, 1, 2])),
+        "avg_meeting_duration_minutes": rng.choice([30, 45, 60]),
+        "buffer_minutes": rng.choice([0, 5, 10, 15]),
+        "avoids_back_to_back": rng.random() < 0.6,
+        "morning_person_score": round(rng.random(), 2),
+    }
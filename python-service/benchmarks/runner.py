@@ -0,0 +1,230 @@
+"""Benchmark runner: timing, JSON results and comparison between runs."""
+
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from benchmarks.cases import CASES, Workload
+from benchmarks.generators import SCENARIOS
+from services.scheduling_pipeline import SchedulingError
+
+# Results file format version (bump on incompatible changes)
+RESULTS_VERSION = 1
+
+# Changes of the median below this fraction are reported as unchanged
+DEFAULT_THRESHOLD = 0.05
+
+
+def measure(
+    func: Callable[[], Any],
+    repeat: int = 5,
+    sample_seconds: float = 0.1,
+    warmup: int = 1,
+) -> Dict[str, Any]:
+    """
+    Time a callable, pyperf style.
+
+    After ``warmup`` untimed calls the loop count is calibrated so one
+    sample lasts about ``sample_seconds``; each of the ``repeat`` samples
+    then times that many calls back to back and records the mean.
+
+    Args:
+        func: Callable to time
+        repeat: Number of samples
+        sample_seconds: Target duration of one sample
+        warmup: Untimed calls before calibration
+
+    Returns:
+        Per-call statistics in milliseconds plus loops and samples
+    """
+    for _ in range(warmup):
+        func()
+
+    start = time.perf_counter()
+    func()
+    single = time.perf_counter() - start
+    loops = max(1, min(10_000, math.ceil(sample_seconds / max(single, 1e-9))))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops * 1000)
+
+    return {
+        "loops": loops,
+        "samples_ms": [round(sample, 4) for sample in samples],
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_benchmarks(
+    scenarios: Optional[Iterable[str]] = None,
+    cases: Optional[Iterable[str]] = None,
+    repeat: int = 5,
+    sample_seconds: float = 0.1,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run benchmark cases over generated scenarios.
+
+    A case that fails (e.g. the pipeline rejects the generated request) is
+    recorded with its error instead of timings, so results stay comparable.
+
+    Args:
+        scenarios: Scenario names (default: all of SCENARIOS)
+        cases: Case names (default: all of CASES)
+        repeat: Samples per case
+        sample_seconds: Target duration of one sample
+        log: Called with a progress line after each case
+
+    Returns:
+        Results document: environment metadata, scenarios and case timings
+
+    Raises:
+        ValueError: For unknown scenario or case names
+    """
+    scenario_names = list(scenarios or SCENARIOS)
+    case_names = list(cases or CASES)
+    unknown = [name for name in scenario_names if name not in SCENARIOS]
+    unknown += [name for name in case_names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown scenarios or cases: {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "metadata": environment_metadata(),
+        "settings": {"repeat": repeat, "sample_seconds": sample_seconds},
+        "scenarios": {},
+        "benchmarks": [],
+    }
+    for scenario_name in scenario_names:
+        workload = Workload(SCENARIOS[scenario_name])
+        results["scenarios"][scenario_name] = {
+            **SCENARIOS[scenario_name].model_dump(mode="json"),
+            **workload.info(),
+        }
+        for case_name in case_names:
+            record: Dict[str, Any] = {"scenario": scenario_name, "case": case_name}
+            try:
+                record.update(measure(CASES[case_name](workload), repeat, sample_seconds))
+                record["status"] = "ok"
+            except SchedulingError as e:
+                record.update({"status": "error", "error": f"{e.status_code}: {e.detail}"})
+            except Exception as e:
+                record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+            results["benchmarks"].append(record)
+            if log is not None:
+                log(_format_record(record))
+    return results
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compare the median timings of two results documents.
+
+    Args:
+        baseline: Results of the reference run
+        current: Results of the run to check
+        threshold: Relative median change treated as noise
+
+    Returns:
+        One row per (scenario, case) present in either run, with
+        "change" (current / baseline median - 1) and a verdict of
+        "faster", "slower", "same", "new", "removed" or "error"
+    """
+    def index(results: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        return {(r["scenario"], r["case"]): r for r in results.get("benchmarks", [])}
+
+    before = index(baseline)
+    after = index(current)
+    rows = []
+    for key in list(before) + [k for k in after if k not in before]:
+        old = before.get(key)
+        new = after.get(key)
+        row: Dict[str, Any] = {"scenario": key[0], "case": key[1]}
+        if old is None or new is None:
+            row["verdict"] = "new" if old is None else "removed"
+        elif old.get("status") != "ok" or new.get("status") != "ok":
+            row["verdict"] = "error"
+            row["error"] = new.get("error") or old.get("error")
+        else:
+            change = new["median_ms"] / old["median_ms"] - 1 if old["median_ms"] else 0.0
+            row.update({
+                "baseline_ms": old["median_ms"],
+                "current_ms": new["median_ms"],
+                "change": round(change, 4),
+                "verdict": "same" if abs(change) < threshold else ("slower" if change > 0 else "faster"),
+            })
+        rows.append(row)
+    return rows
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """Describe the machine, interpreter, packages and commit of a run."""
+    metadata: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": {},
+        "environment": {k: v for k, v in os.environ.items() if k.startswith("SCHEDULER_")},
+    }
+    for package in ("numpy", "orjson", "pydantic", "fastapi"):
+        try:
+            metadata["packages"][package] = __import__(package).__version__
+        except (ImportError, AttributeError):
+            metadata["packages"][package] = None
+    try:
+        metadata["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+        metadata["git_dirty"] = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip())
+    except (OSError, subprocess.SubprocessError):
+        metadata["git_commit"] = None
+        metadata["git_dirty"] = None
+    return metadata
+
+
+def _format_record(record: Dict[str, Any]) -> str:
+    """One progress line for a case result."""
+    name = f"{record['scenario']:<16} {record['case']:<16}"
+    if record["status"] != "ok":
+        return f"{name} ERROR {' '.join(record['error'].split())[:100]}"
+    return (
+        f"{name} median {record['median_ms']:>10.3f} ms  "
+        f"min {record['min_ms']:>10.3f} ms  ±{record['stdev_ms']:.3f}  ({record['loops']} loops)"
+    )
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render compare() rows as a text table."""
+    lines = []
+    for row in rows:
+        name = f"{row['scenario']:<16} {row['case']:<16}"
+        if "change" in row:
+            lines.append(
+                f"{name} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms "
+                f"{row['change'] * 100:+7.1f}%  {row['verdict']}"
+            )
+        else:
+            detail = f" ({' '.join(row['error'].split())[:80]})" if row.get("error") else ""
+            lines.append(f"{name} {row['verdict']}{detail}")
+    return "\n".join(lines)
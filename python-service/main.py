@@ -1,17 +1,45 @@
 """FastAPI application for AI scheduling service."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from datetime import datetime
+from pydantic import ValidationError
 
-from schemas.scheduling import ScheduleRequest, ScheduleResponse, MeetingSlotCandidate
-from agents.availability_agent import AvailabilityAgent
-from agents.preference_agent import PreferenceAgent
-from agents.optimization_agent import OptimizationAgent
-from agents.negotiation_agent import NegotiationAgent
+from schemas.scheduling import (
+    BatchScheduleRequest,
+    CompressedCalendarSummary,
+    JointScheduleResponse,
+    ScheduleRequest,
+    ScheduleResponse,
+    MeetingSlotCandidate,
+    RerankRequest,
+)
+from agents.joint_scheduling_agent import CANDIDATE_POOL_SIZE, DEFAULT_TIME_BUDGET_MS
+from services import batch_service
+from services import calendar_cache_service
 from services import scaledown_service
+from services import executor_service
+from services import metrics_service
+from services import profiling_service
+from services import request_decoder
+from services import rerank_service
+from services import response_projection
+from services import scheduling_pipeline
+from services import streaming_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Shut the scheduling worker pool down with the application."""
+    yield
+    executor_service.shutdown()
 
 
 # Initialize FastAPI app
@@ -19,6 +47,7 @@ app = FastAPI(
     title="AI Meeting Scheduler - Brain Service",
     description="Stateless AI agent service for intelligent meeting scheduling",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -31,6 +60,85 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_duration(http_request: Request, call_next: Any) -> Any:
+    """Record each request's latency (until the response starts) for /metrics."""
+    start = time.perf_counter()
+    response = await call_next(http_request)
+    route = http_request.scope.get("route")
+    metrics_service.observe_http(
+        http_request.method,
+        getattr(route, "path", "unmatched"),
+        response.status_code,
+        time.perf_counter() - start,
+    )
+    return response
+
+
+async def decode_schedule_body(http_request: Request) -> ScheduleRequest:
+    """Decode a ScheduleRequest body with the compact busy-slot decoder."""
+    body = await http_request.body()
+    start = time.perf_counter()
+    try:
+        return request_decoder.decode_schedule_request(body)
+    except ValidationError as e:
+        raise _body_validation_error(e, body)
+    finally:
+        metrics_service.observe_stage("decode", time.perf_counter() - start)
+
+
+async def decode_batch_body(http_request: Request) -> BatchScheduleRequest:
+    """Decode a BatchScheduleRequest body with the compact busy-slot decoder."""
+    body = await http_request.body()
+    start = time.perf_counter()
+    try:
+        return request_decoder.decode_batch_request(body)
+    except ValidationError as e:
+        raise _body_validation_error(e, body)
+    finally:
+        metrics_service.observe_stage("decode", time.perf_counter() - start)
+
+
+def _body_validation_error(error: ValidationError, body: bytes) -> RequestValidationError:
+    """Report decoder validation errors like FastAPI's own body validation (422)."""
+    errors = []
+    for item in error.errors(include_url=False):
+        item["loc"] = ("body", *item["loc"])
+        errors.append(item)
+    return RequestValidationError(errors, body=body)
+
+
+def _request_body(model: type) -> Dict[str, Any]:
+    """OpenAPI request body for an endpoint that decodes its own body."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": f"#/components/schemas/{model.__name__}"}
+                }
+            },
+        }
+    }
+
+
+def custom_openapi() -> Dict[str, Any]:
+    """OpenAPI schema, including the request models of self-decoding endpoints."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    schema = get_openapi(title=app.title, version=app.version, description=app.description, routes=app.routes)
+    components = schema.setdefault("components", {}).setdefault("schemas", {})
+    for model in (ScheduleRequest, BatchScheduleRequest):
+        model_schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+        components.update(model_schema.pop("$defs", {}))
+        components[model.__name__] = model_schema
+    app.openapi_schema = schema
+    return schema
+
+
+app.openapi = custom_openapi
+
+
 @app.get("/")
 async def root() -> Dict[str, str]:
     """Health check endpoint."""
@@ -53,12 +161,29 @@ async def health_check() -> Dict[str, Any]:
             "optimization": "active",
             "negotiation": "active",
         },
+        "executor": executor_service.get_executor().stats(),
+        "calendar_cache": calendar_cache_service.get_cache().stats(),
+        "rerank_store": rerank_service.get_store().stats(),
         "timestamp": datetime.utcnow().isoformat(),
     }
 
 
-@app.post("/schedule", response_model=ScheduleResponse)
-async def schedule_meeting(request: ScheduleRequest) -> ScheduleResponse:
+@app.post(
+    "/schedule",
+    response_model=ScheduleResponse,
+    response_class=response_projection.ORJSONResponse,
+    openapi_extra=_request_body(ScheduleRequest),
+)
+async def schedule_meeting(
+    request: ScheduleRequest = Depends(decode_schedule_body),
+    x_scheduler_trace: Optional[str] = Header(default=None),
+    x_scheduler_profile: Optional[str] = Header(default=None),
+    stream: bool = Query(default=False),
+    accept: Optional[str] = Header(default=None),
+    fields: Optional[str] = Query(default=None),
+    verbosity: str = Query(default="full"),
+    rerank: bool = Query(default=False),
+) -> Union[response_projection.ORJSONResponse, StreamingResponse]:
     """
     Main scheduling endpoint that orchestrates all AI agents.
     
@@ -69,146 +194,339 @@ async def schedule_meeting(request: ScheduleRequest) -> ScheduleResponse:
     4. Negotiates conflicts if needed (Negotiation Agent)
     5. Returns ranked meeting slot candidates
     
+    The pipeline runs on the scheduling executor (process or thread pool),
+    keeping the event loop free; when the pool and its queue are full, or a
+    request misses its deadline, a 503 with Retry-After is returned.
+    
+    Requests are traced when sampled by SCHEDULER_TRACE_LEVEL /
+    SCHEDULER_TRACE_SAMPLE_RATE or when the X-Scheduler-Trace header is set;
+    header-triggered traces are returned under ``analytics["trace"]``.
+    
+    With ``?stream=true`` (or ``Accept: application/x-ndjson``) progress is
+    streamed as newline-delimited JSON: ranked candidates first, then each
+    compromise pass, then the full response (see streaming_service).
+    
+    Participants may send ``calendar_ref`` instead of ``calendar_summary``
+    for calendars the service has cached (see POST /calendars); unknown
+    references are answered with a 409 so the client can re-send them.
+    
+    The body is decoded by services.request_decoder, which converts busy
+    slots straight into the busy index's epoch arrays; errors are the same
+    422 responses as for any pydantic-validated body.
+    
+    Responses can be trimmed with ``?verbosity=minimal|standard|full`` or
+    ``?fields=slot,score`` (see response_projection) and are encoded with
+    orjson.
+    
+    Stage timings (decode, availability, ranking, negotiation, compromises,
+    analytics, encode) and work counters are recorded for GET /metrics and,
+    with SCHEDULER_METRICS_IN_ANALYTICS=1, returned under
+    ``analytics["metrics"]``.
+    
+    With ``X-Scheduler-Profile: <SCHEDULER_PROFILE_TOKEN>`` the request runs
+    under cProfile: a summary is returned under ``analytics["profile"]`` and
+    the full profile is kept for GET /profiles/{meeting_id}. Streamed
+    requests cannot be profiled.
+    
+    With ``?rerank=true`` the full ranking is kept and the response carries
+    a ``rerank_handle`` for POST /schedule/rerank (see rerank_service).
+    Streamed and profiled requests cannot be kept for re-ranking.
+    
     Args:
         request: Scheduling request with participants and constraints
+        x_scheduler_trace: Optional trace level ("info" or "debug") for this request
+        x_scheduler_profile: Profiling token; profiles this request
+        stream: Stream progress events instead of a single response
+        accept: Accept header; "application/x-ndjson" also selects streaming
+        fields: Comma-separated response/candidate fields to return
+        verbosity: Response detail level when fields is not given
+        rerank: Keep the ranking for incremental re-ranking
         
     Returns:
         Scheduling response with ranked candidates and analytics
     """
-    start_time = time.time()
-    
     try:
-        # DEBUG: Log incoming request details
-        print("\n" + "="*80)
-        print(f"📥 SCHEDULING REQUEST RECEIVED: {request.meeting_id}")
-        print("="*80)
-        print(f"Participants: {len(request.participants)}")
-        print(f"Duration: {request.constraints.duration_minutes} minutes")
-        print(f"Office hours: {request.constraints.working_hours_start}:00 - {request.constraints.working_hours_end}:00")
-        print(f"Event category: {getattr(request.constraints, 'event_category', 'NOT SET')}")
-        print(f"Date range: {request.constraints.earliest_date.strftime('%Y-%m-%d')} to {request.constraints.latest_date.strftime('%Y-%m-%d')}")
-        for i, p in enumerate(request.participants, 1):
-            print(f"\nParticipant {i}: {p.name}")
-            print(f"  Busy slots: {len(p.calendar_summary.busy_slots)}")
-            if len(p.calendar_summary.busy_slots) > 0:
-                print(f"  Sample busy times:")
-                for slot in p.calendar_summary.busy_slots[:3]:
-                    print(f"    • {slot.start.strftime('%a %b %d, %I:%M %p')} - {slot.end.strftime('%I:%M %p')}")
-        print("="*80 + "\n")
-        
-        # Validate request
-        if len(request.participants) < 1:
-            raise HTTPException(
-                status_code=400,
-                detail="At least 1 participant required"
+        projection = response_projection.parse_projection(fields, verbosity)
+        profile = profiling_service.authorize(x_scheduler_profile)
+        request = await run_in_threadpool(calendar_cache_service.resolve_request, request)
+        if rerank and profile:
+            raise HTTPException(status_code=400, detail="Profiled requests cannot be kept for re-ranking")
+        if stream or (accept and "application/x-ndjson" in accept):
+            if profile:
+                raise HTTPException(status_code=400, detail="Streamed requests cannot be profiled")
+            if rerank:
+                raise HTTPException(status_code=400, detail="Streamed requests cannot be kept for re-ranking")
+            return StreamingResponse(
+                streaming_service.ndjson_lines(
+                    streaming_service.stream_schedule(request, x_scheduler_trace, projection)
+                ),
+                media_type="application/x-ndjson",
             )
-        
-        # Step 1: Find available time slots
-        available_slots = AvailabilityAgent.find_available_slots(
-            participants=request.participants,
-            constraints=request.constraints,
-        )
-        
-        if not available_slots:
-            # No slots available - return empty response
-            processing_time = (time.time() - start_time) * 1000
-            
-            return ScheduleResponse(
-                meeting_id=request.meeting_id,
-                candidates=[],
-                total_candidates_evaluated=0,
-                processing_time_ms=round(processing_time, 2),
-                negotiation_rounds=0,
-                analytics={
-                    "message": "No available time slots found within constraints",
-                    "participants_count": len(request.participants),
-                },
-                success=False,
-                message="No available time slots found. Try relaxing constraints.",
-            )
-        
-        # Step 2 & 3: Rank candidates using Optimization Agent
-        # (Preference scoring is done internally by Optimization Agent)
-        ranked_candidates = OptimizationAgent.rank_candidates(
-            available_slots=available_slots,
-            participants=request.participants,
-            constraints=request.constraints,
-        )
-        
-        # Step 4: Negotiate conflicts if needed
-        negotiated_candidates, negotiation_rounds = NegotiationAgent.negotiate_schedule(
-            candidates=ranked_candidates,
-            participants=request.participants,
-            constraints=request.constraints,
-        )
-        
-        # Calculate analytics
-        time_savings = OptimizationAgent.calculate_time_savings_analytics(
-            candidates=negotiated_candidates,
-            participant_count=len(request.participants),
+        if profile:
+            job = profiling_service.run_schedule_profiled
+        elif rerank:
+            job = rerank_service.run_schedule_tracked
+        else:
+            job = scheduling_pipeline.run_schedule
+        response = await executor_service.get_executor().run(job, request, x_scheduler_trace)
+        metrics_service.observe(response._metrics)
+        if response._profile is not None:
+            profiling_service.get_store().put(response.meeting_id, response._profile)
+            response.analytics["profile"] = profiling_service.summarize(response._profile)
+        if response._ranking is not None:
+            response.rerank_handle = rerank_service.get_store().put(response._ranking)
+        start = time.perf_counter()
+        encoded = response_projection.ORJSONResponse(response_projection.project(response, projection))
+        metrics_service.observe_stage("encode", time.perf_counter() - start)
+        return encoded
+    except (executor_service.ExecutorSaturated, executor_service.ExecutorTimeout) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
+    except scheduling_pipeline.SchedulingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@app.post(
+    "/schedule/rerank",
+    response_model=ScheduleResponse,
+    response_class=response_projection.ORJSONResponse,
+)
+async def rerank_meeting(
+    rerank_request: RerankRequest,
+    x_scheduler_trace: Optional[str] = Header(default=None),
+    fields: Optional[str] = Query(default=None),
+    verbosity: str = Query(default="full"),
+) -> response_projection.ORJSONResponse:
+    """
+    Re-rank a previous /schedule result after calendar changes.
+    
+    Takes the ``rerank_handle`` of a response to ``/schedule?rerank=true``
+    plus busy slots added to and removed from specific participants'
+    calendars. Only candidate slots the changes can influence are
+    re-checked and re-scored (see rerank_service); the response has the
+    same form as /schedule's and keeps the same handle, which then refers
+    to the updated ranking.
+    
+    Unknown or evicted handles are answered with a 404 and busy slots to
+    remove that are not in the calendar with a 409; the client then sends
+    the full request to /schedule again. A re-rank that another re-rank of
+    the same handle overtook is also a 409, and the client re-sends its
+    changes.
+    
+    Args:
+        rerank_request: Handle and busy-slot changes
+        x_scheduler_trace: Optional trace level ("info" or "debug") for this request
+        fields: Comma-separated response/candidate fields to return
+        verbosity: Response detail level when fields is not given
         
-        conflict_analysis = NegotiationAgent.analyze_conflicts(
-            candidates=negotiated_candidates,
-            participants=request.participants,
+    Returns:
+        Scheduling response for the changed calendars
+    """
+    try:
+        projection = response_projection.parse_projection(fields, verbosity)
+        store = rerank_service.get_store()
+        state = store.get(rerank_request.handle)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired rerank handle")
+        response = await executor_service.get_executor().run(
+            rerank_service.run_rerank,
+            state,
+            rerank_request.changes,
+            x_scheduler_trace,
         )
-        
-        group_preferences = PreferenceAgent.analyze_group_preferences(
-            participants=request.participants,
+        metrics_service.observe(response._metrics)
+        response.rerank_handle = store.replace(rerank_request.handle, state, response._ranking)
+        start = time.perf_counter()
+        encoded = response_projection.ORJSONResponse(response_projection.project(response, projection))
+        metrics_service.observe_stage("encode", time.perf_counter() - start)
+        return encoded
+    except (executor_service.ExecutorSaturated, executor_service.ExecutorTimeout) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
+    except scheduling_pipeline.SchedulingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@app.post("/schedule/batch", openapi_extra=_request_body(BatchScheduleRequest))
+async def schedule_batch(
+    batch: BatchScheduleRequest = Depends(decode_batch_body),
+    x_scheduler_trace: Optional[str] = Header(default=None),
+    fields: Optional[str] = Query(default=None),
+    verbosity: str = Query(default="full"),
+) -> StreamingResponse:
+    """
+    Schedule many meetings in one call over a shared participant directory.
+    
+    Participants are sent once in ``participants`` (keyed by user_id) and
+    referenced by id from each meeting. Meetings run in parallel on the
+    scheduling executor and results stream back as newline-delimited JSON
+    in completion order, one line per meeting, followed by a summary line.
+    Each meeting's response is trimmed like /schedule's by ``fields`` and
+    ``verbosity``.
+    
+    Args:
+        batch: Meetings plus the shared participant directory
+        x_scheduler_trace: Optional trace level applied to every meeting
+        fields: Comma-separated response/candidate fields to return
+        verbosity: Response detail level when fields is not given
         
-        # Combine analytics
-        analytics = {
-            **time_savings,
-            **conflict_analysis,
-            "group_preferences": group_preferences,
-            "total_slots_evaluated": len(available_slots),
-            "participants_count": len(request.participants),
-            "required_participants": sum(
-                1 for p in request.participants if p.is_required
-            ),
-            "optional_participants": sum(
-                1 for p in request.participants if not p.is_required
-            ),
-        }
-        
-        # Calculate processing time
-        processing_time = (time.time() - start_time) * 1000
+    Returns:
+        NDJSON stream of per-meeting results
+    """
+    try:
+        projection = response_projection.parse_projection(fields, verbosity)
+        batch = await run_in_threadpool(calendar_cache_service.resolve_batch, batch)
+    except scheduling_pipeline.SchedulingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return StreamingResponse(
+        streaming_service.ndjson_lines(
+            batch_service.stream_batch(batch, x_scheduler_trace, projection)
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post(
+    "/schedule/joint",
+    response_model=JointScheduleResponse,
+    openapi_extra=_request_body(BatchScheduleRequest),
+)
+async def schedule_joint(
+    batch: BatchScheduleRequest = Depends(decode_batch_body),
+    time_budget_ms: int = Query(default=DEFAULT_TIME_BUDGET_MS, ge=10, le=60000),
+    candidate_pool: int = Query(default=CANDIDATE_POOL_SIZE, ge=1, le=50),
+    optional_conflicts: bool = Query(default=False),
+) -> JointScheduleResponse:
+    """
+    Schedule a batch of meetings jointly so they never collide.
+    
+    Takes the same body as /schedule/batch. Each meeting's top candidates
+    are ranked as usual, then the Joint Scheduling Agent assigns one slot
+    per meeting so no required participant is double-booked, maximising the
+    number of scheduled meetings and then their total score within the time
+    budget. Optional attendees may be double-booked unless optional_conflicts
+    is set.
+    
+    Args:
+        batch: Meetings plus the shared participant directory
+        time_budget_ms: Wall-clock budget for the joint solver
+        candidate_pool: Candidates considered per meeting
+        optional_conflicts: Also avoid double-booking optional attendees
         
-        # Determine success
-        success = len(negotiated_candidates) > 0
-        message = (
-            f"Found {len(negotiated_candidates)} optimal meeting slots"
-            if success
-            else "No suitable meeting times found"
+    Returns:
+        One assignment per meeting plus solver statistics
+    """
+    try:
+        batch = await run_in_threadpool(calendar_cache_service.resolve_batch, batch)
+        return await batch_service.schedule_joint(
+            batch, time_budget_ms, candidate_pool, optional_conflicts
         )
-        
-        # Build response
-        response = ScheduleResponse(
-            meeting_id=request.meeting_id,
-            candidates=negotiated_candidates,
-            total_candidates_evaluated=len(available_slots),
-            processing_time_ms=round(processing_time, 2),
-            negotiation_rounds=negotiation_rounds,
-            analytics=analytics,
-            success=success,
-            message=message,
+    except (executor_service.ExecutorSaturated, executor_service.ExecutorTimeout) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
+    except scheduling_pipeline.SchedulingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@app.post("/calendars")
+async def cache_calendars(summaries: List[CompressedCalendarSummary]) -> Dict[str, Any]:
+    """
+    Cache calendar summaries for later requests.
+    
+    Each summary is indexed and stored under (user_id, summary hash); the
+    returned hashes can be sent as ``calendar_ref: {"summary_hash": ...}``
+    on a participant with the same user_id instead of the full summary.
+    
+    Args:
+        summaries: Calendar summaries to cache
         
-        return response
-        
-    except Exception as e:
-        # Log error (in production, use proper logging)
-        processing_time = (time.time() - start_time) * 1000
-        
-        import traceback
-        print(f"ERROR: {str(e)}")
-        print(traceback.format_exc())
+    Returns:
+        The hash of each summary plus cache statistics
+    """
+    cache = calendar_cache_service.get_cache()
+    
+    def store() -> List[Dict[str, str]]:
+        return [
+            {"user_id": summary.user_id, "summary_hash": cache.put(summary.user_id, summary)}
+            for summary in summaries
+        ]
+    
+    # Hashing, indexing and backend writes stay off the event loop
+    calendars = await run_in_threadpool(store)
+    return {"calendars": calendars, "cache": cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Expose scheduling metrics in the Prometheus text format.
+    
+    Histograms of per-stage latency (scheduler_stage_duration_seconds),
+    per-request work counters (slots generated and available, busy slots
+    scanned, relaxation passes) and HTTP request latency; see
+    services.metrics_service.
+    
+    Returns:
+        Prometheus text exposition (format version 0.0.4)
+    """
+    return PlainTextResponse(
+        metrics_service.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/profiles/{meeting_id}")
+async def get_profile(
+    meeting_id: str,
+    x_scheduler_profile: Optional[str] = Header(default=None),
+    format: str = Query(default="pstats"),
+    limit: int = Query(default=50, ge=1, le=1000),
+) -> Response:
+    """
+    Get the stored cProfile profile of a profiled /schedule request.
+    
+    Requires the same X-Scheduler-Profile token as profiling itself.
+    
+    Args:
+        meeting_id: Meeting identifier of the profiled request
+        x_scheduler_profile: Profiling token
+        format: "pstats" (load with ``pstats.Stats`` or snakeviz), "text" or "json"
+        limit: Functions listed by the "text" and "json" formats
         
+    Returns:
+        The encoded profile
+    """
+    try:
+        if not profiling_service.authorize(x_scheduler_profile):
+            raise HTTPException(status_code=403, detail="Missing profiling token")
+    except scheduling_pipeline.SchedulingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if format not in profiling_service.PROFILE_FORMATS:
         raise HTTPException(
-            status_code=500,
-            detail=f"Internal scheduling error: {str(e)}"
+            status_code=422,
+            detail=f"Unknown profile format '{format}', expected one of: {', '.join(profiling_service.PROFILE_FORMATS)}"
         )
+    entry = profiling_service.get_store().get(meeting_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No profile stored for meeting {meeting_id}")
+    media_types = {"pstats": "application/octet-stream", "text": "text/plain", "json": "application/json"}
+    headers = {}
+    if format == "pstats":
+        headers["Content-Disposition"] = f'attachment; filename="{meeting_id}.pstats"'
+    return Response(
+        profiling_service.render(entry["stats"], format, limit),
+        media_type=media_types[format],
+        headers=headers,
+    )
 
 
 @app.get("/agents")
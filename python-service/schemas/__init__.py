@@ -3,7 +3,12 @@
 from .scheduling import (
     ScheduleRequest,
     ScheduleResponse,
+    BatchMeeting,
+    BatchScheduleRequest,
+    JointAssignment,
+    JointScheduleResponse,
     Participant,
+    CalendarRef,
     CompressedCalendarSummary,
     TimeSlot,
     MeetingSlotCandidate,
@@ -14,7 +19,12 @@ from .scheduling import (
 __all__ = [
     "ScheduleRequest",
     "ScheduleResponse",
+    "BatchMeeting",
+    "BatchScheduleRequest",
+    "JointAssignment",
+    "JointScheduleResponse",
     "Participant",
+    "CalendarRef",
     "CompressedCalendarSummary",
     "TimeSlot",
     "MeetingSlotCandidate",
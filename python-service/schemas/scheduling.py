@@ -1,7 +1,7 @@
 """Pydantic models for scheduling requests and responses."""
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer, field_validator, model_validator
 from datetime import datetime, timezone as dt_timezone
 from enum import Enum
 
@@ -40,6 +40,12 @@ class EventCategory(str, Enum):
     BREAK = "break"               # Breaks/lunch - midday preferred
 
 
+class WorkingHoursMode(str, Enum):
+    """Whose clocks working hours are applied on."""
+    SCHEDULING = "scheduling"     # Scheduling windows only (earliest_date's timezone)
+    PARTICIPANTS = "participants" # Also every required participant's local working hours
+
+
 class TimeSlot(BaseModel):
     """Represents a time slot with start and end times."""
     start: datetime = Field(..., description="Start time in ISO 8601 format")
@@ -127,6 +133,22 @@ class CompressedCalendarSummary(BaseModel):
         default=365,
         description="How many days of history were compressed"
     )
+    
+    # Sorted busy-slot index, built lazily by agents.busy_index.BusyIndex
+    _busy_index: Optional[Any] = PrivateAttr(default=None)
+    
+    @field_serializer('busy_slots', mode='wrap')
+    def serialize_busy_slots(self, value: Any, handler: Any) -> Any:
+        """Serialize busy slots, including compactly decoded ones (any sequence)."""
+        return handler(value if isinstance(value, list) else list(value))
+
+
+class CalendarRef(BaseModel):
+    """Reference to a calendar summary already cached by the service."""
+    summary_hash: str = Field(
+        ...,
+        description="Hash returned by POST /calendars (or a previous request)"
+    )
 
 
 class Participant(BaseModel):
@@ -138,10 +160,21 @@ class Participant(BaseModel):
         default=True,
         description="Whether participant is required"
     )
-    calendar_summary: CompressedCalendarSummary = Field(
-        ...,
+    calendar_summary: Optional[CompressedCalendarSummary] = Field(
+        default=None,
         description="Compressed calendar data from ScaleDown"
     )
+    calendar_ref: Optional[CalendarRef] = Field(
+        default=None,
+        description="Cached calendar summary to use instead of calendar_summary"
+    )
+    
+    @model_validator(mode='after')
+    def require_calendar(self) -> "Participant":
+        """Ensure exactly one of calendar_summary and calendar_ref is given."""
+        if (self.calendar_summary is None) == (self.calendar_ref is None):
+            raise ValueError("Provide exactly one of calendar_summary or calendar_ref")
+        return self
 
 
 class SchedulingConstraints(BaseModel):
@@ -204,6 +237,14 @@ class SchedulingConstraints(BaseModel):
         default=EventCategory.MEETING,
         description="Event category for intelligent time suggestion"
     )
+    working_hours_mode: WorkingHoursMode = Field(
+        default=WorkingHoursMode.SCHEDULING,
+        description=(
+            "\"participants\" only places meetings inside working_hours_start-"
+            "working_hours_end on an allowed day in every required participant's "
+            "own timezone"
+        )
+    )
     
     @field_validator('earliest_date', 'latest_date', mode='after')
     @classmethod
@@ -232,6 +273,41 @@ class ScheduleRequest(BaseModel):
     )
 
 
+class BatchMeeting(BaseModel):
+    """One meeting in a batch request, referencing shared participants by id."""
+    meeting_id: str = Field(..., description="Unique meeting identifier")
+    participant_ids: List[str] = Field(
+        ...,
+        min_length=1,
+        description="User ids (keys of the batch participant directory)"
+    )
+    optional_participant_ids: List[str] = Field(
+        default_factory=list,
+        description="Subset of participant_ids attending as optional"
+    )
+    constraints: SchedulingConstraints = Field(
+        ...,
+        description="Scheduling constraints"
+    )
+    preferences: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Additional preferences"
+    )
+
+
+class BatchScheduleRequest(BaseModel):
+    """Request to schedule many meetings over a shared participant directory."""
+    participants: Dict[str, Participant] = Field(
+        ...,
+        description="De-duplicated participants keyed by user_id"
+    )
+    meetings: List[BatchMeeting] = Field(
+        ...,
+        min_length=1,
+        description="Meetings to schedule"
+    )
+
+
 class MeetingSlotCandidate(BaseModel):
     """A candidate meeting time slot with scoring."""
     slot: TimeSlot = Field(..., description="The proposed time slot")
@@ -328,3 +404,79 @@ class ScheduleResponse(BaseModel):
         default="",
         description="Status message or error description"
     )
+    rerank_handle: Optional[str] = Field(
+        default=None,
+        description="Handle for POST /schedule/rerank (requests sent with ?rerank=true)"
+    )
+    
+    # Stage timings and counters of the run (services.metrics_service), not serialized
+    _metrics: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    
+    # cProfile statistics of a profiled run (services.profiling_service), not serialized
+    _profile: Optional[Dict[Any, Any]] = PrivateAttr(default=None)
+    
+    # Full ranking kept for incremental re-ranking (services.rerank_service), not serialized
+    _ranking: Optional[Any] = PrivateAttr(default=None)
+
+
+class BusySlotChange(BaseModel):
+    """Busy slots added to and removed from one participant's calendar."""
+    user_id: str = Field(..., description="Participant whose calendar changed")
+    added_busy_slots: List[TimeSlot] = Field(
+        default_factory=list,
+        description="New busy slots"
+    )
+    removed_busy_slots: List[TimeSlot] = Field(
+        default_factory=list,
+        description="Busy slots no longer busy (matched by start and end instants)"
+    )
+    
+    @model_validator(mode='after')
+    def require_slots(self) -> "BusySlotChange":
+        """Ensure the change adds or removes at least one busy slot."""
+        if not self.added_busy_slots and not self.removed_busy_slots:
+            raise ValueError("Provide added_busy_slots and/or removed_busy_slots")
+        return self
+
+
+class RerankRequest(BaseModel):
+    """Request to re-rank a previous /schedule result after calendar changes."""
+    handle: str = Field(..., description="rerank_handle of the previous response")
+    changes: List[BusySlotChange] = Field(
+        ...,
+        min_length=1,
+        description="Calendar changes, applied in order"
+    )
+
+
+class JointAssignment(BaseModel):
+    """Slot chosen for one meeting by joint scheduling."""
+    meeting_id: str = Field(..., description="Meeting identifier from request")
+    candidate: Optional[MeetingSlotCandidate] = Field(
+        default=None,
+        description="Assigned slot (None if the meeting could not be placed)"
+    )
+    candidate_rank: Optional[int] = Field(
+        default=None,
+        description="Rank of the assigned slot in the meeting's own candidate list (0 = best)"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Why the meeting could not be considered, if it failed"
+    )
+
+
+class JointScheduleResponse(BaseModel):
+    """Response assigning every meeting of a batch to compatible slots."""
+    assignments: List[JointAssignment] = Field(
+        ...,
+        description="One assignment per meeting, in request order"
+    )
+    total_score: float = Field(..., description="Sum of scores of scheduled meetings")
+    scheduled: int = Field(..., description="Meetings placed without conflicts")
+    unscheduled: int = Field(..., description="Meetings left without a slot")
+    processing_time_ms: float = Field(..., description="Processing time in milliseconds")
+    solver: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Solver statistics (iterations, improvements, budget use)"
+    )
@@ -0,0 +1,222 @@
+"""
+Batch Scheduling Service
+
+Schedules many meetings from one request over a shared participant
+directory:
+- Each participant's calendar summary is validated and indexed once,
+  then shared (not copied) by every meeting that references it
+- Meetings run in parallel on the scheduling executor, at most one per
+  worker at a time so a single batch cannot exhaust the admission queue
+- Results are yielded as each meeting finishes (completion order), ending
+  with a summary record
+
+Joint mode ranks every meeting the same way, then lets the
+JointSchedulingAgent pick one slot per meeting so the batch never
+double-books a required participant.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from schemas.scheduling import (
+    BatchMeeting,
+    BatchScheduleRequest,
+    JointAssignment,
+    JointScheduleResponse,
+    MeetingSlotCandidate,
+    ScheduleRequest,
+)
+from agents.busy_index import BusyIndex
+from agents.joint_scheduling_agent import (
+    CANDIDATE_POOL_SIZE,
+    DEFAULT_TIME_BUDGET_MS,
+    JointSchedulingAgent,
+)
+from services import executor_service
+from services import metrics_service
+from services import response_projection
+from services import scheduling_pipeline
+
+
+async def stream_batch(
+    batch: BatchScheduleRequest,
+    trace_header: Optional[str] = None,
+    projection: response_projection.Projection = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Schedule every meeting in a batch, yielding results as they complete.
+
+    Args:
+        batch: Meetings plus the shared participant directory
+        trace_header: Value of the X-Scheduler-Trace header, applied to every meeting
+        projection: Response projection applied to every meeting's response
+
+    Yields:
+        One record per meeting:
+        - {"meeting_id", "status": 200, "response": ScheduleResponse JSON}
+        - {"meeting_id", "status": 4xx/5xx, "error", ["retry_after"]}
+        followed by {"summary": {...}} once all meetings are done
+    """
+    start_time = time.time()
+    executor = executor_service.get_executor()
+    _index_directory(batch)
+
+    limit = asyncio.Semaphore(executor.workers)
+
+    async def run_meeting(meeting: BatchMeeting) -> Dict[str, Any]:
+        async with limit:
+            try:
+                request = scheduling_pipeline.build_meeting_request(meeting, batch.participants)
+                response = await executor.run(
+                    scheduling_pipeline.run_schedule, request, trace_header
+                )
+            except (executor_service.ExecutorSaturated, executor_service.ExecutorTimeout) as e:
+                return {
+                    "meeting_id": meeting.meeting_id,
+                    "status": 503,
+                    "error": str(e),
+                    "retry_after": e.retry_after,
+                }
+            except scheduling_pipeline.SchedulingError as e:
+                return {
+                    "meeting_id": meeting.meeting_id,
+                    "status": e.status_code,
+                    "error": e.detail,
+                }
+
+        metrics_service.observe(response._metrics)
+        return {
+            "meeting_id": meeting.meeting_id,
+            "status": 200,
+            "response": response_projection.project(response, projection),
+        }
+
+    tasks = [asyncio.ensure_future(run_meeting(meeting)) for meeting in batch.meetings]
+    status_counts: Dict[int, int] = {}
+    try:
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            status_counts[result["status"]] = status_counts.get(result["status"], 0) + 1
+            yield result
+    finally:
+        # Client went away (or the stream failed): drop meetings not yet run
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "summary": {
+            "meetings": len(batch.meetings),
+            "succeeded": status_counts.get(200, 0),
+            "failed": len(batch.meetings) - status_counts.get(200, 0),
+            "participants": len(batch.participants),
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+        }
+    }
+
+
+async def schedule_joint(
+    batch: BatchScheduleRequest,
+    time_budget_ms: int = DEFAULT_TIME_BUDGET_MS,
+    pool_size: int = CANDIDATE_POOL_SIZE,
+    optional_conflicts: bool = False,
+) -> JointScheduleResponse:
+    """
+    Schedule every meeting in a batch without double-booking anyone required.
+
+    Each meeting's candidate pool is ranked in parallel on the executor,
+    then a single solver job assigns meetings to mutually compatible slots.
+
+    Args:
+        batch: Meetings plus the shared participant directory
+        time_budget_ms: Wall-clock budget for the solver
+        pool_size: Candidates ranked per meeting
+        optional_conflicts: Keep optional attendees from being double-booked too
+
+    Returns:
+        Joint assignment for every meeting, in request order
+
+    Raises:
+        ExecutorSaturated / ExecutorTimeout: If the executor rejects a job
+    """
+    start_time = time.time()
+    executor = executor_service.get_executor()
+    _index_directory(batch)
+
+    errors: Dict[int, str] = {}
+    requests: List[Optional[ScheduleRequest]] = []
+    for position, meeting in enumerate(batch.meetings):
+        try:
+            requests.append(scheduling_pipeline.build_meeting_request(meeting, batch.participants))
+        except scheduling_pipeline.SchedulingError as e:
+            errors[position] = e.detail
+            requests.append(None)
+
+    limit = asyncio.Semaphore(executor.workers)
+
+    async def rank(position: int) -> List[MeetingSlotCandidate]:
+        if requests[position] is None:
+            return []
+        async with limit:
+            try:
+                return await executor.run(
+                    scheduling_pipeline.rank_meeting, requests[position], pool_size
+                )
+            except scheduling_pipeline.SchedulingError as e:
+                errors[position] = e.detail
+                return []
+
+    candidate_lists = await asyncio.gather(*(rank(i) for i in range(len(requests))))
+
+    # Failed meetings stay in the solve with no candidates (never placed)
+    solvable = [
+        request if request is not None else ScheduleRequest.model_construct(
+            meeting_id=meeting.meeting_id, participants=[], constraints=meeting.constraints
+        )
+        for request, meeting in zip(requests, batch.meetings)
+    ]
+    solution = await executor.run(
+        JointSchedulingAgent.solve,
+        solvable,
+        candidate_lists,
+        time_budget_ms,
+        None,
+        optional_conflicts,
+    )
+
+    assignments = []
+    for position, (meeting, choice) in enumerate(zip(batch.meetings, solution["assignments"])):
+        assignments.append(JointAssignment(
+            meeting_id=meeting.meeting_id,
+            candidate=candidate_lists[position][choice] if choice is not None else None,
+            candidate_rank=choice,
+            error=errors.get(position),
+        ))
+
+    return JointScheduleResponse(
+        assignments=assignments,
+        total_score=solution["total_score"],
+        scheduled=solution["scheduled"],
+        unscheduled=solution["unscheduled"],
+        processing_time_ms=round((time.time() - start_time) * 1000, 2),
+        solver={
+            "candidate_pool_size": pool_size,
+            "time_budget_ms": time_budget_ms,
+            "optional_conflicts": optional_conflicts,
+            **{
+                key: solution[key]
+                for key in ("iterations", "improvements", "elapsed_ms", "budget_exhausted")
+            },
+        },
+    )
+
+
+def _index_directory(batch: BatchScheduleRequest) -> None:
+    """
+    Index each shared calendar once.
+
+    Meetings reuse (or, with a process pool, ship) the cached index instead
+    of rebuilding it per meeting.
+    """
+    for participant in batch.participants.values():
+        BusyIndex.for_summary(participant.calendar_summary)
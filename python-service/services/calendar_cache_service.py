@@ -0,0 +1,379 @@
+"""
+Calendar Cache Service
+
+Keeps validated, indexed calendar summaries between requests so that a
+participant who appears in many requests is parsed and indexed once:
+- Entries are keyed by (user_id, summary hash), where the hash is the
+  SHA-256 of the summary's canonical JSON (busy slots as their indexed
+  epoch times, so compactly decoded summaries hash without building slot
+  models); a changed calendar is simply a new key, so entries never need
+  explicit invalidation
+- Each entry holds the CompressedCalendarSummary together with its built
+  BusyIndex (sorted starts/ends and merged busy runs, see agents.busy_index)
+- Requests may send ``calendar_ref: {"summary_hash": ...}`` instead of the
+  full ``calendar_summary`` for any summary the service has seen
+
+Eviction (in-process store):
+- SCHEDULER_CALENDAR_CACHE_ENTRIES: Maximum entries (default: 1024, 0 disables)
+- SCHEDULER_CALENDAR_CACHE_BYTES: Maximum approximate size (default: 64 MiB)
+- SCHEDULER_CALENDAR_CACHE_TTL_SECONDS: Lifetime since last store (default: 3600)
+Least recently used entries are dropped first once a limit is exceeded.
+
+Shared backend (optional):
+- SCHEDULER_CALENDAR_CACHE_REDIS_URL: Redis-compatible server that also
+  stores each summary's JSON (with the same TTL), so references resolve on
+  every API replica; local misses fall back to it. Requires the ``redis``
+  package; without it (or when the server is unreachable) only the
+  in-process store is used.
+- SCHEDULER_CALENDAR_CACHE_REDIS_TIMEOUT_SECONDS: Connect and read/write
+  timeout of backend calls (default: 0.5), so a slow backend degrades to
+  local misses instead of stalling requests
+
+Resolution hashes and indexes summaries and may call the backend, so the
+API runs it on a worker thread, off the event loop.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas.scheduling import (
+    BatchScheduleRequest,
+    CompressedCalendarSummary,
+    Participant,
+    ScheduleRequest,
+)
+from agents.busy_index import BusyIndex
+from services.scheduling_pipeline import SchedulingError
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_MAX_ENTRIES = int(os.getenv("SCHEDULER_CALENDAR_CACHE_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("SCHEDULER_CALENDAR_CACHE_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("SCHEDULER_CALENDAR_CACHE_TTL_SECONDS", "3600"))
+CACHE_REDIS_URL = os.getenv("SCHEDULER_CALENDAR_CACHE_REDIS_URL", "")
+CACHE_REDIS_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_CALENDAR_CACHE_REDIS_TIMEOUT_SECONDS", "0.5"))
+
+# Approximate in-memory cost of one busy slot: the TimeSlot model and its
+# datetimes (or its JSON object) plus the index's sorted lists and merged runs
+INDEX_BYTES_PER_SLOT = 400
+
+# Key prefix in the shared backend
+REDIS_KEY_PREFIX = "scheduler:calendar:"
+
+CacheKey = Tuple[str, str]
+
+
+def summary_hash(summary: CompressedCalendarSummary) -> str:
+    """
+    Hash a calendar summary's content.
+
+    Busy slots are hashed as their indexed (sorted) epoch times, which is
+    everything scheduling reads from them: summaries with equal hashes
+    schedule identically, however their slots were ordered or decoded.
+
+    Args:
+        summary: Calendar summary
+
+    Returns:
+        Hex SHA-256 of the summary's canonical JSON and busy index
+    """
+    return _digest(summary)[0]
+
+
+def _digest(summary: CompressedCalendarSummary) -> Tuple[str, int]:
+    """Hash a summary, also returning the size of its JSON without busy slots."""
+    meta = summary.model_dump_json(exclude={"busy_slots"}).encode()
+    index = BusyIndex.for_summary(summary)
+    digest = hashlib.sha256(meta)
+    for values in (index.starts, index.ends, index.start_days):
+        digest.update(array("q", values).tobytes())
+    return digest.hexdigest(), len(meta)
+
+
+class _Entry:
+    """One cached summary."""
+
+    __slots__ = ("summary", "size", "expires_at")
+
+    def __init__(self, summary: CompressedCalendarSummary, size: int, expires_at: float):
+        self.summary = summary
+        self.size = size
+        self.expires_at = expires_at
+
+
+class CalendarCache:
+    """
+    LRU + TTL cache of indexed calendar summaries.
+
+    Attributes:
+        max_entries: Maximum number of entries (0 disables the cache)
+        max_bytes: Maximum total approximate size of entries
+        ttl: Seconds an entry lives after it was last stored
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl: float = CACHE_TTL_SECONDS,
+        redis_url: str = CACHE_REDIS_URL,
+    ):
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._redis = _connect_redis(redis_url) if redis_url else None
+        self._hits = 0
+        self._misses = 0
+        self._remote_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def put(self, user_id: str, summary: CompressedCalendarSummary) -> str:
+        """
+        Index and store a summary, replacing nothing if it is already cached.
+
+        Args:
+            user_id: Participant the summary belongs to
+            summary: Calendar summary
+
+        Returns:
+            Summary hash to use in ``calendar_ref``
+        """
+        digest, meta_size = _digest(summary)
+        self._store((user_id, digest), summary, meta_size)
+        if self._redis is not None:
+            try:
+                self._redis.set(
+                    REDIS_KEY_PREFIX + f"{user_id}:{digest}",
+                    summary.model_dump_json(),
+                    ex=max(1, int(self.ttl)),
+                )
+            except Exception:
+                logger.warning("Calendar cache backend write failed", exc_info=True)
+        return digest
+
+    def get(self, user_id: str, digest: str) -> Optional[CompressedCalendarSummary]:
+        """
+        Look up an indexed summary.
+
+        Args:
+            user_id: Participant the summary belongs to
+            digest: Summary hash returned by ``put``
+
+        Returns:
+            The cached summary, or None if it is unknown or expired
+        """
+        key = (user_id, digest)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._drop(key)
+                self._expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.summary
+
+        summary = self._fetch_remote(user_id, digest)
+        with self._lock:
+            if summary is None:
+                self._misses += 1
+                return None
+            self._remote_hits += 1
+        self._store(key, summary, _digest(summary)[1])
+        return summary
+
+    def intern(self, user_id: str, summary: CompressedCalendarSummary) -> Tuple[CompressedCalendarSummary, str]:
+        """
+        Swap an inline summary for its cached, already indexed twin.
+
+        Args:
+            user_id: Participant the summary belongs to
+            summary: Freshly parsed calendar summary
+
+        Returns:
+            (summary to use, summary hash); the summary is the cached one on
+            a hit, otherwise the given one after it has been indexed and stored
+        """
+        digest = summary_hash(summary)
+        cached = self.get(user_id, digest)
+        if cached is not None:
+            return cached, digest
+        self.put(user_id, summary)
+        return summary, digest
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters for monitoring."""
+        with self._lock:
+            lookups = self._hits + self._remote_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "backend": "redis" if self._redis is not None else "memory",
+                "hits": self._hits,
+                "remote_hits": self._remote_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._hits + self._remote_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def clear(self) -> None:
+        """Drop every in-process entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _store(self, key: CacheKey, summary: CompressedCalendarSummary, meta_size: int) -> None:
+        """Index a summary and insert it, evicting to stay within limits."""
+        if self.max_entries == 0:
+            return
+        # Build the busy index outside the lock; it is cached on the summary
+        BusyIndex.for_summary(summary)
+        size = meta_size + INDEX_BYTES_PER_SLOT * len(summary.busy_slots)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(summary, size, time.monotonic() + self.ttl)
+            self._bytes += size
+
+            # 1. Expired entries go first, 2. then least recently used ones
+            now = time.monotonic()
+            for stale in [k for k, e in self._entries.items() if e.expires_at <= now]:
+                self._drop(stale)
+                self._expirations += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _drop(self, key: CacheKey) -> None:
+        """Remove an entry (lock held)."""
+        self._bytes -= self._entries.pop(key).size
+
+    def _fetch_remote(self, user_id: str, digest: str) -> Optional[CompressedCalendarSummary]:
+        """Load a summary from the shared backend, if configured."""
+        if self._redis is None:
+            return None
+        try:
+            payload = self._redis.get(REDIS_KEY_PREFIX + f"{user_id}:{digest}")
+        except Exception:
+            logger.warning("Calendar cache backend read failed", exc_info=True)
+            return None
+        if payload is None:
+            return None
+        return CompressedCalendarSummary.model_validate_json(payload)
+
+
+def _connect_redis(url: str) -> Optional[Any]:
+    """Create a client for the shared backend, or None if unavailable."""
+    try:
+        import redis
+    except ImportError:
+        logger.warning("SCHEDULER_CALENDAR_CACHE_REDIS_URL is set but redis is not installed")
+        return None
+    return redis.Redis.from_url(
+        url,
+        socket_timeout=CACHE_REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=CACHE_REDIS_TIMEOUT_SECONDS,
+    )
+
+
+_cache: Optional[CalendarCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CalendarCache:
+    """Get the process-wide calendar cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CalendarCache()
+        return _cache
+
+
+def resolve_participants(participants: List[Participant]) -> List[Participant]:
+    """
+    Resolve calendar references and intern inline summaries.
+
+    Args:
+        participants: Participants as received
+
+    Returns:
+        Participants that all carry an (indexed) calendar_summary; the
+        list is returned unchanged when nothing needed replacing
+
+    Raises:
+        SchedulingError: 409 if a referenced summary is not cached (the
+            client should re-send it in full)
+    """
+    cache = get_cache()
+    resolved = []
+    missing = []
+    changed = False
+    for participant in participants:
+        if participant.calendar_ref is not None:
+            summary = cache.get(participant.user_id, participant.calendar_ref.summary_hash)
+            if summary is None:
+                missing.append(participant.user_id)
+                continue
+        else:
+            summary, _ = cache.intern(participant.user_id, participant.calendar_summary)
+
+        if summary is participant.calendar_summary:
+            resolved.append(participant)
+        else:
+            changed = True
+            resolved.append(participant.model_copy(
+                update={"calendar_summary": summary, "calendar_ref": None}
+            ))
+
+    if missing:
+        raise SchedulingError(
+            status_code=409,
+            detail=f"Calendar summaries not cached, re-send them in full for: {', '.join(missing)}"
+        )
+    return resolved if changed else participants
+
+
+def resolve_request(request: ScheduleRequest) -> ScheduleRequest:
+    """
+    Resolve the calendars of a scheduling request (see resolve_participants).
+
+    Raises:
+        SchedulingError: 409 if a referenced summary is not cached
+    """
+    participants = resolve_participants(request.participants)
+    if participants is request.participants:
+        return request
+    return request.model_copy(update={"participants": participants})
+
+
+def resolve_batch(batch: BatchScheduleRequest) -> BatchScheduleRequest:
+    """
+    Resolve the calendars of a batch's participant directory.
+
+    Raises:
+        SchedulingError: 409 if a referenced summary is not cached
+    """
+    user_ids = list(batch.participants)
+    participants = resolve_participants(list(batch.participants.values()))
+    return batch.model_copy(update={"participants": dict(zip(user_ids, participants))})
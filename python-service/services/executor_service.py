@@ -0,0 +1,368 @@
+"""
+Scheduling Executor Service
+
+Runs CPU-bound scheduling work off the asyncio event loop so one large
+request cannot stall health checks or other requests on the same worker.
+
+Execution modes (SCHEDULER_EXECUTOR):
+- "process": ProcessPoolExecutor, true parallelism for pure-Python scoring
+- "thread": ThreadPoolExecutor, enough when scoring runs in NumPy
+- "inline": Run on the event loop (tests, debugging)
+- "auto" (default): "thread" when the vectorized scoring kernel is
+  available, otherwise "process"
+
+Admission control:
+- SCHEDULER_WORKERS: Pool size (default: CPU count)
+- SCHEDULER_MAX_QUEUE: Requests allowed to wait for a worker (default: 4x workers)
+- SCHEDULER_TIMEOUT_SECONDS: Per-request deadline including queue time (default: 30)
+- SCHEDULER_RETRY_AFTER_SECONDS: Retry-After hint when saturated (default: 1)
+
+Requests beyond workers + queue depth are rejected immediately with
+ExecutorSaturated (HTTP 503); requests that miss their deadline raise
+ExecutorTimeout (HTTP 503). A timed-out job that already started keeps its
+slot until it really finishes, so admission reflects actual load. Jobs
+whose caller gave up (deadline or disconnected stream) are counted as
+cancelled rather than completed once they leave the pool.
+
+Streaming jobs (``stream``) receive an ``emit`` callback and their
+intermediate results are forwarded to the event loop as they are produced:
+directly in thread mode, through a multiprocessing manager queue in
+process mode.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from queue import Empty
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from agents import scoring_kernel
+
+logger = logging.getLogger(__name__)
+
+# Executor configuration
+EXECUTOR_MODE = os.getenv("SCHEDULER_EXECUTOR", "auto").lower()
+EXECUTOR_WORKERS = int(os.getenv("SCHEDULER_WORKERS", str(os.cpu_count() or 2)))
+EXECUTOR_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", str(4 * EXECUTOR_WORKERS)))
+EXECUTOR_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_TIMEOUT_SECONDS", "30"))
+RETRY_AFTER_SECONDS = int(os.getenv("SCHEDULER_RETRY_AFTER_SECONDS", "1"))
+
+# Marks the end of a streaming job's emitted items
+_STREAM_END = None
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the pool and its queue are full."""
+
+    def __init__(self, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__("Scheduling capacity exhausted, retry later")
+        self.retry_after = retry_after
+
+
+class ExecutorTimeout(Exception):
+    """Raised when a request misses its deadline."""
+
+    def __init__(self, timeout: float, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__(f"Scheduling did not finish within {timeout:g}s")
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+
+class SchedulingExecutor:
+    """
+    Bounded executor for scheduling jobs.
+
+    Attributes:
+        mode: Resolved execution mode ("process", "thread" or "inline")
+        workers: Number of pool workers
+        max_queue: Jobs allowed to wait beyond the running ones
+        timeout: Default per-job deadline in seconds
+    """
+
+    def __init__(
+        self,
+        mode: str = EXECUTOR_MODE,
+        workers: int = EXECUTOR_WORKERS,
+        max_queue: int = EXECUTOR_MAX_QUEUE,
+        timeout: float = EXECUTOR_TIMEOUT_SECONDS,
+    ):
+        if mode == "auto":
+            mode = "thread" if scoring_kernel.is_available() else "process"
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown executor mode: {mode}")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+
+        self._pool: Optional[Executor] = None
+        self._manager: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._completed = 0
+        self._cancelled = 0
+        # Futures whose caller gave up; their release counts as cancelled
+        self._dropped: Set[Future] = set()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of admitted (running + queued) jobs."""
+        return self.workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        """Create the worker pool on first use."""
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="scheduler"
+                )
+            logger.info("Started %s pool with %d workers", self.mode, self.workers)
+        return self._pool
+
+    def _get_manager(self) -> Any:
+        """Start the manager process that carries streamed items on first use."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            return self._manager
+    
+    def _admit(self) -> None:
+        """Reserve a slot for a job or raise ExecutorSaturated."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturated()
+            self._in_flight += 1
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        """Free the slot of a finished (or cancelled) job."""
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None and (future.cancelled() or future in self._dropped):
+                self._dropped.discard(future)
+                self._cancelled += 1
+            else:
+                self._completed += 1
+
+    def _drop(self, future: Future) -> None:
+        """Cancel a job nobody awaits any more (runs on if already started)."""
+        with self._lock:
+            # Done callbacks run after the state change, so a job that is not
+            # done yet will see the mark when it is released
+            if not future.done():
+                self._dropped.add(future)
+        future.cancel()
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run ``fn(*args)`` on the pool and await its result.
+
+        Args:
+            fn: Picklable, module-level callable (required for "process" mode)
+            *args: Picklable positional arguments
+            timeout: Deadline in seconds (defaults to the executor timeout)
+
+        Returns:
+            Whatever ``fn`` returns
+
+        Raises:
+            ExecutorSaturated: If the pool and queue are full
+            ExecutorTimeout: If the job does not finish before the deadline
+        """
+        self._admit()
+
+        if self.mode == "inline":
+            try:
+                return fn(*args)
+            finally:
+                self._release()
+
+        try:
+            future: Future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Release on real completion, not when the awaiting request gives up
+        future.add_done_callback(self._release)
+
+        deadline = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), deadline)
+        except asyncio.TimeoutError:
+            # Drops the job if it is still queued; running jobs finish unobserved
+            self._drop(future)
+            with self._lock:
+                self._timed_out += 1
+            raise ExecutorTimeout(deadline)
+
+    def stream(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Run ``fn(*args, emit)`` on the pool and stream what it emits.
+        
+        Admission happens immediately (so saturation is reported before any
+        response is started); the job then runs while the caller iterates.
+        
+        Args:
+            fn: Picklable, module-level callable taking ``emit`` as its last argument
+            *args: Picklable positional arguments
+            timeout: Deadline in seconds for the whole job (defaults to the executor timeout)
+            
+        Returns:
+            Async iterator over each emitted item, then the return value of ``fn``
+            
+        Raises:
+            ExecutorSaturated: If the pool and queue are full
+            ExecutorTimeout: While iterating, if the job misses its deadline
+        """
+        self._admit()
+        deadline = self.timeout if timeout is None else timeout
+        
+        if self.mode == "inline":
+            try:
+                items: List[Any] = []
+                result = fn(*args, items.append)
+            finally:
+                self._release()
+            return self._replay(items, result)
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def forward(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed: nobody is listening any more
+                pass
+        
+        try:
+            if self.mode == "process":
+                channel = self._get_manager().Queue()
+                future: Future = self._get_pool().submit(_emit_to_channel, fn, args, channel)
+                # Items cross the process boundary via the manager; a helper
+                # thread forwards them until the job's end marker arrives
+                loop.run_in_executor(None, _drain_channel, channel, forward, deadline)
+            else:
+                future = self._get_pool().submit(fn, *args, forward)
+                future.add_done_callback(lambda _: forward(_STREAM_END))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        
+        return self._follow(future, queue, deadline)
+    
+    async def _follow(
+        self,
+        future: Future,
+        queue: asyncio.Queue,
+        deadline: float,
+    ) -> AsyncIterator[Any]:
+        """Yield a running job's emitted items, then its result."""
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + deadline
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), max(0.0, expires - loop.time()))
+                if item is _STREAM_END:
+                    break
+                yield item
+            yield await asyncio.wait_for(
+                asyncio.wrap_future(future), max(0.0, expires - loop.time())
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise ExecutorTimeout(deadline)
+        finally:
+            # Drops the job if it is still queued (deadline or client gone)
+            self._drop(future)
+    
+    @staticmethod
+    async def _replay(items: List[Any], result: Any) -> AsyncIterator[Any]:
+        """Yield the items of an already finished inline job, then its result."""
+        for item in items:
+            yield item
+        yield result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get executor configuration and load counters."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling queued jobs."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def _emit_to_channel(fn: Callable[..., Any], args: tuple, channel: Any) -> Any:
+    """Run a streaming job in a worker process, emitting into a manager queue."""
+    try:
+        return fn(*args, channel.put)
+    finally:
+        channel.put(_STREAM_END)
+
+
+def _drain_channel(channel: Any, forward: Callable[[Any], None], deadline: float) -> None:
+    """Forward items from a manager queue until the end marker (or deadline)."""
+    try:
+        while True:
+            item = channel.get(timeout=deadline)
+            forward(item)
+            if item is _STREAM_END:
+                return
+    except (Empty, EOFError, OSError):
+        # Worker died or the manager was shut down; the deadline reports it
+        return
+
+
+_executor: Optional[SchedulingExecutor] = None
+
+
+def get_executor() -> SchedulingExecutor:
+    """Get the process-wide scheduling executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = SchedulingExecutor()
+    return _executor
+
+
+def shutdown() -> None:
+    """Shut down the process-wide executor, if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
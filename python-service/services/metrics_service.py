@@ -0,0 +1,300 @@
+"""
+Scheduling Metrics Service
+
+Per-stage latency and work counters, exposed in the Prometheus text
+format by GET /metrics.
+
+Each scheduling run records into a RequestMetrics collector held in a
+context variable (like tracing_service's traces), so agents report work
+without it being threaded through every call:
+- ``stage(name)`` times a block; stages opened inside another stage are
+  recorded under the parent's path (e.g. "compromises/availability"), so
+  top-level stages never double-count nested work
+- ``count(name, n)`` adds to a per-request work counter
+Outside a collector both are a single context-variable lookup.
+
+The pipeline exports its collector with the response (also across worker
+processes), and the API process folds it into process-wide histograms:
+- scheduler_stage_duration_seconds{stage=...}
+- scheduler_<counter>{...} for every counter in COUNTER_HELP
+- scheduler_http_request_duration_seconds{method, path, status}
+
+Configuration:
+- SCHEDULER_METRICS: "1" (default) records metrics, "0" disables them
+- SCHEDULER_METRICS_IN_ANALYTICS: "1" also returns each request's stage
+  timings and counters under ``analytics["metrics"]`` (default "0")
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Metrics configuration
+METRICS_ENABLED = os.getenv("SCHEDULER_METRICS", "1") == "1"
+METRICS_IN_ANALYTICS = os.getenv("SCHEDULER_METRICS_IN_ANALYTICS", "0") == "1"
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+COUNT_BUCKETS = (
+    0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000,
+)
+
+# Work counters recorded per request
+COUNTER_HELP = {
+    "slots_generated": "Grid slots considered by availability search per request",
+    "slots_available": "Slots available to all required participants per request",
+    "busy_slots_scanned": "Busy slots scanned by the scoring kernel per request",
+    "busy_slots_kept": "Busy slots kept by window projection per request",
+    "relaxation_passes": "Negotiation relaxation passes run per request",
+    "rerank_slots_rescored": "Slots re-scored by incremental re-ranking per request",
+}
+
+# Separator of nested stage names
+STAGE_SEPARATOR = "/"
+
+
+class Histogram:
+    """
+    Thread-safe Prometheus histogram with optional labels.
+
+    Attributes:
+        name: Metric name
+        help: Help text
+        buckets: Sorted bucket upper bounds (+Inf is implicit)
+        label_names: Names of the labels, in exposition order
+    """
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value
+            *labels: Label values, in label_names order
+        """
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """Get {labels: {"count", "sum"}} for every series."""
+        with self._lock:
+            return {
+                labels: {"count": series[2], "sum": series[1]}
+                for labels, series in self._series.items()
+            }
+
+    def render(self) -> List[str]:
+        """Get the metric's lines in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted(self._series.items())
+            series_items = [(labels, ([*s[0]], s[1], s[2])) for labels, s in series_items]
+        for labels, (counts, total, count) in series_items:
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                bucket_labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_number(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+    def clear(self) -> None:
+        """Drop every series."""
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    """Format a sample value (integers without a fraction)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+STAGE_SECONDS = Histogram(
+    "scheduler_stage_duration_seconds",
+    "Time spent per scheduling stage",
+    LATENCY_BUCKETS,
+    ("stage",),
+)
+HTTP_SECONDS = Histogram(
+    "scheduler_http_request_duration_seconds",
+    "HTTP request latency until the response starts",
+    LATENCY_BUCKETS,
+    ("method", "path", "status"),
+)
+COUNTERS = {
+    name: Histogram(f"scheduler_{name}", help, COUNT_BUCKETS)
+    for name, help in COUNTER_HELP.items()
+}
+
+
+class RequestMetrics:
+    """
+    Stage timings and work counters of one scheduling run.
+
+    Stages may be timed concurrently (relaxation groups run on threads that
+    share the collector), so updates take a lock.
+
+    Attributes:
+        stages: Seconds per stage path
+        counters: Value per counter name
+    """
+
+    __slots__ = ("stages", "counters", "_lock")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, path: str, seconds: float) -> None:
+        """Add time to a stage path."""
+        with self._lock:
+            self.stages[path] = self.stages.get(path, 0.0) + seconds
+
+    def add_count(self, name: str, value: int) -> None:
+        """Add to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def export(self) -> Dict[str, Any]:
+        """Get the collected values in the form returned in analytics."""
+        with self._lock:
+            return {
+                "stages_ms": {path: round(seconds * 1000, 3) for path, seconds in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "scheduler_metrics", default=None
+)
+_current_stage: ContextVar[str] = ContextVar("scheduler_metrics_stage", default="")
+
+
+@contextmanager
+def collect() -> Iterator[Optional[RequestMetrics]]:
+    """
+    Open a collector for the duration of a scheduling run.
+
+    Yields:
+        The active collector, or None when metrics are disabled
+    """
+    if not METRICS_ENABLED:
+        yield None
+        return
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    stage_token = _current_stage.set("")
+    try:
+        yield metrics
+    finally:
+        _current_stage.reset(stage_token)
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a stage of the current run (no-op without a collector).
+
+    Args:
+        name: Stage name; nested stages are recorded as "parent/name"
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    parent = _current_stage.get()
+    path = f"{parent}{STAGE_SEPARATOR}{name}" if parent else name
+    token = _current_stage.set(path)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_stage(path, time.perf_counter() - started)
+        _current_stage.reset(token)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a work counter of the current run (no-op without a collector)."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.add_count(name, value)
+
+
+def active() -> bool:
+    """Check if the current run collects metrics (to skip costly counting)."""
+    return _current_metrics.get() is not None
+
+
+def observe(exported: Optional[Dict[str, Any]]) -> None:
+    """
+    Fold one run's exported metrics into the process-wide histograms.
+
+    Args:
+        exported: RequestMetrics.export() of the run (None is ignored)
+    """
+    if not exported:
+        return
+    for path, milliseconds in exported.get("stages_ms", {}).items():
+        STAGE_SECONDS.observe(milliseconds / 1000, path)
+    for name, value in exported.get("counters", {}).items():
+        histogram = COUNTERS.get(name)
+        if histogram is not None:
+            histogram.observe(value)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    """Record a stage timed outside a scheduling run (e.g. decode, encode)."""
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, name)
+
+
+def observe_http(method: str, path: str, status: int, seconds: float) -> None:
+    """Record the latency of one HTTP request."""
+    if METRICS_ENABLED:
+        HTTP_SECONDS.observe(seconds, method, path, str(status))
+
+
+def render() -> str:
+    """Get every metric in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for histogram in (STAGE_SECONDS, *COUNTERS.values(), HTTP_SECONDS):
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Drop every recorded observation (tests, benchmarks)."""
+    for histogram in (STAGE_SECONDS, *COUNTERS.values(), HTTP_SECONDS):
+        histogram.clear()
@@ -0,0 +1,247 @@
+"""
+Request Profiling Service
+
+Opt-in cProfile capture of single /schedule requests, so the profile of a
+slow production request can be inspected instead of guessed at from
+synthetic benchmarks.
+
+Profiling is disabled unless SCHEDULER_PROFILE_TOKEN is set; a request is
+profiled when its X-Scheduler-Profile header carries that token:
+- The pipeline runs under cProfile in whichever worker executes it
+  (run_schedule_profiled). Before Python 3.12 only that thread is
+  profiled, so relaxation passes run on the relaxation pool appear as
+  waits on their futures; from 3.12 cProfile is built on the
+  process-wide ``sys.monitoring``, so the profile also includes every
+  other thread of the worker (relaxation passes, concurrent requests)
+- One request is profiled at a time per worker process: a profiled
+  request arriving while another one runs is answered with a 429
+- The profile is stored in memory keyed by meeting_id (the most recent
+  SCHEDULER_PROFILE_ENTRIES profiles are kept) and a summary of the
+  costliest functions is returned under ``analytics["profile"]``
+- GET /profiles/{meeting_id} (same header) returns the stored profile as
+  a pstats dump (``pstats.Stats``, snakeviz, ...), text or JSON
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from schemas.scheduling import ScheduleRequest, ScheduleResponse
+from services import scheduling_pipeline
+from services.scheduling_pipeline import SchedulingError
+
+# Header carrying the profiling token
+PROFILE_HEADER = "X-Scheduler-Profile"
+
+# Profiling configuration (no token: profiling disabled)
+PROFILE_TOKEN = os.getenv("SCHEDULER_PROFILE_TOKEN") or None
+PROFILE_ENTRIES = int(os.getenv("SCHEDULER_PROFILE_ENTRIES", "16"))
+
+# Held while a request is profiled (cProfile cannot run twice at once
+# from Python 3.12 on)
+_profile_lock = threading.Lock()
+
+# Functions listed in a profile summary
+SUMMARY_LIMIT = 20
+
+PROFILE_FORMATS = ("pstats", "text", "json")
+
+# cProfile statistics: {(file, line, function): (cc, nc, tt, ct, callers)}
+ProfileStats = Dict[Tuple[str, int, str], Tuple[Any, ...]]
+
+
+def authorize(provided: Optional[str], token: Optional[str] = None) -> bool:
+    """
+    Check a request's profiling header.
+
+    Args:
+        provided: Value of the X-Scheduler-Profile header, if any
+        token: Expected token (defaults to SCHEDULER_PROFILE_TOKEN)
+
+    Returns:
+        True if the request should be profiled, False without a header
+
+    Raises:
+        SchedulingError: 403 if profiling is disabled or the token is wrong
+    """
+    if provided is None:
+        return False
+    expected = token if token is not None else PROFILE_TOKEN
+    if expected is None:
+        raise SchedulingError(status_code=403, detail="Request profiling is disabled")
+    if not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise SchedulingError(status_code=403, detail="Invalid profiling token")
+    return True
+
+
+def profile_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, ProfileStats]:
+    """
+    Run ``fn(*args)`` under cProfile, one call at a time.
+
+    Args:
+        fn: Callable to profile
+        *args: Positional arguments
+
+    Returns:
+        Tuple of (fn's result, picklable profile statistics)
+
+    Raises:
+        SchedulingError: 429 if another call is being profiled, 409 if
+            the profiler cannot be enabled (e.g. another profiling tool
+            is active)
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise SchedulingError(
+            status_code=429,
+            detail="Another request is being profiled, retry later"
+        )
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except Exception as e:
+            raise SchedulingError(status_code=409, detail=f"Profiler unavailable: {e}")
+        try:
+            result = fn(*args)
+        finally:
+            profiler.disable()
+    finally:
+        _profile_lock.release()
+    profiler.create_stats()
+    return result, profiler.stats
+
+
+def run_schedule_profiled(
+    request: ScheduleRequest,
+    trace_header: Optional[str] = None,
+) -> ScheduleResponse:
+    """
+    Schedule one meeting under cProfile (executor job, like run_schedule).
+
+    Args:
+        request: Scheduling request with participants and constraints
+        trace_header: Value of the X-Scheduler-Trace header, if any
+
+    Returns:
+        Scheduling response carrying the profile statistics in ``_profile``
+
+    Raises:
+        SchedulingError: If the request is invalid or scheduling fails
+    """
+    response, stats = profile_call(scheduling_pipeline.run_schedule, request, trace_header)
+    response._profile = stats
+    return response
+
+
+class _LoadedStats:
+    """Profile-like holder so pstats.Stats accepts in-memory statistics."""
+
+    def __init__(self, stats: ProfileStats):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def summarize(stats: ProfileStats, limit: int = SUMMARY_LIMIT) -> List[Dict[str, Any]]:
+    """
+    List the functions with the highest cumulative time.
+
+    Args:
+        stats: Profile statistics
+        limit: Number of functions to list
+
+    Returns:
+        {"function", "calls", "primitive_calls", "total_ms", "cumulative_ms"}
+        per function, costliest first
+    """
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": pstats.func_std_string(function),
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for function, (primitive_calls, calls, total, cumulative, _) in rows
+    ]
+
+
+def render(stats: ProfileStats, format: str = "pstats", limit: int = 50) -> bytes:
+    """
+    Encode profile statistics.
+
+    Args:
+        stats: Profile statistics
+        format: "pstats" (marshal dump, as written by ``Profile.dump_stats``),
+            "text" (``pstats`` report by cumulative time) or "json" (summary)
+        limit: Functions listed by the "text" and "json" formats
+
+    Returns:
+        Encoded profile
+
+    Raises:
+        ValueError: For unknown formats
+    """
+    if format == "pstats":
+        return marshal.dumps(stats)
+    if format == "text":
+        stream = io.StringIO()
+        pstats.Stats(_LoadedStats(stats), stream=stream).sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue().encode()
+    if format == "json":
+        return json.dumps(summarize(stats, limit)).encode()
+    raise ValueError(f"Unknown profile format: {format}")
+
+
+class ProfileStore:
+    """
+    In-memory store of the most recent request profiles, keyed by meeting_id.
+
+    A newer profile of the same meeting replaces the older one.
+    """
+
+    def __init__(self, max_entries: int = PROFILE_ENTRIES):
+        self.max_entries = max_entries
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, meeting_id: str, stats: ProfileStats) -> None:
+        """Store a meeting's profile, evicting the oldest beyond max_entries."""
+        with self._lock:
+            self._profiles.pop(meeting_id, None)
+            self._profiles[meeting_id] = {"captured_at": time.time(), "stats": stats}
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        """Get {"captured_at", "stats"} of a meeting's latest profile, if stored."""
+        with self._lock:
+            return self._profiles.get(meeting_id)
+
+    def meeting_ids(self) -> List[str]:
+        """Get the meetings with stored profiles, oldest first."""
+        with self._lock:
+            return list(self._profiles)
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ProfileStore:
+    """Get the process-wide profile store, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore()
+        return _store
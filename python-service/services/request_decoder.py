@@ -0,0 +1,234 @@
+"""
+Request Decoder
+
+Decodes scheduling request bodies without creating a TimeSlot model per
+busy slot, which dominates the cost of large requests (thousands of busy
+slots per participant):
+1. The body is parsed with orjson (json if orjson is not installed)
+2. Busy slot lists are detached and the rest of the request is validated
+   by the pydantic models as usual
+3. Busy slot times are converted in bulk with NumPy into sorted
+   epoch-microsecond lists (CompactBusySlots), which the busy index uses
+   directly; TimeSlot models are only built if something reads the slots
+
+Only canonical ISO 8601 timestamps take the bulk path: "YYYY-MM-DDTHH:MM:SS"
+with an optional fraction and a "Z", "+HH:MM"/"-HH:MM" or no offset (naive
+times are UTC, as in TimeSlot). Any other shape (other formats, missing or
+extra-typed fields, invalid values) sends the whole body through the
+pydantic models, so validation errors are exactly the public schema's.
+
+SCHEDULER_COMPACT_DECODE: "1" (default) enables the bulk path, "0" always
+validates with pydantic.
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from schemas.scheduling import BatchScheduleRequest, CompressedCalendarSummary, ScheduleRequest
+from agents.busy_index import CompactBusySlots
+
+# Lazy imports so decoding keeps working without the optional packages
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+COMPACT_DECODE = os.getenv("SCHEDULER_COMPACT_DECODE", "1") == "1"
+
+MICROSECONDS_PER_DAY = 24 * 60 * 60 * 1_000_000
+
+# Ordinal of 1970-01-01 (the epoch) and of 0001-01-01 in epoch microseconds
+_EPOCH_ORDINAL = 719163
+_MIN_EPOCH_US = (1 - _EPOCH_ORDINAL) * MICROSECONDS_PER_DAY
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# Timestamp bodies the fast path converts; anything else goes to pydantic
+# (numpy's parser alone is more lenient than the schema)
+_CANONICAL_BODY = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?", re.ASCII)
+
+# UTC offset in microseconds per timestamp suffix seen so far
+_offsets: Dict[str, int] = {"": 0, "Z": 0}
+
+
+def decode_schedule_request(body: bytes) -> ScheduleRequest:
+    """
+    Decode and validate a /schedule request body.
+
+    Args:
+        body: Raw JSON request body
+
+    Returns:
+        The validated request (busy slots as CompactBusySlots when possible)
+
+    Raises:
+        ValidationError: If the body does not match the ScheduleRequest schema
+    """
+    return _decode(body, ScheduleRequest, _request_summaries)
+
+
+def decode_batch_request(body: bytes) -> BatchScheduleRequest:
+    """
+    Decode and validate a /schedule/batch (or /schedule/joint) request body.
+
+    Raises:
+        ValidationError: If the body does not match the BatchScheduleRequest schema
+    """
+    return _decode(body, BatchScheduleRequest, _batch_summaries)
+
+
+def _request_summaries(participants: Any) -> Iterator[Any]:
+    """Calendar summaries of a ScheduleRequest, in participant order."""
+    for participant in participants:
+        yield participant.get("calendar_summary") if isinstance(participant, dict) else None
+
+
+def _batch_summaries(participants: Any) -> Iterator[Any]:
+    """Calendar summaries of a BatchScheduleRequest directory, in key order."""
+    for participant in participants.values():
+        yield participant.get("calendar_summary") if isinstance(participant, dict) else None
+
+
+def _decode(body: bytes, model: Type[Model], summaries_of: Any) -> Model:
+    """Decode a request, bulk-converting busy slots where possible."""
+    if not COMPACT_DECODE or np is None:
+        return model.model_validate_json(body)
+
+    try:
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
+        participants = data["participants"]
+        summaries = list(summaries_of(participants))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return model.model_validate_json(body)
+
+    # 1. Convert and detach busy slots (any surprise: validate everything normally)
+    compact: List[Optional[CompactBusySlots]] = []
+    for summary in summaries:
+        busy = summary.get("busy_slots") if isinstance(summary, dict) else None
+        if not isinstance(busy, list):
+            compact.append(None)
+            continue
+        slots = _compact_slots(busy)
+        if slots is None:
+            return model.model_validate_json(body)
+        summary["busy_slots"] = []
+        compact.append(slots)
+
+    # 2. Validate the (now small) rest of the request
+    try:
+        request = model.model_validate(data)
+    except ValidationError:
+        return model.model_validate_json(body)
+
+    # 3. Attach the compact slots to the validated summaries
+    validated = (
+        request.participants.values() if isinstance(request.participants, dict)
+        else request.participants
+    )
+    for participant, slots in zip(validated, compact):
+        if slots is not None:
+            summary: CompressedCalendarSummary = participant.calendar_summary
+            summary.busy_slots = slots
+    return request
+
+
+def _compact_slots(raw: List[Any]) -> Optional[CompactBusySlots]:
+    """
+    Convert JSON busy slots into sorted epoch lists.
+
+    Args:
+        raw: Busy slot objects as decoded from JSON
+
+    Returns:
+        CompactBusySlots, or None if any slot needs full validation
+    """
+    texts = []
+    for slot in raw:
+        if type(slot) is not dict:
+            return None
+        start = slot.get("start")
+        end = slot.get("end")
+        if type(start) is not str or type(end) is not str or type(slot.get("timezone", "")) is not str:
+            return None
+        texts.append(start)
+        texts.append(end)
+
+    parsed = _parse_timestamps(texts)
+    if parsed is None:
+        return None
+    local, epoch = parsed
+    starts = epoch[0::2]
+    ends = epoch[1::2]
+    start_days = local[0::2] // MICROSECONDS_PER_DAY + _EPOCH_ORDINAL
+
+    # Same order as sorting (start, end, day) triples
+    order = np.lexsort((start_days, ends, starts))
+    return CompactBusySlots(
+        starts=starts[order].tolist(),
+        ends=ends[order].tolist(),
+        start_days=start_days[order].tolist(),
+        sorted_ends=np.sort(ends).tolist(),
+        max_duration=int((ends - starts).max()) if len(raw) else 0,
+        raw=raw,
+    )
+
+
+def _parse_timestamps(texts: List[str]) -> Optional[Tuple["np.ndarray", "np.ndarray"]]:
+    """
+    Parse canonical ISO 8601 timestamps.
+
+    Args:
+        texts: Timestamp strings
+
+    Returns:
+        (local wall-clock, UTC) epoch microseconds as int64 arrays, or None
+        if any string is not canonical or not a valid time
+    """
+    bodies = []
+    offsets = []
+    for text in texts:
+        if text[-1:] == "Z":
+            body, suffix = text[:-1], "Z"
+        elif len(text) > 19 and text[-6] in "+-" and text[-3] == ":":
+            body, suffix = text[:-6], text[-6:]
+        else:
+            body, suffix = text, ""
+        if _CANONICAL_BODY.fullmatch(body) is None:
+            return None
+        offset = _offsets.get(suffix)
+        if offset is None:
+            offset = _parse_offset(suffix)
+            if offset is None:
+                return None
+        bodies.append(body)
+        offsets.append(offset)
+
+    try:
+        local = np.array(bodies, dtype="datetime64[us]").astype(np.int64)
+    except ValueError:
+        return None
+    if len(local) and local.min() < _MIN_EPOCH_US:
+        return None
+    return local, local - np.array(offsets, dtype=np.int64)
+
+
+def _parse_offset(suffix: str) -> Optional[int]:
+    """Parse a "+HH:MM" / "-HH:MM" suffix into microseconds (None if invalid)."""
+    if not (suffix[1:3].isdigit() and suffix[4:6].isdigit()):
+        return None
+    try:
+        offset = datetime.fromisoformat("2000-01-01T00:00:00" + suffix).utcoffset()
+    except ValueError:
+        return None
+    _offsets[suffix] = offset // timedelta(microseconds=1)
+    return _offsets[suffix]
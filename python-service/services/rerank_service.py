@@ -0,0 +1,634 @@
+"""
+Incremental Re-ranking Service
+
+Re-ranks a previous /schedule result after some participants' busy slots
+change (an accepted invite, a cancelled meeting), instead of re-running
+the whole pipeline on the full payload.
+
+A request sent with ``?rerank=true`` keeps its full ranking: the resolved
+request, every available slot with its score and grid position, and the
+materialized candidates. The response carries a ``rerank_handle``;
+POST /schedule/rerank takes that handle plus added/removed busy slots per
+participant and:
+- applies the changes to the participants' busy indexes
+- marks the time a change can influence: a busy slot only affects slots
+  within CONTEXT_REACH_US (plus the buffer) of it, which covers the 24h
+  fragmentation / density lookbacks and same-date matches across UTC
+  offsets, and the slots whose previous / next meeting it becomes or
+  stops being (conflict proximity reports those gaps however far away)
+- re-checks availability and re-scores only the grid slots in that time
+- splices them into the kept ranking by grid position, so the new top
+  candidates (ties included) are those of a full run on the edited
+  request; negotiation and analytics then run on them as usual
+
+Candidates outside the affected time keep their earlier scores, including
+the recency factor as of the first run.
+
+Rankings live in the API process (like profiles) and the same handle
+points to the latest ranking after each re-rank. A re-rank only replaces
+the ranking it started from: if another re-rank of the handle finished
+first, it is answered with a 409 and the client re-sends its changes.
+When a kept ranking has been evicted the client re-sends the full
+request.
+
+Eviction (least recently used first, like the calendar cache):
+- SCHEDULER_RERANK_ENTRIES: Rankings kept for re-ranking (default 256)
+- SCHEDULER_RERANK_BYTES: Maximum approximate size of the kept rankings
+  (default: 64 MiB); a ranking larger than that is not kept and its
+  response carries no rerank_handle
+"""
+
+import logging
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from schemas.scheduling import (
+    BusySlotChange,
+    MeetingSlotCandidate,
+    Participant,
+    ScheduleRequest,
+    ScheduleResponse,
+    TimeSlot,
+)
+from agents.availability_agent import AvailabilityAgent
+from agents.busy_index import CONTEXT_REACH_US, MICROSECONDS_PER_MINUTE, BusyIndex, to_epoch_us
+from agents.interval_set import IntervalSet
+from agents.optimization_agent import OptimizationAgent
+from services import metrics_service, scheduling_pipeline, tracing_service, window_projection
+from services.calendar_cache_service import INDEX_BYTES_PER_SLOT
+from services.scheduling_pipeline import SchedulingError
+
+logger = logging.getLogger(__name__)
+
+# Re-ranking configuration
+RERANK_ENTRIES = int(os.getenv("SCHEDULER_RERANK_ENTRIES", "256"))
+RERANK_MAX_BYTES = int(os.getenv("SCHEDULER_RERANK_BYTES", str(64 * 1024 * 1024)))
+
+# Approximate in-memory cost of an available slot (TimeSlot, score, grid
+# position and epoch bounds) and of a materialized candidate with its
+# score breakdown; busy slots cost what the calendar cache charges
+SLOT_BYTES = 300
+CANDIDATE_BYTES = 4096
+
+
+class RankingState:
+    """
+    Full ranking of one meeting, as needed to re-rank it.
+
+    Slots are identified by their grid position: the index of the slot in
+    the enumeration of every time window's grid (the "scan" strategy's
+    candidate order), so available slots are kept in grid order.
+
+    Attributes:
+        request: Request before window projection (full busy history)
+        positions: Grid position of each available slot, ascending
+        slots: Available slots, parallel to positions
+        starts: Slot starts (epoch microseconds), parallel to positions
+        ends: Slot ends (epoch microseconds), parallel to positions
+        scores: Overall slot scores, parallel to positions
+        candidates: Materialized candidates keyed by grid position
+    """
+
+    __slots__ = ("request", "positions", "slots", "starts", "ends", "scores", "candidates")
+
+    def __init__(
+        self,
+        request: ScheduleRequest,
+        positions: List[int],
+        slots: List[TimeSlot],
+        starts: List[int],
+        ends: List[int],
+        scores: List[float],
+        candidates: Dict[int, MeetingSlotCandidate],
+    ):
+        self.request = request
+        self.positions = positions
+        self.slots = slots
+        self.starts = starts
+        self.ends = ends
+        self.scores = scores
+        self.candidates = candidates
+
+    @classmethod
+    def capture(cls, ranking: Dict[str, Any]) -> "RankingState":
+        """
+        Build the state from what a pipeline run recorded.
+
+        Args:
+            ranking: Dict filled by scheduling_pipeline.run_schedule
+
+        Returns:
+            Ranking state of the run
+        """
+        request = ranking["request"]
+        slots = ranking["available_slots"]
+        starts = [to_epoch_us(slot.start) for slot in slots]
+        ends = [to_epoch_us(slot.end) for slot in slots]
+
+        # Available slots are a subsequence of the grid, in the same order
+        positions: List[int] = []
+        for position, start, end in _grid_bounds(request):
+            if len(positions) == len(slots):
+                break
+            i = len(positions)
+            if (start, end) == (starts[i], ends[i]):
+                positions.append(position)
+
+        candidates = {
+            positions[i]: candidate
+            for i, candidate in zip(ranking["top_indices"], ranking["candidates"])
+        }
+        return cls(request, positions, slots, starts, ends, ranking["scores"], candidates)
+
+    def estimated_bytes(self) -> int:
+        """
+        Approximate memory held by the ranking.
+
+        Summaries shared with the calendar cache are counted again, so
+        this errs on the large side.
+        """
+        busy = sum(
+            len(participant.calendar_summary.busy_slots)
+            for participant in self.request.participants
+            if participant.calendar_summary is not None
+        )
+        return (
+            INDEX_BYTES_PER_SLOT * busy
+            + SLOT_BYTES * len(self.positions)
+            + CANDIDATE_BYTES * len(self.candidates)
+        )
+
+
+def _grid_windows(request: ScheduleRequest) -> Iterator[Tuple[int, datetime, datetime, int]]:
+    """
+    Yield (first grid position, window start, window end, slot count) per window.
+    """
+    constraints = request.constraints
+    duration_us = constraints.duration_minutes * MICROSECONDS_PER_MINUTE
+    step_us = AvailabilityAgent.SLOT_STEP_MINUTES * MICROSECONDS_PER_MINUTE
+    position = 0
+    for day_start, day_end in AvailabilityAgent._iter_time_windows(constraints, request.participants):
+        # Same count as _count_grid_slots (wall-clock span of the window)
+        span = (day_end - day_start) // timedelta(microseconds=1)
+        count = (span - duration_us) // step_us + 1 if span >= duration_us else 0
+        yield position, day_start, day_end, count
+        position += count
+
+
+def _window_bounds(
+    day_start: datetime,
+    day_end: datetime,
+    count: int,
+    request: ScheduleRequest,
+) -> Iterator[Tuple[int, int, int]]:
+    """Yield (index in window, start_us, end_us) of a window's grid slots."""
+    constraints = request.constraints
+    duration_us = constraints.duration_minutes * MICROSECONDS_PER_MINUTE
+    step_us = AvailabilityAgent.SLOT_STEP_MINUTES * MICROSECONDS_PER_MINUTE
+    if day_start.utcoffset() == day_end.utcoffset():
+        window_start = to_epoch_us(day_start)
+        for k in range(count):
+            start = window_start + k * step_us
+            yield k, start, start + duration_us
+    else:
+        # Wall-clock steps across a DST change are not linear in epoch time
+        for k in range(count):
+            slot = _grid_slot(day_start, k, request)
+            yield k, to_epoch_us(slot.start), to_epoch_us(slot.end)
+
+
+def _grid_slot(day_start: datetime, k: int, request: ScheduleRequest) -> TimeSlot:
+    """Build a window's k-th grid slot like AvailabilityAgent._generate_candidate_slots."""
+    constraints = request.constraints
+    slot_start = day_start + timedelta(minutes=AvailabilityAgent.SLOT_STEP_MINUTES * k)
+    return TimeSlot(
+        start=slot_start,
+        end=slot_start + timedelta(minutes=constraints.duration_minutes),
+        timezone=constraints.timezone,
+    )
+
+
+def _grid_bounds(request: ScheduleRequest) -> Iterator[Tuple[int, int, int]]:
+    """Yield (grid position, start_us, end_us) of every grid slot, in grid order."""
+    for first, day_start, day_end, count in _grid_windows(request):
+        for k, start, end in _window_bounds(day_start, day_end, count, request):
+            yield first + k, start, end
+
+
+def apply_changes(
+    request: ScheduleRequest,
+    changes: Sequence[BusySlotChange],
+) -> Tuple[ScheduleRequest, IntervalSet]:
+    """
+    Apply busy-slot changes and find the time they can influence.
+
+    For a changed busy slot [start, end) of a participant, a candidate slot
+    can only score differently if it intersects:
+    - [start - reach, end + reach), reach being CONTEXT_REACH_US plus the
+      buffer (overlaps, buffered availability, windowed counts)
+    - [previous start, start), previous start being the participant's
+      latest busy start before it (slots whose next meeting changes)
+    - [end, next end), next end being the participant's earliest busy end
+      after it (slots whose previous meeting changes)
+
+    Args:
+        request: Request before window projection
+        changes: Changes to apply, in order
+
+    Returns:
+        Tuple of (edited request, affected time in epoch microseconds)
+
+    Raises:
+        SchedulingError: 400 for unknown participants, 409 for removed busy
+            slots that are not in the participant's calendar
+    """
+    participants = list(request.participants)
+    by_id = {participant.user_id: i for i, participant in enumerate(participants)}
+    constraints = request.constraints
+    reach = CONTEXT_REACH_US + constraints.buffer_minutes * MICROSECONDS_PER_MINUTE
+    low, high = window_projection.projection_bounds(constraints)
+
+    affected: List[Tuple[int, int]] = []
+    for change in changes:
+        if change.user_id not in by_id:
+            raise SchedulingError(status_code=400, detail=f"Unknown participant id: {change.user_id}")
+        participant = participants[by_id[change.user_id]]
+        summary = participant.calendar_summary
+        added = [
+            (to_epoch_us(slot.start), to_epoch_us(slot.end), slot.start.toordinal())
+            for slot in change.added_busy_slots
+        ]
+        removed = [(to_epoch_us(slot.start), to_epoch_us(slot.end)) for slot in change.removed_busy_slots]
+        try:
+            index = BusyIndex.for_summary(summary).edit(added, removed)
+        except ValueError as e:
+            raise SchedulingError(status_code=409, detail=f"{change.user_id}: {e}")
+
+        for start, end in [interval[:2] for interval in added] + removed:
+            position = bisect_left(index.starts, start)
+            previous_start = index.starts[position - 1] if position > 0 else low
+            position = bisect_right(index.sorted_ends, end)
+            next_end = index.sorted_ends[position] if position < index.size else high
+            affected.append((min(start - reach, previous_start), max(end + reach, next_end)))
+
+        summary = summary.model_copy(update={"busy_slots": index.source})
+        summary._busy_index = index
+        participants[by_id[change.user_id]] = participant.model_copy(
+            update={"calendar_summary": summary}
+        )
+
+    return request.model_copy(update={"participants": participants}), IntervalSet(affected)
+
+
+def _project_participants(
+    participants: List[Participant],
+    request: ScheduleRequest,
+    affected: IntervalSet,
+) -> List[Participant]:
+    """
+    Narrow participants' busy slots to what slots in the affected time can see.
+
+    Only availability checks and scores of slots inside ``affected`` use
+    the result, so it is projected like window_projection does for the
+    whole request, but onto the affected time.
+    """
+    if not affected:
+        return participants
+    constraints = request.constraints
+    reach = CONTEXT_REACH_US + constraints.buffer_minutes * MICROSECONDS_PER_MINUTE
+    low, high = window_projection.projection_bounds(constraints)
+    start_us = max(low, affected.starts[0] - reach)
+    end_us = min(high, affected.ends[-1] + reach)
+    narrowed = []
+    for participant in participants:
+        if participant.calendar_summary is not None:
+            summary = window_projection.project_summary(participant.calendar_summary, start_us, end_us)
+            if summary is not participant.calendar_summary:
+                participant = participant.model_copy(update={"calendar_summary": summary})
+        narrowed.append(participant)
+    return narrowed
+
+
+def rerank(
+    state: RankingState,
+    changes: Sequence[BusySlotChange],
+) -> ScheduleResponse:
+    """
+    Re-rank a kept ranking after busy-slot changes.
+
+    Args:
+        state: Ranking of the previous run
+        changes: Busy-slot changes, applied in order
+
+    Returns:
+        Scheduling response for the edited request, carrying the new
+        ranking state in ``_ranking``
+
+    Raises:
+        SchedulingError: If the changes are invalid or re-ranking fails
+    """
+    start_time = time.time()
+    try:
+        with metrics_service.stage("rerank_changes"):
+            request, affected = apply_changes(state.request, changes)
+            projected = window_projection.project_request(request)
+            participants = _project_participants(projected.participants, request, affected)
+        constraints = request.constraints
+
+        # 1. Grid slots in the affected time that are available now (the
+        # "sweep" test: no merged, buffered busy run of a required
+        # participant overlaps the slot)
+        fresh_positions: List[int] = []
+        fresh_slots: List[TimeSlot] = []
+        fresh_starts: List[int] = []
+        fresh_ends: List[int] = []
+        with metrics_service.stage("rerank_availability"):
+            busy_starts, busy_ends = AvailabilityAgent._merge_required_busy(
+                participants, constraints.buffer_minutes * MICROSECONDS_PER_MINUTE
+            )
+            for first, day_start, day_end, count in _grid_windows(request):
+                if not count or not affected.overlaps(to_epoch_us(day_start), to_epoch_us(day_end)):
+                    continue
+                for k, start, end in _window_bounds(day_start, day_end, count, request):
+                    if not affected.overlaps(start, end):
+                        continue
+                    position = bisect_right(busy_ends, start)
+                    if position < len(busy_starts) and busy_starts[position] < end:
+                        continue
+                    fresh_positions.append(first + k)
+                    fresh_slots.append(_grid_slot(day_start, k, request))
+                    fresh_starts.append(start)
+                    fresh_ends.append(end)
+
+        # 2. Score them; kept slots outside the affected time keep their scores
+        with metrics_service.stage("rerank_scoring"):
+            fresh_scores, materialize = (
+                OptimizationAgent.score_slots(fresh_slots, participants, constraints)
+                if fresh_slots else ([], None)
+            )
+        metrics_service.count("rerank_slots_rescored", len(fresh_slots))
+        kept = [
+            i for i in range(len(state.positions))
+            if not affected.overlaps(state.starts[i], state.ends[i])
+        ]
+
+        # 3. Splice both by grid position (ties then break as in a full run)
+        positions: List[int] = []
+        sources: List[Tuple[bool, int]] = []
+        i = j = 0
+        while i < len(kept) or j < len(fresh_positions):
+            if j == len(fresh_positions) or (
+                i < len(kept) and state.positions[kept[i]] < fresh_positions[j]
+            ):
+                positions.append(state.positions[kept[i]])
+                sources.append((False, kept[i]))
+                i += 1
+            else:
+                positions.append(fresh_positions[j])
+                sources.append((True, j))
+                j += 1
+        slots = [fresh_slots[k] if fresh else state.slots[k] for fresh, k in sources]
+        scores = [fresh_scores[k] if fresh else state.scores[k] for fresh, k in sources]
+        starts = [fresh_starts[k] if fresh else state.starts[k] for fresh, k in sources]
+        ends = [fresh_ends[k] if fresh else state.ends[k] for fresh, k in sources]
+
+        # 4. Top candidates: reuse unaffected ones, materialize the others
+        with metrics_service.stage("materialize"):
+            top = OptimizationAgent.top_indices(scores, constraints.max_candidates)
+            # Unaffected slots that were not in the previous top are scored
+            # again (in one batch) only to build their candidates
+            missing = [
+                i for i in top
+                if not sources[i][0] and positions[i] not in state.candidates
+            ]
+            if missing:
+                _, materialize_missing = OptimizationAgent.score_slots(
+                    [slots[i] for i in missing], projected.participants, constraints
+                )
+            candidates: Dict[int, MeetingSlotCandidate] = {}
+            for i in top:
+                fresh, k = sources[i]
+                if fresh:
+                    candidate = materialize(k)
+                elif positions[i] in state.candidates:
+                    candidate = state.candidates[positions[i]]
+                else:
+                    candidate = materialize_missing(missing.index(i))
+                candidates[positions[i]] = candidate
+            ranked_candidates = list(candidates.values())
+
+        trace = tracing_service.active(logging.INFO)
+        if trace is not None:
+            trace.event(
+                "rerank",
+                logging.INFO,
+                changes=len(changes),
+                affected_ranges=len(affected),
+                slots_kept=len(kept),
+                slots_rescored=len(fresh_slots),
+            )
+
+        if not slots:
+            response = scheduling_pipeline.no_slots_response(projected, start_time)
+        else:
+            response = scheduling_pipeline.negotiated_response(
+                projected, ranked_candidates, len(slots), start_time
+            )
+        response.analytics["rerank"] = {
+            "changes": len(changes),
+            "affected_ranges": len(affected),
+            "slots_kept": len(kept),
+            "slots_rescored": len(fresh_slots),
+        }
+        response._ranking = RankingState(request, positions, slots, starts, ends, scores, candidates)
+        return response
+
+    except SchedulingError:
+        raise
+    except Exception as e:
+        logger.exception("Re-ranking failed for %s", state.request.meeting_id)
+
+        raise SchedulingError(
+            status_code=500,
+            detail=f"Internal scheduling error: {str(e)}"
+        )
+
+
+def run_schedule_tracked(
+    request: ScheduleRequest,
+    trace_header: Optional[str] = None,
+) -> ScheduleResponse:
+    """
+    Schedule one meeting and keep its full ranking (executor job, like run_schedule).
+
+    Args:
+        request: Scheduling request with participants and constraints
+        trace_header: Value of the X-Scheduler-Trace header, if any
+
+    Returns:
+        Scheduling response carrying the ranking state in ``_ranking``
+
+    Raises:
+        SchedulingError: If the request is invalid or scheduling fails
+    """
+    ranking: Dict[str, Any] = {}
+    response = scheduling_pipeline.run_schedule(request, trace_header, ranking=ranking)
+    response._ranking = RankingState.capture(ranking)
+    return response
+
+
+def run_rerank(
+    state: RankingState,
+    changes: Sequence[BusySlotChange],
+    trace_header: Optional[str] = None,
+) -> ScheduleResponse:
+    """
+    Re-rank a kept ranking, tracing it if sampled or requested (executor job).
+
+    Args:
+        state: Ranking of the previous run
+        changes: Busy-slot changes, applied in order
+        trace_header: Value of the X-Scheduler-Trace header, if any
+
+    Returns:
+        Scheduling response carrying the new ranking state in ``_ranking``
+
+    Raises:
+        SchedulingError: If the changes are invalid or re-ranking fails
+    """
+    return scheduling_pipeline.run_observed(
+        state.request.meeting_id,
+        trace_header,
+        lambda trace: rerank(state, changes),
+    )
+
+
+class _Entry:
+    """One kept ranking."""
+
+    __slots__ = ("state", "size")
+
+    def __init__(self, state: RankingState, size: int):
+        self.state = state
+        self.size = size
+
+
+class RankingStore:
+    """
+    In-memory LRU store of rankings, keyed by handle.
+
+    Attributes:
+        max_entries: Maximum number of rankings
+        max_bytes: Maximum total approximate size of rankings
+    """
+
+    def __init__(self, max_entries: int = RERANK_ENTRIES, max_bytes: int = RERANK_MAX_BYTES):
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, state: RankingState) -> Optional[str]:
+        """
+        Store a new ranking, evicting least recently used ones to stay within limits.
+
+        Args:
+            state: Ranking to keep
+
+        Returns:
+            The ranking's new handle, or None if it is too large to keep
+        """
+        size = state.estimated_bytes()
+        if self.max_entries == 0 or size > self.max_bytes:
+            return None
+        handle = secrets.token_urlsafe(16)
+        with self._lock:
+            self._insert(handle, _Entry(state, size))
+        return handle
+
+    def replace(self, handle: str, previous: RankingState, state: RankingState) -> Optional[str]:
+        """
+        Replace a ranking with its re-ranked successor.
+
+        Args:
+            handle: Handle of the ranking
+            previous: Ranking the re-rank started from
+            state: Re-ranked ranking
+
+        Returns:
+            The handle, or None if the new ranking is too large to keep
+            (the handle is then dropped)
+
+        Raises:
+            SchedulingError: 404 if the ranking was evicted meanwhile, 409
+                if another re-rank replaced it first
+        """
+        size = state.estimated_bytes()
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                raise SchedulingError(status_code=404, detail="Unknown or expired rerank handle")
+            if entry.state is not previous:
+                raise SchedulingError(
+                    status_code=409,
+                    detail="Ranking was changed by a concurrent re-rank, re-send the changes"
+                )
+            self._drop(handle)
+            if size > self.max_bytes:
+                return None
+            self._insert(handle, _Entry(state, size))
+        return handle
+
+    def get(self, handle: str) -> Optional[RankingState]:
+        """Get the ranking stored under a handle, if still kept."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            self._entries.move_to_end(handle)
+            return entry.state
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store counters for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _insert(self, handle: str, entry: _Entry) -> None:
+        """Add an entry and evict least recently used ones beyond the limits (lock held)."""
+        self._entries[handle] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, handle: str) -> None:
+        """Remove an entry (lock held)."""
+        self._bytes -= self._entries.pop(handle).size
+
+
+_store: Optional[RankingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RankingStore:
+    """Get the process-wide ranking store, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RankingStore()
+        return _store
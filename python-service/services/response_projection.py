@@ -0,0 +1,157 @@
+"""
+Response Projection
+
+Trims and encodes scheduling responses. Most callers only read each
+candidate's slot and score, while a full ScheduleResponse also carries
+every candidate's score_breakdown and the request's analytics:
+- ``verbosity``: "minimal" (slot and score per candidate), "standard"
+  (everything but score_breakdown and analytics) or "full" (default,
+  the complete response)
+- ``fields``: comma-separated field names, overriding verbosity.
+  Candidate fields (e.g. "slot,score") select fields of every candidate;
+  response fields (e.g. "analytics", "processing_time_ms") add top-level
+  fields. "candidates" alone keeps whole candidates.
+meeting_id, success and message are always kept, and so is rerank_handle
+when the response has one.
+
+Responses are encoded with orjson (json if orjson is not installed),
+through ORJSONResponse for plain JSON and ``dumps`` for NDJSON lines.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+
+from schemas.scheduling import MeetingSlotCandidate, ScheduleResponse
+from services.scheduling_pipeline import SchedulingError
+
+# Lazy import so responses are still encoded without orjson
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+VERBOSITY_LEVELS = ("minimal", "standard", "full")
+
+# Response fields kept by every projection
+ENVELOPE_FIELDS = ("meeting_id", "success", "message")
+
+# Candidate fields of the "minimal" verbosity
+MINIMAL_CANDIDATE_FIELDS = ("slot", "score")
+
+# Fields dropped by the "standard" verbosity
+STANDARD_EXCLUDED_FIELDS = ("analytics",)
+STANDARD_EXCLUDED_CANDIDATE_FIELDS = ("score_breakdown",)
+
+# pydantic ``include`` specification of a ScheduleResponse (None: everything)
+Projection = Optional[Dict[str, Any]]
+
+
+def parse_projection(fields: Optional[str] = None, verbosity: str = "full") -> Projection:
+    """
+    Build the projection requested by ``?fields=`` / ``?verbosity=``.
+
+    Args:
+        fields: Comma-separated response and/or candidate field names
+        verbosity: "minimal", "standard" or "full" (used when fields is empty)
+
+    Returns:
+        Include specification for ``project`` (None for the full response)
+
+    Raises:
+        SchedulingError: 422 for unknown fields or verbosity levels
+    """
+    response_fields = ScheduleResponse.model_fields
+    candidate_fields = MeetingSlotCandidate.model_fields
+
+    names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    if not names:
+        if verbosity not in VERBOSITY_LEVELS:
+            raise SchedulingError(
+                status_code=422,
+                detail=f"Unknown verbosity '{verbosity}', expected one of: {', '.join(VERBOSITY_LEVELS)}"
+            )
+        if verbosity == "full":
+            return None
+        if verbosity == "minimal":
+            return _include(ENVELOPE_FIELDS, MINIMAL_CANDIDATE_FIELDS)
+        return _include(
+            [name for name in response_fields if name not in STANDARD_EXCLUDED_FIELDS],
+            [name for name in candidate_fields if name not in STANDARD_EXCLUDED_CANDIDATE_FIELDS],
+        )
+
+    unknown = [name for name in names if name not in response_fields and name not in candidate_fields]
+    if unknown:
+        raise SchedulingError(
+            status_code=422,
+            detail=f"Unknown response fields: {', '.join(unknown)}"
+        )
+    top_level = [name for name in names if name in response_fields]
+    selected = [name for name in names if name in candidate_fields]
+    return _include(ENVELOPE_FIELDS + tuple(top_level), selected or None)
+
+
+def _include(top_level: Any, candidate_fields: Optional[Any]) -> Dict[str, Any]:
+    """Assemble an include specification (candidate_fields None: whole candidates)."""
+    include: Dict[str, Any] = {name: True for name in top_level if name != "candidates"}
+    if candidate_fields is not None:
+        include["candidates"] = {"__all__": set(candidate_fields)}
+    elif "candidates" in top_level:
+        include["candidates"] = True
+    return include
+
+
+def project(response: ScheduleResponse, projection: Projection = None) -> Dict[str, Any]:
+    """
+    Get the JSON-compatible form of a response, restricted to a projection.
+
+    Args:
+        response: Scheduling response
+        projection: Result of ``parse_projection`` (None keeps everything)
+
+    Returns:
+        JSON-compatible dictionary
+    """
+    if projection is not None and response.rerank_handle is not None:
+        projection = {**projection, "rerank_handle": True}
+    return response.model_dump(mode="json", include=projection)
+
+
+def project_candidates(
+    candidates: List[Dict[str, Any]],
+    projection: Projection = None,
+) -> List[Dict[str, Any]]:
+    """
+    Restrict already dumped candidates (e.g. of streamed progress events) to a projection.
+
+    Args:
+        candidates: Candidates as JSON-compatible dictionaries
+        projection: Result of ``parse_projection`` (None keeps everything)
+
+    Returns:
+        The candidates with only the projected fields
+    """
+    if projection is None:
+        return candidates
+    candidate_include = projection.get("candidates")
+    if candidate_include is None:
+        return []
+    if candidate_include is True:
+        return candidates
+    fields = candidate_include["__all__"]
+    return [{name: value for name, value in candidate.items() if name in fields} for candidate in candidates]
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-compatible content as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (json if orjson is not installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
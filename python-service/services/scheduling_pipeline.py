@@ -0,0 +1,428 @@
+"""
+Scheduling Pipeline
+
+Runs the agent pipeline (window projection -> availability ->
+optimization -> negotiation -> analytics) for one request. Kept free of
+FastAPI objects so it can execute in a worker thread or a worker
+process: arguments and results are plain pydantic models and errors are
+raised as picklable SchedulingError.
+
+Progress can be observed through an optional ``on_progress`` callback that
+receives JSON-ready events as stages finish (used for streaming responses):
+- {"event": "candidates", "stage": "ranked", "candidates": [...]}
+- {"event": "compromise", "strategy": ..., "candidates": [...]}
+
+Each run records per-stage timings and work counters (see
+metrics_service); they travel with the response (``response._metrics``) so
+the API process can fold them into its /metrics histograms.
+
+An optional ``ranking`` dict is filled with the request and every
+available slot's score, which rerank_service keeps to re-rank the meeting
+after calendar changes; it builds its responses with the same
+no_slots_response / negotiated_response helpers.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from schemas.scheduling import (
+    BatchMeeting,
+    MeetingSlotCandidate,
+    Participant,
+    ScheduleRequest,
+    ScheduleResponse,
+)
+from agents.availability_agent import AvailabilityAgent
+from agents.preference_agent import PreferenceAgent
+from agents.optimization_agent import OptimizationAgent
+from agents.negotiation_agent import NegotiationAgent
+from services import metrics_service, tracing_service, window_projection
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulingError(Exception):
+    """Scheduling failure carrying the HTTP status to report."""
+    
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def build_meeting_request(
+    meeting: BatchMeeting,
+    directory: Dict[str, Participant],
+) -> ScheduleRequest:
+    """
+    Resolve a batch meeting against the shared participant directory.
+    
+    Participants are shallow copies that share the directory's calendar
+    summaries, so each summary's busy index is built once per batch.
+    
+    Args:
+        meeting: Meeting referencing participants by user id
+        directory: Shared participants keyed by user id
+        
+    Returns:
+        Stand-alone scheduling request for the meeting
+        
+    Raises:
+        SchedulingError: If the meeting references unknown participants
+    """
+    unknown = [uid for uid in meeting.participant_ids if uid not in directory]
+    if unknown:
+        raise SchedulingError(
+            status_code=400,
+            detail=f"Unknown participant ids: {', '.join(unknown)}"
+        )
+    
+    optional_ids = set(meeting.optional_participant_ids)
+    participants = [
+        directory[uid].model_copy(update={"is_required": uid not in optional_ids})
+        for uid in meeting.participant_ids
+    ]
+    
+    return ScheduleRequest(
+        meeting_id=meeting.meeting_id,
+        participants=participants,
+        constraints=meeting.constraints,
+        preferences=meeting.preferences,
+    )
+
+
+def run_schedule(
+    request: ScheduleRequest,
+    trace_header: Optional[str] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ranking: Optional[Dict[str, Any]] = None,
+) -> ScheduleResponse:
+    """
+    Schedule one meeting, tracing it if sampled or requested.
+    
+    The trace is opened here (not by the caller) so that it lives in the
+    context of whichever thread or process executes the pipeline.
+    
+    Args:
+        request: Scheduling request with participants and constraints
+        trace_header: Value of the X-Scheduler-Trace header, if any
+        on_progress: Called with each intermediate event, in order
+        ranking: Filled with the full ranking (see _run_agents), if given
+        
+    Returns:
+        Scheduling response with ranked candidates and analytics
+        
+    Raises:
+        SchedulingError: If the request is invalid or scheduling fails
+    """
+    return run_observed(
+        request.meeting_id,
+        trace_header,
+        lambda trace: _run_agents(request, trace, on_progress, ranking),
+    )
+
+
+def run_observed(
+    meeting_id: str,
+    trace_header: Optional[str],
+    run: Callable[[Optional[tracing_service.RequestTrace]], ScheduleResponse],
+) -> ScheduleResponse:
+    """
+    Run a scheduling job under a request trace and a metrics collector.
+    
+    Args:
+        meeting_id: Meeting the job schedules
+        trace_header: Value of the X-Scheduler-Trace header, if any
+        run: Job producing the response, given the open trace (if any)
+        
+    Returns:
+        The job's response, carrying its trace and metrics
+    """
+    with tracing_service.trace_request(meeting_id, trace_header) as trace, \
+            metrics_service.collect() as metrics:
+        response = run(trace)
+        if trace is not None and trace.capture:
+            response.analytics["trace"] = trace.export()
+        if metrics is not None:
+            response._metrics = metrics.export()
+            if metrics_service.METRICS_IN_ANALYTICS:
+                response.analytics["metrics"] = response._metrics
+        return response
+
+
+def rank_meeting(
+    request: ScheduleRequest,
+    pool_size: int,
+) -> List[MeetingSlotCandidate]:
+    """
+    Get a deeper pool of negotiated candidates for joint scheduling.
+    
+    Runs the same availability, optimization and negotiation steps as
+    /schedule, but keeps up to ``pool_size`` candidates (at least the
+    request's own max_candidates).
+    
+    Args:
+        request: Scheduling request for one meeting
+        pool_size: Number of candidates to keep
+        
+    Returns:
+        Candidates for the meeting, best first (empty if none are available)
+        
+    Raises:
+        SchedulingError: If scheduling fails
+    """
+    try:
+        constraints = request.constraints.model_copy(
+            update={"max_candidates": max(pool_size, request.constraints.max_candidates)}
+        )
+        request = window_projection.project_request(request)
+        available_slots = AvailabilityAgent.find_available_slots(
+            participants=request.participants,
+            constraints=constraints,
+        )
+        if not available_slots:
+            return []
+        
+        ranked_candidates = OptimizationAgent.rank_candidates(
+            available_slots=available_slots,
+            participants=request.participants,
+            constraints=constraints,
+        )
+        negotiated_candidates, _ = NegotiationAgent.negotiate_schedule(
+            candidates=ranked_candidates,
+            participants=request.participants,
+            constraints=constraints,
+        )
+        return negotiated_candidates
+        
+    except Exception as e:
+        logger.exception("Candidate ranking failed for %s", request.meeting_id)
+        
+        raise SchedulingError(
+            status_code=500,
+            detail=f"Internal scheduling error: {str(e)}"
+        )
+
+
+def no_slots_response(request: ScheduleRequest, start_time: float) -> ScheduleResponse:
+    """
+    Build the response of a request without available slots.
+    
+    Args:
+        request: Scheduling request
+        start_time: time.time() when processing started
+        
+    Returns:
+        Unsuccessful response without candidates
+    """
+    processing_time = (time.time() - start_time) * 1000
+    
+    return ScheduleResponse(
+        meeting_id=request.meeting_id,
+        candidates=[],
+        total_candidates_evaluated=0,
+        processing_time_ms=round(processing_time, 2),
+        negotiation_rounds=0,
+        analytics={
+            "message": "No available time slots found within constraints",
+            "participants_count": len(request.participants),
+        },
+        success=False,
+        message="No available time slots found. Try relaxing constraints.",
+    )
+
+
+def negotiated_response(
+    request: ScheduleRequest,
+    ranked_candidates: List[MeetingSlotCandidate],
+    slots_evaluated: int,
+    start_time: float,
+    on_compromise: Optional[Callable[[str, List[MeetingSlotCandidate]], None]] = None,
+) -> ScheduleResponse:
+    """
+    Negotiate ranked candidates and build the response with its analytics.
+    
+    Args:
+        request: Scheduling request (participants as ranked)
+        ranked_candidates: Candidates from the Optimization Agent
+        slots_evaluated: Number of available slots that were ranked
+        start_time: time.time() when processing started
+        on_compromise: Called as each compromise pass finishes
+        
+    Returns:
+        Scheduling response with negotiated candidates and analytics
+    """
+    # Step 4: Negotiate conflicts if needed
+    # (compromise search is recorded as the nested "negotiation/compromises")
+    with metrics_service.stage("negotiation"):
+        negotiated_candidates, negotiation_rounds = NegotiationAgent.negotiate_schedule(
+            candidates=ranked_candidates,
+            participants=request.participants,
+            constraints=request.constraints,
+            on_compromise=on_compromise,
+        )
+    
+    # Calculate analytics
+    with metrics_service.stage("analytics"):
+        time_savings = OptimizationAgent.calculate_time_savings_analytics(
+            candidates=negotiated_candidates,
+            participant_count=len(request.participants),
+        )
+        
+        conflict_analysis = NegotiationAgent.analyze_conflicts(
+            candidates=negotiated_candidates,
+            participants=request.participants,
+        )
+        
+        group_preferences = PreferenceAgent.analyze_group_preferences(
+            participants=request.participants,
+        )
+    
+    # Combine analytics
+    analytics = {
+        **time_savings,
+        **conflict_analysis,
+        "group_preferences": group_preferences,
+        "total_slots_evaluated": slots_evaluated,
+        "participants_count": len(request.participants),
+        "required_participants": sum(
+            1 for p in request.participants if p.is_required
+        ),
+        "optional_participants": sum(
+            1 for p in request.participants if not p.is_required
+        ),
+    }
+    
+    # Calculate processing time
+    processing_time = (time.time() - start_time) * 1000
+    
+    # Determine success
+    success = len(negotiated_candidates) > 0
+    message = (
+        f"Found {len(negotiated_candidates)} optimal meeting slots"
+        if success
+        else "No suitable meeting times found"
+    )
+    
+    # Build response
+    response = ScheduleResponse(
+        meeting_id=request.meeting_id,
+        candidates=negotiated_candidates,
+        total_candidates_evaluated=slots_evaluated,
+        processing_time_ms=round(processing_time, 2),
+        negotiation_rounds=negotiation_rounds,
+        analytics=analytics,
+        success=success,
+        message=message,
+    )
+    
+    return response
+
+
+def _run_agents(
+    request: ScheduleRequest,
+    trace: Optional[tracing_service.RequestTrace],
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ranking: Optional[Dict[str, Any]] = None,
+) -> ScheduleResponse:
+    """
+    Run the agent pipeline for one scheduling request.
+    
+    With ``ranking``, the run also records what incremental re-ranking
+    needs: the "request" before window projection, the "available_slots"
+    with their "scores", and the ranked "candidates" with their
+    "top_indices".
+    """
+    start_time = time.time()
+    resolved_request = request
+    
+    try:
+        if trace is not None:
+            constraints = request.constraints
+            trace.event(
+                "request",
+                logging.INFO,
+                participants=len(request.participants),
+                busy_slots=[len(p.calendar_summary.busy_slots) for p in request.participants],
+                duration_minutes=constraints.duration_minutes,
+                working_hours=[constraints.working_hours_start, constraints.working_hours_end],
+                working_hours_mode=constraints.working_hours_mode.value,
+                event_category=str(getattr(constraints, 'event_category', None)),
+                date_range=[constraints.earliest_date.isoformat(), constraints.latest_date.isoformat()],
+            )
+        
+        # Validate request
+        if len(request.participants) < 1:
+            raise SchedulingError(
+                status_code=400,
+                detail="At least 1 participant required"
+            )
+        
+        # Step 0: Clip busy history to the scheduling range (see window_projection)
+        with metrics_service.stage("projection"):
+            request = window_projection.project_request(request)
+        
+        # Step 1: Find available time slots
+        with metrics_service.stage("availability"):
+            available_slots = AvailabilityAgent.find_available_slots(
+                participants=request.participants,
+                constraints=request.constraints,
+            )
+        
+        if ranking is not None:
+            ranking.update(request=resolved_request, available_slots=available_slots)
+        
+        if not available_slots:
+            # No slots available - return empty response
+            if ranking is not None:
+                ranking.update(scores=[], top_indices=[], candidates=[])
+            return no_slots_response(request, start_time)
+        
+        # Step 2 & 3: Rank candidates using Optimization Agent
+        # (Preference scoring is done internally by Optimization Agent)
+        with metrics_service.stage("ranking"):
+            ranked_candidates = OptimizationAgent.rank_candidates(
+                available_slots=available_slots,
+                participants=request.participants,
+                constraints=request.constraints,
+                ranking=ranking,
+            )
+        if ranking is not None:
+            ranking["candidates"] = ranked_candidates
+        
+        on_compromise = None
+        if on_progress is not None:
+            on_progress({
+                "event": "candidates",
+                "stage": "ranked",
+                "candidates": _dump_candidates(ranked_candidates),
+            })
+            
+            def _report_compromise(strategy: str, candidates: List[MeetingSlotCandidate]) -> None:
+                on_progress({
+                    "event": "compromise",
+                    "strategy": strategy,
+                    "candidates": _dump_candidates(candidates),
+                })
+            
+            on_compromise = _report_compromise
+        
+        return negotiated_response(
+            request, ranked_candidates, len(available_slots), start_time, on_compromise
+        )
+        
+    except SchedulingError:
+        raise
+    except Exception as e:
+        logger.exception("Scheduling failed for %s", request.meeting_id)
+        
+        raise SchedulingError(
+            status_code=500,
+            detail=f"Internal scheduling error: {str(e)}"
+        )
+
+
+def _dump_candidates(candidates: List[MeetingSlotCandidate]) -> List[Dict[str, Any]]:
+    """Snapshot candidates as JSON-ready dicts (later stages may rescore them)."""
+    return [candidate.model_dump(mode="json") for candidate in candidates]
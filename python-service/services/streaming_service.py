@@ -0,0 +1,85 @@
+"""
+Streaming Scheduling Service
+
+Streams a single /schedule request as newline-delimited JSON so clients
+can show suggestions before the whole pipeline (including every
+negotiation compromise pass) has finished:
+1. {"event": "candidates", "stage": "ranked", ...} once ranking is done
+2. {"event": "compromise", "strategy": ..., ...} after each relaxation pass
+   (only when negotiation falls back to compromises)
+3. {"event": "result", "response": ScheduleResponse JSON} with the final
+   candidates and analytics
+
+Failures after the stream has started are reported as a final
+{"event": "error", "status", "detail"} line instead of an HTTP status.
+
+Candidates and the final response are restricted to the request's
+response projection, if any (see response_projection). The run's stage
+metrics are recorded when its result arrives (see metrics_service).
+"""
+
+from typing import Any, AsyncIterator, Dict, Optional
+
+from schemas.scheduling import ScheduleRequest
+from services import executor_service
+from services import metrics_service
+from services import response_projection
+from services import scheduling_pipeline
+
+
+def stream_schedule(
+    request: ScheduleRequest,
+    trace_header: Optional[str] = None,
+    projection: response_projection.Projection = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Start scheduling one meeting and stream its progress events.
+
+    The job is admitted to the executor before this returns, so a saturated
+    executor still raises (and can be answered with a 503) instead of
+    starting an empty stream.
+
+    Args:
+        request: Scheduling request with participants and constraints
+        trace_header: Value of the X-Scheduler-Trace header, if any
+        projection: Response projection (None streams everything)
+
+    Returns:
+        Async iterator of event records
+
+    Raises:
+        ExecutorSaturated: If the pool and queue are full
+    """
+    job = executor_service.get_executor().stream(
+        scheduling_pipeline.run_schedule, request, trace_header
+    )
+    return _events(job, projection)
+
+
+async def _events(
+    job: AsyncIterator[Any],
+    projection: response_projection.Projection = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Turn a streaming pipeline job into event records."""
+    try:
+        async for item in job:
+            if isinstance(item, dict):
+                if projection is not None and "candidates" in item:
+                    item = {
+                        **item,
+                        "candidates": response_projection.project_candidates(item["candidates"], projection),
+                    }
+                yield item
+            else:
+                metrics_service.observe(item._metrics)
+                yield {"event": "result", "response": response_projection.project(item, projection)}
+    except executor_service.ExecutorTimeout as e:
+        yield {"event": "error", "status": 503, "detail": str(e), "retry_after": e.retry_after}
+    except scheduling_pipeline.SchedulingError as e:
+        yield {"event": "error", "status": e.status_code, "detail": e.detail}
+
+
+async def ndjson_lines(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode records as newline-delimited JSON."""
+    async for record in records:
+        yield response_projection.dumps(record) + b"\n"
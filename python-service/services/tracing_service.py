@@ -0,0 +1,180 @@
+"""
+Scheduling Trace Service
+
+Structured, sampled tracing of scheduling decisions built on ``logging``.
+
+A trace is opened per request and lives in a context variable, so agents
+can record decisions without having it threaded through every call:
+- Untraced requests never allocate a trace; hot paths check ``active()``
+  (a single context-variable lookup) before formatting anything
+- Traced requests collect events in memory, log them to the
+  ``scheduler.trace`` logger and can be returned in the response analytics
+
+Tracing is switched on by environment variables or per request:
+- SCHEDULER_TRACE_LEVEL: "off" (default), "info" or "debug"
+- SCHEDULER_TRACE_SAMPLE_RATE: Fraction of requests to trace (default 1.0
+  when a level is set)
+- X-Scheduler-Trace request header: "info" or "debug" traces that request
+  regardless of sampling and captures its events into the response
+"""
+
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("scheduler.trace")
+
+# Header that forces (and captures) a trace for a single request
+TRACE_HEADER = "X-Scheduler-Trace"
+
+# Upper bound on events kept per trace so a traced request stays bounded
+MAX_TRACE_EVENTS = int(os.getenv("SCHEDULER_TRACE_MAX_EVENTS", "5000"))
+
+_LEVELS = {
+    "info": logging.INFO,
+    "debug": logging.DEBUG,
+}
+
+
+def _parse_level(value: Optional[str]) -> Optional[int]:
+    """Map a level name ("info", "debug", "1"/"true" = debug) to a logging level."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return logging.DEBUG
+    return _LEVELS.get(value)
+
+
+# Tracing configuration
+TRACE_LEVEL = _parse_level(os.getenv("SCHEDULER_TRACE_LEVEL"))
+TRACE_SAMPLE_RATE = float(os.getenv("SCHEDULER_TRACE_SAMPLE_RATE", "1.0"))
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar(
+    "scheduler_trace", default=None
+)
+
+
+class RequestTrace:
+    """
+    Events recorded while scheduling one request.
+
+    Attributes:
+        request_id: Identifier of the traced request (meeting_id)
+        level: Lowest logging level recorded
+        capture: Whether events should be returned with the response
+        events: Recorded events, in order
+        dropped: Events discarded after MAX_TRACE_EVENTS was reached
+    """
+
+    __slots__ = ("request_id", "level", "capture", "events", "dropped", "_started")
+
+    def __init__(self, request_id: str, level: int = logging.DEBUG, capture: bool = False):
+        self.request_id = request_id
+        self.level = level
+        self.capture = capture
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._started = time.perf_counter()
+
+    def enabled_for(self, level: int) -> bool:
+        """Check if events at ``level`` are recorded by this trace."""
+        return level >= self.level
+
+    def event(self, name: str, level: int = logging.DEBUG, **fields: Any) -> None:
+        """
+        Record a structured event.
+
+        Args:
+            name: Event name (e.g. "gap_bonus")
+            level: Logging level of the event
+            **fields: JSON-serialisable event data
+        """
+        if level < self.level:
+            return
+        if len(self.events) >= MAX_TRACE_EVENTS:
+            self.dropped += 1
+            return
+
+        record = {
+            "event": name,
+            "t_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            **fields,
+        }
+        self.events.append(record)
+        logger.log(level, "%s %s %s", self.request_id, name, fields)
+
+    def export(self) -> Dict[str, Any]:
+        """Get the trace in the form embedded in response analytics."""
+        return {
+            "request_id": self.request_id,
+            "level": logging.getLevelName(self.level).lower(),
+            "events": self.events,
+            "dropped_events": self.dropped,
+        }
+
+
+def active(level: int = logging.DEBUG) -> Optional[RequestTrace]:
+    """
+    Get the current request's trace if it records events at ``level``.
+
+    Returns:
+        The active trace, or None when tracing is off for this request
+    """
+    trace = _current_trace.get()
+    if trace is not None and level >= trace.level:
+        return trace
+    return None
+
+
+def should_trace(header_value: Optional[str] = None) -> Optional[RequestTrace]:
+    """
+    Decide whether a request is traced, from its header and the sampler.
+
+    Args:
+        header_value: Value of the X-Scheduler-Trace header, if any
+
+    Returns:
+        A new (not yet activated) trace, or None for untraced requests
+    """
+    header_level = _parse_level(header_value)
+    if header_level is not None:
+        return RequestTrace("", header_level, capture=True)
+
+    if TRACE_LEVEL is None:
+        return None
+    if TRACE_SAMPLE_RATE < 1.0 and random.random() >= TRACE_SAMPLE_RATE:
+        return None
+    return RequestTrace("", TRACE_LEVEL, capture=False)
+
+
+@contextmanager
+def trace_request(
+    request_id: str,
+    header_value: Optional[str] = None,
+) -> Iterator[Optional[RequestTrace]]:
+    """
+    Open a trace for the duration of a request if it is sampled.
+
+    Args:
+        request_id: Identifier of the request (meeting_id)
+        header_value: Value of the X-Scheduler-Trace header, if any
+
+    Yields:
+        The active trace, or None when the request is not traced
+    """
+    trace = should_trace(header_value)
+    if trace is None:
+        yield None
+        return
+
+    trace.request_id = request_id
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
@@ -0,0 +1,113 @@
+"""
+Window Projection
+
+Clips each participant's busy history to the part a request can look at,
+before any agent runs. Calendar summaries carry up to a year of busy slots
+(``compression_period_days``) while a request only places meetings between
+``earliest_date`` and ``latest_date``.
+
+A projected summary keeps the busy slots that may touch the scheduling
+range widened by the largest lookback any factor uses:
+- CONTEXT_REACH_US (3 days), which covers the 24h fragmentation / density
+  lookbacks and same-date matches across UTC offsets
+- the buffer, for availability and conflict proximity
+plus the nearest busy slot on either side, since conflict proximity
+reports the gap to the previous and next meeting however far away they
+are. Agents see the same facts as on the full history (identical scores,
+breakdowns and candidates) while scanning only the projected slots.
+
+Projections are shallow copies: the request's summaries (possibly shared
+with the calendar cache or other batch meetings) are never modified.
+
+Configuration:
+- SCHEDULER_WINDOW_PROJECTION: "1" (default) projects busy slots, "0"
+  lets agents work on the full history
+"""
+
+import os
+from datetime import timedelta, timezone
+from typing import Tuple
+
+from schemas.scheduling import CompressedCalendarSummary, ScheduleRequest, SchedulingConstraints
+from agents.busy_index import CONTEXT_REACH_US, MICROSECONDS_PER_MINUTE, BusyIndex, to_epoch_us
+from services import metrics_service
+
+WINDOW_PROJECTION = os.getenv("SCHEDULER_WINDOW_PROJECTION", "1") == "1"
+
+# Candidate slots start on earliest_date's day and end by the day after
+# latest_date (windows are laid out per calendar day from these datetimes)
+_DAY = timedelta(days=1)
+
+
+def projection_bounds(constraints: SchedulingConstraints) -> Tuple[int, int]:
+    """
+    Get the busy-time range a request can look at.
+
+    Args:
+        constraints: Scheduling constraints of the request
+
+    Returns:
+        (start_us, end_us) epoch microseconds
+    """
+    earliest = constraints.earliest_date
+    latest = constraints.latest_date
+    if earliest.tzinfo is None:
+        earliest = earliest.replace(tzinfo=timezone.utc)
+    if latest.tzinfo is None:
+        latest = latest.replace(tzinfo=timezone.utc)
+    reach = CONTEXT_REACH_US + constraints.buffer_minutes * MICROSECONDS_PER_MINUTE
+    return to_epoch_us(earliest - _DAY) - reach, to_epoch_us(latest + _DAY) + reach
+
+
+def project_summary(
+    summary: CompressedCalendarSummary,
+    start_us: int,
+    end_us: int,
+) -> CompressedCalendarSummary:
+    """
+    Get a copy of a calendar summary with only the busy slots near a range.
+
+    Args:
+        summary: Calendar summary (left unchanged)
+        start_us: Range start (epoch microseconds)
+        end_us: Range end (epoch microseconds)
+
+    Returns:
+        Summary copy whose busy index is the projected one (the summary
+        itself if projection would keep every slot)
+    """
+    index = BusyIndex.for_summary(summary)
+    projected = index.project(start_us, end_us)
+    if projected.size == index.size:
+        return summary
+    copy = summary.model_copy(update={"busy_slots": projected.source})
+    copy._busy_index = projected
+    return copy
+
+
+def project_request(request: ScheduleRequest) -> ScheduleRequest:
+    """
+    Project every participant's busy slots onto the request's range.
+
+    Args:
+        request: Scheduling request (left unchanged)
+
+    Returns:
+        Request whose participants carry projected summaries (the request
+        itself when projection is disabled)
+    """
+    if not WINDOW_PROJECTION:
+        return request
+
+    start_us, end_us = projection_bounds(request.constraints)
+    participants = []
+    kept = 0
+    for participant in request.participants:
+        if participant.calendar_summary is not None:
+            summary = project_summary(participant.calendar_summary, start_us, end_us)
+            kept += len(summary.busy_slots)
+            if summary is not participant.calendar_summary:
+                participant = participant.model_copy(update={"calendar_summary": summary})
+        participants.append(participant)
+    metrics_service.count("busy_slots_kept", kept)
+    return request.model_copy(update={"participants": participants})
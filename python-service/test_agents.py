@@ -3,14 +3,36 @@ Unit tests for AI scheduling agents.
 Run: python test_agents.py
 """
 
+import asyncio
+import json
+import marshal
+import random
+import threading
 import unittest
+import warnings
 from datetime import datetime, timedelta, timezone
 from typing import List
+from zoneinfo import ZoneInfo
 
 from agents.availability_agent import AvailabilityAgent
+from agents.busy_index import BusyIndex, to_epoch_us
+from agents.interval_set import IntervalSet
 from agents.preference_agent import PreferenceAgent
+from agents.preference_surface import PreferenceSurface
+from agents.slot_context import SlotContext
+from agents import timezone_engine
 from agents.optimization_agent import OptimizationAgent
 from agents.negotiation_agent import NegotiationAgent
+from agents.relaxation_engine import RelaxationEngine
+from agents.joint_scheduling_agent import JointSchedulingAgent
+from services import batch_service, metrics_service, scheduling_pipeline, streaming_service, tracing_service
+from services.calendar_cache_service import CalendarCache
+from services import calendar_cache_service
+from services.executor_service import ExecutorSaturated, ExecutorTimeout, SchedulingExecutor
+from services.request_decoder import decode_batch_request, decode_schedule_request
+from benchmarks import SCENARIOS, compare, generate_request, generate_request_payload, measure
+from services import profiling_service, rerank_service, response_projection, window_projection
+from pydantic import ValidationError
 
 from schemas.scheduling import (
     Participant,
@@ -19,6 +41,15 @@ from schemas.scheduling import (
     CompressedCalendarSummary,
     PreferencePattern,
     DayOfWeek,
+    EventCategory,
+    BatchMeeting,
+    BatchScheduleRequest,
+    BusySlotChange,
+    CalendarRef,
+    MeetingSlotCandidate,
+    ScheduleRequest,
+    ScheduleResponse,
+    WorkingHoursMode,
 )
 
 
@@ -97,6 +128,101 @@ class TestAvailabilityAgent(unittest.TestCase):
                 slot.end > busy_time
             )
     
+    def test_sweep_matches_scan(self):
+        """Sweep-line and bitset generation return exactly the slots of the scan strategy."""
+        rng = random.Random(7)
+        tz = timezone(timedelta(hours=5, minutes=30))
+        start = self.tomorrow.astimezone(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        participants = []
+        for i in range(3):
+            busy = []
+            for _ in range(40):
+                busy_start = start + timedelta(minutes=rng.randint(0, 60 * 24 * 21))
+                busy.append(TimeSlot(
+                    start=busy_start,
+                    end=busy_start + timedelta(minutes=rng.choice([20, 30, 60, 90])),
+                    timezone="UTC",
+                ))
+            participant = self._create_participant(f"user{i}", f"User {i}", busy)
+            participant.is_required = i < 2
+            participants.append(participant)
+        
+        for category in EventCategory:
+            for duration, buffer_minutes in ((30, 0), (45, 15), (90, 5), (25, 7)):
+                constraints = SchedulingConstraints(
+                    duration_minutes=duration,
+                    earliest_date=start,
+                    latest_date=start + timedelta(days=20),
+                    allowed_days=list(DayOfWeek),
+                    buffer_minutes=buffer_minutes,
+                    event_category=category,
+                )
+                sweep = AvailabilityAgent.find_available_slots(participants, constraints)
+                scan = AvailabilityAgent.find_available_slots(
+                    participants, constraints, strategy="scan"
+                )
+                bitset = AvailabilityAgent.find_available_slots(
+                    participants, constraints, strategy="bitset"
+                )
+                self.assertEqual(
+                    [(s.start, s.end) for s in sweep],
+                    [(s.start, s.end) for s in scan],
+                )
+                self.assertEqual(
+                    [(s.start, s.end) for s in bitset],
+                    [(s.start, s.end) for s in scan],
+                )
+    
+    def test_participant_working_hours_mode(self):
+        """Slots stay inside every required participant's local working hours."""
+        rng = random.Random(23)
+        # Two weeks from March 2nd cross the US (not the EU) DST change
+        start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        participants = []
+        for i, zone in enumerate(["Europe/Berlin", "America/New_York", "Asia/Tokyo"]):
+            busy = []
+            for _ in range(30):
+                busy_start = start + timedelta(minutes=rng.randrange(0, 14 * 24 * 60, 15))
+                busy.append(TimeSlot(start=busy_start, end=busy_start + timedelta(minutes=45), timezone="UTC"))
+            participant = self._create_participant(f"user{i}", f"User {i}", busy)
+            participant.calendar_summary.timezone = zone
+            participant.is_required = zone != "Asia/Tokyo"
+            participants.append(participant)
+        
+        constraints = SchedulingConstraints(
+            duration_minutes=30,
+            earliest_date=start,
+            latest_date=start + timedelta(days=14),
+            working_hours_start=8,
+            working_hours_end=18,
+            buffer_minutes=0,
+        )
+        local = constraints.model_copy(update={"working_hours_mode": WorkingHoursMode.PARTICIPANTS})
+        
+        def in_working_hours(slot: TimeSlot, zone: str) -> bool:
+            slot_start = slot.start.astimezone(ZoneInfo(zone))
+            slot_end = slot.end.astimezone(ZoneInfo(zone))
+            return (
+                slot_start.weekday() < 5
+                and slot_start.date() == slot_end.date()
+                and 8 <= slot_start.hour
+                and (slot_end.hour, slot_end.minute) <= (18, 0)
+            )
+        
+        expected = [
+            slot for slot in AvailabilityAgent.find_available_slots(participants, constraints)
+            if all(in_working_hours(slot, zone) for zone in ["Europe/Berlin", "America/New_York"])
+        ]
+        self.assertTrue(expected)
+        for strategy in ("scan", "sweep", "bitset"):
+            slots = AvailabilityAgent.find_available_slots(participants, local, strategy=strategy)
+            self.assertEqual([(s.start, s.end) for s in slots], [(s.start, s.end) for s in expected])
+        self.assertLess(
+            AvailabilityAgent._count_grid_slots(local, participants),
+            AvailabilityAgent._count_grid_slots(constraints, participants) / 2,
+        )
+    
     def _create_participant(self, user_id: str, name: str, busy_slots: List[TimeSlot]) -> Participant:
         """Helper to create a participant."""
         calendar_summary = CompressedCalendarSummary(
@@ -115,6 +241,400 @@ class TestAvailabilityAgent(unittest.TestCase):
         )
 
 
+class TestBusyIndex(unittest.TestCase):
+    """Test the sorted busy-slot index against brute-force scans."""
+    
+    def setUp(self):
+        """Set up a random but reproducible calendar."""
+        rng = random.Random(42)
+        base = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc)
+        self.busy_slots = []
+        for _ in range(200):
+            start = base + timedelta(minutes=15 * rng.randint(0, 4 * 24 * 14))
+            self.busy_slots.append(TimeSlot(
+                start=start,
+                end=start + timedelta(minutes=rng.choice([15, 30, 45, 60, 120])),
+                timezone="UTC",
+            ))
+        self.probes = [
+            TimeSlot(
+                start=base + timedelta(minutes=30 * i),
+                end=base + timedelta(minutes=30 * i + 45),
+                timezone="UTC",
+            )
+            for i in range(2 * 24 * 14)
+        ]
+    
+    def test_overlaps_matches_brute_force(self):
+        """Buffered overlap checks agree with scanning every busy slot."""
+        index = BusyIndex.from_slots(self.busy_slots)
+        for buffer_minutes in (0, 10, 15):
+            buffer = timedelta(minutes=buffer_minutes)
+            for probe in self.probes:
+                expected = any(
+                    AvailabilityAgent._slots_overlap(
+                        probe.start, probe.end, busy.start - buffer, busy.end + buffer
+                    )
+                    for busy in self.busy_slots
+                )
+                actual = index.overlaps(
+                    to_epoch_us(probe.start),
+                    to_epoch_us(probe.end),
+                    buffer_minutes * 60 * 1_000_000,
+                )
+                self.assertEqual(actual, expected)
+    
+    def test_availability_score_matches_brute_force(self):
+        """Participant availability scores are unchanged by the index."""
+        participant = Participant(
+            user_id="user1",
+            name="User One",
+            email="user1@example.com",
+            calendar_summary=CompressedCalendarSummary(
+                user_id="user1", busy_slots=self.busy_slots
+            ),
+        )
+        constraints = SchedulingConstraints(
+            duration_minutes=45,
+            earliest_date=self.probes[0].start,
+            latest_date=self.probes[-1].end,
+            buffer_minutes=15,
+        )
+        for probe in self.probes:
+            self.assertEqual(
+                AvailabilityAgent.get_participant_availability_score(
+                    probe, participant, constraints
+                ),
+                self._brute_force_score(probe, constraints.buffer_minutes),
+            )
+    
+    def test_available_counts_match_scores(self):
+        """Grid-based availability counts agree with per-participant scores."""
+        participants = [
+            Participant(
+                user_id=f"user{i}",
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+                calendar_summary=CompressedCalendarSummary(
+                    user_id=f"user{i}", busy_slots=self.busy_slots[i::3]
+                ),
+            )
+            for i in range(3)
+        ]
+        constraints = SchedulingConstraints(
+            duration_minutes=45,
+            earliest_date=self.probes[0].start,
+            latest_date=self.probes[-1].end,
+            buffer_minutes=15,
+        )
+        # Off-grid probes (7 minutes past) take the exact fallback
+        probes = self.probes + [
+            TimeSlot(start=p.start + timedelta(minutes=7), end=p.end, timezone="UTC")
+            for p in self.probes[::5]
+        ]
+        expected = [
+            sum(
+                1 for participant in participants
+                if AvailabilityAgent.get_participant_availability_score(
+                    probe, participant, constraints
+                ) > 50
+            )
+            for probe in probes
+        ]
+        self.assertEqual(
+            AvailabilityAgent.count_available_participants(probes, participants),
+            expected,
+        )
+    
+    def test_slot_context_matches_brute_force(self):
+        """Single-pass slot context counts match scanning every busy slot."""
+        participant = Participant(
+            user_id="user1",
+            name="User One",
+            email="user1@example.com",
+            calendar_summary=CompressedCalendarSummary(
+                user_id="user1", busy_slots=self.busy_slots
+            ),
+        )
+        for probe in self.probes:
+            facts = SlotContext(probe, [participant]).participants[0]
+            same_day = [b for b in self.busy_slots if b.start.date() == probe.start.date()]
+
+            def edge_gap(busy):
+                return min(
+                    abs((probe.start - busy.end).total_seconds() / 60),
+                    abs((busy.start - probe.end).total_seconds() / 60),
+                )
+
+            self.assertEqual(facts.same_day_count, len(same_day))
+            self.assertEqual(facts.close_count, sum(1 for b in same_day if edge_gap(b) <= 240))
+            self.assertEqual(facts.density_count, sum(1 for b in self.busy_slots if edge_gap(b) <= 120))
+            self.assertEqual(
+                facts.nearby_count,
+                sum(1 for b in self.busy_slots if abs((probe.start - b.start).total_seconds()) <= 86400),
+            )
+            self.assertEqual(
+                facts.fills_middle_gap,
+                any(b.end < probe.start for b in same_day) and any(b.start > probe.end for b in same_day),
+            )
+
+    def test_index_cached_on_summary(self):
+        """The index is built once per summary and rebuilt when slots change."""
+        summary = CompressedCalendarSummary(user_id="user1", busy_slots=self.busy_slots)
+        index = BusyIndex.for_summary(summary)
+        self.assertIs(BusyIndex.for_summary(summary), index)
+        
+        summary.busy_slots = self.busy_slots[:10]
+        rebuilt = BusyIndex.for_summary(summary)
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.size, 10)
+    
+    def test_projection_keeps_lookups_inside_range(self):
+        """A projected index answers lookups inside its range like the full index."""
+        index = BusyIndex.from_slots(self.busy_slots)
+        start = to_epoch_us(self.probes[200].start)
+        end = to_epoch_us(self.probes[300].end)
+        projected = index.project(start, end)
+        self.assertLess(projected.size, index.size)
+        self.assertEqual(len(projected.source), projected.size)
+        
+        for probe in self.probes[200:301]:
+            probe_start, probe_end = to_epoch_us(probe.start), to_epoch_us(probe.end)
+            self.assertEqual(projected.gap_before(probe_start), index.gap_before(probe_start))
+            self.assertEqual(projected.gap_after(probe_end), index.gap_after(probe_end))
+            for buffer_us in (0, 15 * 60 * 1_000_000):
+                self.assertEqual(
+                    projected.overlaps(probe_start, probe_end, buffer_us),
+                    index.overlaps(probe_start, probe_end, buffer_us),
+                )
+    
+    def test_request_projection_leaves_ranking_unchanged(self):
+        """Projected requests rank exactly like the full history, without touching it."""
+        request = generate_request(SCENARIOS["large"])
+        projected = window_projection.project_request(request)
+        
+        full_sizes = [len(p.calendar_summary.busy_slots) for p in request.participants]
+        projected_sizes = [len(p.calendar_summary.busy_slots) for p in projected.participants]
+        self.assertLess(sum(projected_sizes), sum(full_sizes) / 2)
+        self.assertEqual(
+            [BusyIndex.for_summary(p.calendar_summary).size for p in request.participants], full_sizes
+        )
+        
+        def ranked(scheduling_request):
+            slots = AvailabilityAgent.find_available_slots(
+                scheduling_request.participants, scheduling_request.constraints
+            )
+            return [
+                candidate.model_dump()
+                for candidate in OptimizationAgent.rank_candidates(
+                    slots, scheduling_request.participants, scheduling_request.constraints
+                )
+            ]
+        
+        self.assertEqual(ranked(projected), ranked(request))
+    
+    def _brute_force_score(self, slot: TimeSlot, buffer_minutes: int) -> float:
+        """Reference implementation of the per-participant availability score."""
+        for busy in self.busy_slots:
+            if AvailabilityAgent._slots_overlap(slot.start, slot.end, busy.start, busy.end):
+                return 0.0
+        min_gap_before = float('inf')
+        min_gap_after = float('inf')
+        for busy in self.busy_slots:
+            gap_before = (slot.start - busy.end).total_seconds() / 60
+            if 0 <= gap_before < min_gap_before:
+                min_gap_before = gap_before
+            gap_after = (busy.start - slot.end).total_seconds() / 60
+            if 0 <= gap_after < min_gap_after:
+                min_gap_after = gap_after
+        score = 100.0
+        if min_gap_before < buffer_minutes:
+            score -= (1.0 - min_gap_before / buffer_minutes) * 20
+        if min_gap_after < buffer_minutes:
+            score -= (1.0 - min_gap_after / buffer_minutes) * 20
+        return max(0.0, min(100.0, score))
+
+
+class TestIntervalSet(unittest.TestCase):
+    """Property tests of the interval algebra against plain sets of points."""
+    
+    UNIVERSE = 120
+    
+    def setUp(self):
+        """Set up random but reproducible interval sets."""
+        rng = random.Random(7)
+        self.cases = []
+        for _ in range(300):
+            intervals = []
+            for _ in range(rng.randint(0, 8)):
+                start = rng.randint(-5, self.UNIVERSE)
+                intervals.append((start, start + rng.randint(-3, 25)))
+            self.cases.append(intervals)
+    
+    @staticmethod
+    def _points(intervals) -> set:
+        """Brute-force model: the set of covered integer points."""
+        return {point for start, end in intervals for point in range(start, end)}
+    
+    def _assert_canonical(self, interval_set: IntervalSet):
+        """Runs are non-empty, sorted and separated by gaps."""
+        for start, end in interval_set:
+            self.assertLess(start, end)
+        for previous_end, start in zip(interval_set.ends, interval_set.starts[1:]):
+            self.assertLess(previous_end, start)
+    
+    def _pairs(self):
+        """Consecutive pairs of test cases as (intervals, set) tuples."""
+        for first, second in zip(self.cases, self.cases[1:]):
+            yield (first, IntervalSet(first)), (second, IntervalSet(second))
+    
+    def test_construction_is_canonical(self):
+        """Any interval list normalizes to the one run list of its points."""
+        for intervals in self.cases:
+            interval_set = IntervalSet(intervals)
+            self._assert_canonical(interval_set)
+            self.assertEqual(self._points(interval_set), self._points(intervals))
+            self.assertEqual(IntervalSet(reversed(intervals)), interval_set)
+            self.assertEqual(interval_set.measure(), len(self._points(intervals)))
+    
+    def test_set_operations_match_points(self):
+        """Union, intersection, difference and complement equal set algebra."""
+        for (first, a), (second, b) in self._pairs():
+            p, q = self._points(first), self._points(second)
+            lo, hi = -10, self.UNIVERSE + 30
+            expected = {
+                "union": p | q,
+                "intersection": p & q,
+                "difference": p - q,
+                "complement": set(range(lo, hi)) - p,
+            }
+            actual = {
+                "union": a.union(b),
+                "intersection": a.intersection(b),
+                "difference": a.difference(b),
+                "complement": a.complement(lo, hi),
+            }
+            for name, result in actual.items():
+                self._assert_canonical(result)
+                self.assertEqual(self._points(result), expected[name], name)
+            self.assertEqual(IntervalSet.union_all([a, b, a]), a.union(b))
+            # De Morgan within the universe
+            self.assertEqual(
+                a.union(b).complement(lo, hi),
+                a.complement(lo, hi).intersection(b.complement(lo, hi)),
+            )
+    
+    def test_expand_and_clip_match_points(self):
+        """Buffer expansion and clipping equal their pointwise definitions."""
+        for intervals in self.cases:
+            interval_set = IntervalSet(intervals)
+            for before, after in ((0, 0), (3, 3), (0, 5), (-2, -2)):
+                expanded = interval_set.expand(before, after)
+                self._assert_canonical(expanded)
+                self.assertEqual(
+                    self._points(expanded),
+                    self._points((s - before, e + after) for s, e in interval_set),
+                )
+            for lo, hi in ((10, 50), (-20, 0), (60, 60), (70, 65)):
+                clipped = interval_set.clip(lo, hi)
+                self._assert_canonical(clipped)
+                self.assertEqual(
+                    self._points(clipped), self._points(intervals) & set(range(lo, hi))
+                )
+    
+    def test_queries_match_brute_force(self):
+        """Overlap, containment, window counts and gaps agree with scans."""
+        rng = random.Random(11)
+        for intervals in self.cases:
+            interval_set = IntervalSet(intervals)
+            points = self._points(intervals)
+            runs = list(interval_set)
+            for _ in range(20):
+                start = rng.randint(-10, self.UNIVERSE + 10)
+                end = start + rng.randint(0, 30)
+                window = set(range(start, end))
+                self.assertEqual(interval_set.overlaps(start, end), bool(window & points))
+                self.assertEqual(interval_set.contains(start, end), window <= points)
+                self.assertEqual(
+                    interval_set.count_within(start, end),
+                    sum(1 for s, e in runs if window & set(range(s, e))),
+                )
+                before = [start - e for _, e in runs if e <= start]
+                after = [s - start for s, _ in runs if s >= start]
+                self.assertEqual(interval_set.gap_before(start), min(before, default=None))
+                self.assertEqual(interval_set.gap_after(start), min(after, default=None))
+    
+    def test_working_hours_are_interval_sets(self):
+        """Working hours intersect across zones like the per-day windows."""
+        first_day = datetime(2026, 3, 2).date()
+        last_day = first_day + timedelta(days=20)
+        berlin = timezone_engine.working_intervals("Europe/Berlin", first_day, last_day, 9, 17, range(5))
+        new_york = timezone_engine.working_intervals("America/New_York", first_day, last_day, 9, 17, range(5))
+        shared = berlin.intersection(new_york)
+        self._assert_canonical(shared)
+        for start, end in shared:
+            for value in (start, end - 1):
+                instant = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=value)
+                for zone in ("Europe/Berlin", "America/New_York"):
+                    local = instant.astimezone(ZoneInfo(zone))
+                    self.assertTrue(9 <= local.hour < 17 and local.weekday() < 5)
+        # 3h overlap a day, 2h while the US is already on summer time
+        hours = [(end - start) // 3_600_000_000 for start, end in shared]
+        self.assertEqual(sorted(set(hours)), [2, 3])
+
+
+class TestTimezoneEngine(unittest.TestCase):
+    """Test the cached UTC-offset tables."""
+    
+    def test_local_fields_match_zoneinfo(self):
+        """Bulk local weekdays and hours equal zoneinfo conversions, across DST."""
+        start = datetime(2025, 12, 20, tzinfo=timezone.utc)
+        minutes = [
+            to_epoch_us(start) // 60_000_000 + offset
+            for offset in range(0, 400 * 24 * 60, 97)
+        ]
+        for zone in ["America/New_York", "Europe/Berlin", "Asia/Kolkata", "Australia/Lord_Howe"]:
+            weekdays, hours = timezone_engine.local_fields(minutes, zone)
+            week = timezone_engine.week_minutes(minutes, zone)
+            for i, minute in enumerate(minutes):
+                local = (
+                    datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minute)
+                ).astimezone(ZoneInfo(zone))
+                self.assertEqual((weekdays[i], hours[i]), (local.weekday(), local.hour))
+                self.assertEqual(week[i], local.weekday() * 1440 + local.hour * 60 + local.minute)
+        
+        # Unknown names fall back to UTC
+        self.assertEqual(timezone_engine.local_offset(start, "Not/A_Zone"), 0)
+        slot = TimeSlot(start=start, end=start + timedelta(hours=1), timezone="UTC")
+        local = timezone_engine.local_slot(slot, "America/New_York")
+        self.assertEqual((local.start, local.end), (slot.start, slot.end))
+        self.assertEqual(local.start.hour, 19)
+    
+    def test_invalid_zone_paths_fall_back_to_utc(self):
+        """Directory names and overlong names are unknown zones, not errors."""
+        start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        for zone in ["America", "Europe/" + "x" * 300]:
+            self.assertEqual(timezone_engine.local_offset(start, zone), 0)
+            request = ScheduleRequest(
+                meeting_id="zone",
+                participants=[Participant(
+                    user_id="user1",
+                    name="User 1",
+                    email="user1@example.com",
+                    calendar_summary=CompressedCalendarSummary(user_id="user1", timezone=zone),
+                )],
+                constraints=SchedulingConstraints(
+                    duration_minutes=30,
+                    earliest_date=start,
+                    latest_date=start + timedelta(days=1),
+                    working_hours_start=18,
+                    working_hours_end=20,
+                    working_hours_mode=WorkingHoursMode.PARTICIPANTS,
+                ),
+            )
+            self.assertTrue(scheduling_pipeline.run_schedule(request).success)
+
+
 class TestPreferenceAgent(unittest.TestCase):
     """Test the Preference Agent."""
     
@@ -168,6 +688,41 @@ class TestPreferenceAgent(unittest.TestCase):
         # Morning slot should score higher
         self.assertGreater(morning_scores["user1"], afternoon_scores["user1"])
     
+    def test_scores_use_participant_timezone(self):
+        """Hours and days are read in each participant's own timezone."""
+        pattern = PreferencePattern(
+            preferred_days=[DayOfWeek.MONDAY],
+            preferred_hours_start=9,
+            preferred_hours_end=12,
+            morning_person_score=0.9,
+        )
+        participants = [
+            Participant(
+                user_id=user_id,
+                name=user_id,
+                email=f"{user_id}@example.com",
+                calendar_summary=CompressedCalendarSummary(
+                    user_id=user_id, timezone=zone, preference_patterns=pattern
+                ),
+            )
+            for user_id, zone in [("london", "Europe/London"), ("tokyo", "Asia/Tokyo")]
+        ]
+        # Monday 09:00 in Tokyo is Sunday 23:00 (winter) in London
+        start = datetime(2026, 1, 5, 0, 0, tzinfo=timezone.utc)
+        slot = TimeSlot(start=start, end=start + timedelta(hours=1), timezone="UTC")
+        scores = PreferenceAgent.score_slot_preferences(slot, participants, EventCategory.MEETING)
+        
+        local = TimeSlot(
+            start=datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc),
+            end=datetime(2026, 1, 5, 10, 0, tzinfo=timezone.utc),
+            timezone="UTC",
+        )
+        self.assertEqual(
+            scores["tokyo"],
+            PreferenceAgent._calculate_preference_score(local, pattern, EventCategory.MEETING),
+        )
+        self.assertGreater(scores["tokyo"], scores["london"])
+    
     def test_aggregate_preference_scores(self):
         """Test aggregating scores across participants."""
         participants = []
@@ -192,6 +747,73 @@ class TestPreferenceAgent(unittest.TestCase):
         # Should be weighted average
         self.assertGreater(aggregate, 70.0)
         self.assertLess(aggregate, 90.0)
+    
+    def test_lookup_tables_follow_pattern_changes(self):
+        """Memoized time scores match the rules and follow edited patterns."""
+        pattern = PreferencePattern(preferred_hours_start=9, preferred_hours_end=12)
+        monday = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        for minutes in range(0, 7 * 24 * 60, 7):
+            start = monday + timedelta(minutes=minutes)
+            slot = TimeSlot(start=start, end=start + timedelta(minutes=30), timezone="UTC")
+            self.assertEqual(
+                PreferenceAgent._score_category_fit(slot, EventCategory.SOCIAL),
+                PreferenceAgent._category_fit_at(
+                    EventCategory.SOCIAL, start.weekday(), start.hour, start.minute
+                ),
+            )
+        
+        slot = TimeSlot(start=monday.replace(hour=10), end=monday.replace(hour=11), timezone="UTC")
+        before = PreferenceAgent._score_time_preference(slot, pattern)
+        pattern.preferred_hours_start = 14
+        pattern.preferred_hours_end = 17
+        after = PreferenceAgent._score_time_preference(slot, pattern)
+        self.assertGreater(before, after)
+        self.assertEqual(after, PreferenceAgent._time_preference_at((14, 17), 0, 10, 0))
+    
+    def test_preference_surface_matches_aggregate(self):
+        """Compiled group scores equal per-slot scoring and aggregation."""
+        rng = random.Random(15)
+        monday = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        participants = []
+        for i in range(8):
+            pattern = PreferencePattern(
+                preferred_days=rng.sample(list(DayOfWeek), 3),
+                preferred_hours_start=rng.randint(6, 11),
+                preferred_hours_end=rng.randint(12, 20),
+                morning_person_score=rng.random(),
+            ) if i % 3 else None
+            # user1 appears twice: scores are looked up by id, so both use the last one
+            user_id = f"user{min(i, 1) if i < 3 else i}"
+            participants.append(Participant(
+                user_id=user_id,
+                name=user_id,
+                email=f"{user_id}@example.com",
+                is_required=i % 2 == 0,
+                calendar_summary=CompressedCalendarSummary(
+                    user_id=user_id,
+                    preference_patterns=pattern,
+                    # Two weeks from March 2nd cross the US DST change
+                    timezone=["UTC", "America/New_York", "Asia/Kolkata"][i % 3],
+                ),
+            ))
+        slots = []
+        for _ in range(60):
+            start = monday + timedelta(minutes=rng.randrange(0, 14 * 24 * 60, 5))
+            slots.append(TimeSlot(
+                start=start, end=start + timedelta(minutes=rng.choice([30, 60])), timezone="UTC"
+            ))
+        
+        for category in (None, EventCategory.MEETING, EventCategory.SOCIAL):
+            expected = [
+                PreferenceAgent.aggregate_preference_scores(
+                    PreferenceAgent.score_slot_preferences(slot, participants, category),
+                    participants,
+                )
+                for slot in slots
+            ]
+            surface = PreferenceSurface(participants, category)
+            self.assertEqual(surface.scores(slots[:20]), expected[:20])
+            self.assertEqual(surface.scores(slots), expected)
 
 
 class TestOptimizationAgent(unittest.TestCase):
@@ -255,6 +877,96 @@ class TestOptimizationAgent(unittest.TestCase):
             self.assertLessEqual(candidate.score, 100)
 
 
+    def test_vector_engine_matches_scalar(self):
+        """The vectorized kernel produces the same ranking as the scalar path."""
+        rng = random.Random(3)
+        day = self.tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
+        participants = []
+        for i in range(4):
+            busy = []
+            for _ in range(30):
+                busy_start = day + timedelta(minutes=30 * rng.randint(-48, 48 * 4))
+                busy.append(TimeSlot(
+                    start=busy_start,
+                    end=busy_start + timedelta(minutes=rng.choice([15, 30, 60])),
+                    timezone="UTC",
+                ))
+            participants.append(Participant(
+                user_id=f"user{i}",
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+                is_required=i != 3,
+                calendar_summary=CompressedCalendarSummary(
+                    user_id=f"user{i}", timezone="UTC", busy_slots=busy
+                ),
+            ))
+        
+        slots = [
+            TimeSlot(
+                start=day + timedelta(minutes=30 * i),
+                end=day + timedelta(minutes=30 * i + 45),
+                timezone="UTC",
+            )
+            for i in range(48 * 3)
+        ]
+        # Evening office hours keep gap-bonus slots under the 100-point score cap
+        constraints = SchedulingConstraints(
+            duration_minutes=45,
+            earliest_date=day,
+            latest_date=day + timedelta(days=3),
+            working_hours_start=18,
+            working_hours_end=21,
+            buffer_minutes=15,
+            max_candidates=50,
+        )
+        
+        vector = OptimizationAgent.rank_candidates(
+            slots, participants, constraints, engine="vector"
+        )
+        scalar = OptimizationAgent.rank_candidates(
+            slots, participants, constraints, engine="scalar"
+        )
+        self.assertEqual(
+            [c.model_dump() for c in vector],
+            [c.model_dump() for c in scalar],
+        )
+
+        # Top-K selection matches materialising and sorting every slot
+        evaluated = [
+            OptimizationAgent._evaluate_slot(slot, participants, constraints)
+            for slot in slots
+        ]
+        evaluated.sort(key=lambda c: c.score, reverse=True)
+        self.assertEqual(
+            [c.model_dump() for c in vector],
+            [c.model_dump() for c in evaluated[:constraints.max_candidates]],
+        )
+    
+    def test_timezone_score_uses_local_hours(self):
+        """Timezone friendliness is that of the least friendly local hour."""
+        participants = [
+            Participant(
+                user_id=zone,
+                name=zone,
+                email=f"user{i}@example.com",
+                calendar_summary=CompressedCalendarSummary(user_id=zone, timezone=zone),
+            )
+            for i, zone in enumerate(["Europe/London", "Asia/Tokyo"])
+        ]
+        day = datetime(2026, 1, 6, tzinfo=timezone.utc)
+        slots = [
+            TimeSlot(start=day + timedelta(minutes=m), end=day + timedelta(minutes=m + 30), timezone="UTC")
+            for m in range(0, 24 * 60, 30)
+        ]
+        # 09:00 UTC is 09:00 in London and 18:00 in Tokyo; 14:00 UTC is 23:00 in Tokyo
+        self.assertEqual(OptimizationAgent._calculate_timezone_score(slots[18], participants), 100.0)
+        self.assertEqual(OptimizationAgent._calculate_timezone_score(slots[28], participants), 40.0)
+        self.assertEqual(
+            OptimizationAgent._calculate_timezone_scores(slots, participants),
+            [OptimizationAgent._calculate_timezone_score(slot, participants) for slot in slots],
+        )
+
+
 class TestNegotiationAgent(unittest.TestCase):
     """Test the Negotiation Agent."""
     
@@ -312,6 +1024,954 @@ class TestNegotiationAgent(unittest.TestCase):
         # Should return candidates with minimal negotiation
         self.assertGreater(len(result), 0)
         self.assertGreaterEqual(rounds, 0)
+    
+    def test_compromise_passes_reported_as_they_finish(self):
+        """Each relaxation pass is reported before the merged compromises."""
+        day = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        participants = [Participant(
+            user_id="user0",
+            name="User 0",
+            email="user0@example.com",
+            calendar_summary=CompressedCalendarSummary(user_id="user0", busy_slots=[]),
+        )]
+        constraints = SchedulingConstraints(
+            duration_minutes=60,
+            earliest_date=day,
+            latest_date=day + timedelta(days=1),
+            working_hours_start=16,
+            working_hours_end=18,
+            max_candidates=5,
+        )
+        
+        passes = []
+        result, _ = NegotiationAgent.negotiate_schedule(
+            [], participants, constraints,
+            on_compromise=lambda strategy, candidates: passes.append((strategy, candidates)),
+        )
+        
+        self.assertEqual(
+            [strategy for strategy, _ in passes],
+            ["extended_hours", "reduced_buffer", "shorter_meeting"],
+        )
+        reported = {c.slot.start for _, candidates in passes for c in candidates}
+        self.assertTrue(result)
+        self.assertTrue({c.slot.start for c in result} <= reported)
+    
+    def test_relaxation_engine_matches_full_reruns(self):
+        """Shared slot facts give the same compromises as ranking each pass from scratch."""
+        rng = random.Random(7)
+        day = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        participants = []
+        for i in range(3):
+            busy = []
+            for _ in range(25):
+                busy_start = day + timedelta(minutes=30 * rng.randint(0, 48 * 4))
+                busy.append(TimeSlot(
+                    start=busy_start,
+                    end=busy_start + timedelta(minutes=rng.choice([30, 60])),
+                    timezone="UTC",
+                ))
+            participants.append(Participant(
+                user_id=f"user{i}",
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+                is_required=i != 2,
+                calendar_summary=CompressedCalendarSummary(user_id=f"user{i}", busy_slots=busy),
+            ))
+        constraints = SchedulingConstraints(
+            duration_minutes=60,
+            earliest_date=day,
+            latest_date=day + timedelta(days=4),
+            working_hours_start=18,
+            working_hours_end=21,
+            buffer_minutes=15,
+            max_candidates=5,
+        )
+        
+        engine = RelaxationEngine(participants, constraints)
+        expected = []
+        for strategy, relaxed, label in engine.passes:
+            slots = AvailabilityAgent.find_available_slots(participants, relaxed)
+            ranked = OptimizationAgent.rank_candidates(slots, participants, relaxed)[:3]
+            for candidate in ranked:
+                candidate.reasoning = f"Compromise: {label}. {candidate.reasoning}"
+            expected.append((strategy, [c.model_dump() for c in ranked]))
+        
+        actual = [
+            (strategy, [c.model_dump() for c in candidates])
+            for strategy, candidates in engine.run()
+        ]
+        self.assertEqual(actual, expected)
+
+
+class TestTracing(unittest.TestCase):
+    """Test sampled request tracing."""
+    
+    def setUp(self):
+        """Set up a small ranking problem."""
+        day = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        busy = [TimeSlot(start=day.replace(hour=19), end=day.replace(hour=20), timezone="UTC")]
+        self.participants = [Participant(
+            user_id="user1",
+            name="User One",
+            email="user1@example.com",
+            calendar_summary=CompressedCalendarSummary(user_id="user1", busy_slots=busy),
+        )]
+        self.constraints = SchedulingConstraints(
+            duration_minutes=30,
+            earliest_date=day,
+            latest_date=day + timedelta(days=1),
+            working_hours_start=18,
+            working_hours_end=21,
+            max_candidates=3,
+        )
+        self.slots = AvailabilityAgent.find_available_slots(self.participants, self.constraints)
+    
+    def test_untraced_request_records_nothing(self):
+        """Without a header or sampling no trace is opened."""
+        with tracing_service.trace_request("meeting-1") as trace:
+            self.assertIsNone(trace)
+            self.assertIsNone(tracing_service.active())
+            OptimizationAgent.rank_candidates(self.slots, self.participants, self.constraints)
+    
+    def test_header_captures_scoring_decisions(self):
+        """A debug header captures gap-bonus and ranking decisions."""
+        with tracing_service.trace_request("meeting-1", "debug") as trace:
+            candidates = OptimizationAgent.rank_candidates(
+                self.slots, self.participants, self.constraints, engine="scalar"
+            )
+        self.assertIsNone(tracing_service.active())
+        
+        exported = trace.export()
+        events = [e["event"] for e in exported["events"]]
+        self.assertEqual(exported["request_id"], "meeting-1")
+        self.assertEqual(events.count("gap_bonus"), len(self.slots))
+        self.assertEqual(events.count("slot_scored"), len(self.slots))
+        ranking = exported["events"][-1]
+        self.assertEqual(ranking["event"], "ranking")
+        self.assertEqual([s["score"] for s in ranking["selected"]], [c.score for c in candidates])
+    
+    def test_info_level_skips_per_slot_events(self):
+        """Info-level traces keep only the per-request decisions."""
+        with tracing_service.trace_request("meeting-1", "info") as trace:
+            OptimizationAgent.rank_candidates(
+                self.slots, self.participants, self.constraints, engine="scalar"
+            )
+        self.assertEqual([e["event"] for e in trace.events], ["ranking"])
+
+
+class TestMetrics(unittest.TestCase):
+    """Test per-stage metrics and their Prometheus exposition."""
+    
+    def setUp(self):
+        """Set up a small scheduling request."""
+        day = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        busy = [TimeSlot(start=day.replace(hour=19), end=day.replace(hour=20), timezone="UTC")]
+        self.request = ScheduleRequest(
+            meeting_id="meeting-1",
+            participants=[Participant(
+                user_id="user1",
+                name="User One",
+                email="user1@example.com",
+                calendar_summary=CompressedCalendarSummary(user_id="user1", busy_slots=busy),
+            )],
+            constraints=SchedulingConstraints(
+                duration_minutes=30,
+                earliest_date=day,
+                latest_date=day + timedelta(days=1),
+                working_hours_start=18,
+                working_hours_end=21,
+                max_candidates=3,
+            ),
+        )
+    
+    def test_run_records_stages_and_counters(self):
+        """A run exports its stage timings and work counters with the response."""
+        response = scheduling_pipeline.run_schedule(self.request)
+        exported = response._metrics
+        self.assertIsNotNone(exported)
+        self.assertNotIn("metrics", response.analytics)
+        self.assertNotIn("_metrics", response.model_dump())
+        for stage in ("availability", "ranking", "ranking/busy_factors", "ranking/preference",
+                      "negotiation", "analytics"):
+            self.assertIn(stage, exported["stages_ms"])
+        
+        counters = exported["counters"]
+        self.assertEqual(counters["slots_available"], response.total_candidates_evaluated)
+        self.assertGreaterEqual(counters["slots_generated"], counters["slots_available"])
+        self.assertEqual(counters["busy_slots_scanned"], 1)
+        self.assertFalse(metrics_service.active())
+    
+    def test_histogram_exposition(self):
+        """Histograms render cumulative buckets, sum and count per label set."""
+        histogram = metrics_service.Histogram("test_seconds", "Test histogram", (0.1, 1.0), ("stage",))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5, "a")
+        
+        lines = histogram.render()
+        self.assertEqual(lines[:2], ["# HELP test_seconds Test histogram", "# TYPE test_seconds histogram"])
+        self.assertEqual(lines[2:], [
+            'test_seconds_bucket{stage="a",le="0.1"} 1',
+            'test_seconds_bucket{stage="a",le="1"} 2',
+            'test_seconds_bucket{stage="a",le="+Inf"} 3',
+            'test_seconds_sum{stage="a"} 5.55',
+            'test_seconds_count{stage="a"} 3',
+        ])
+
+
+class TestProfiling(unittest.TestCase):
+    """Test opt-in per-request profiling."""
+    
+    def test_authorize_requires_matching_token(self):
+        """Only requests carrying the configured token are profiled."""
+        self.assertFalse(profiling_service.authorize(None, token="secret"))
+        self.assertTrue(profiling_service.authorize("secret", token="secret"))
+        with self.assertRaises(scheduling_pipeline.SchedulingError) as wrong:
+            profiling_service.authorize("guess", token="secret")
+        self.assertEqual(wrong.exception.status_code, 403)
+        if profiling_service.PROFILE_TOKEN is None:
+            with self.assertRaises(scheduling_pipeline.SchedulingError):
+                profiling_service.authorize("secret")
+    
+    def _request(self) -> ScheduleRequest:
+        """Build a small one-participant request."""
+        day = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        return ScheduleRequest(
+            meeting_id="meeting-1",
+            participants=[Participant(
+                user_id="user1",
+                name="User One",
+                email="user1@example.com",
+                calendar_summary=CompressedCalendarSummary(user_id="user1", busy_slots=[]),
+            )],
+            constraints=SchedulingConstraints(
+                duration_minutes=30,
+                earliest_date=day,
+                latest_date=day + timedelta(days=1),
+                working_hours_start=18,
+                working_hours_end=21,
+            ),
+        )
+    
+    def test_profiled_run_is_stored_and_rendered(self):
+        """A profiled run returns the usual response plus loadable statistics."""
+        request = self._request()
+        response = profiling_service.run_schedule_profiled(request)
+        expected = scheduling_pipeline.run_schedule(request)
+        self.assertEqual(
+            response.model_dump(exclude={"processing_time_ms"}),
+            expected.model_dump(exclude={"processing_time_ms"}),
+        )
+        
+        store = profiling_service.ProfileStore(max_entries=1)
+        store.put("meeting-0", {})
+        store.put(request.meeting_id, response._profile)
+        self.assertEqual(store.meeting_ids(), [request.meeting_id])
+        
+        stats = store.get(request.meeting_id)["stats"]
+        summary = profiling_service.summarize(stats, limit=5)
+        self.assertEqual(len(summary), 5)
+        self.assertTrue(summary[0]["function"].endswith("(run_schedule)"))
+        self.assertEqual(marshal.loads(profiling_service.render(stats, "pstats")), stats)
+        self.assertIn(b"rank_candidates", profiling_service.render(stats, "text"))
+    
+    def test_concurrent_profiled_requests(self):
+        """A profiled request arriving while another one runs is rejected, not crashed."""
+        request = self._request()
+        entered = threading.Event()
+        release = threading.Event()
+        results = []
+        
+        def held():
+            entered.set()
+            release.wait(5)
+            return "held"
+        
+        first = threading.Thread(target=lambda: results.append(profiling_service.profile_call(held)))
+        first.start()
+        try:
+            self.assertTrue(entered.wait(5))
+            with self.assertRaises(scheduling_pipeline.SchedulingError) as raised:
+                profiling_service.run_schedule_profiled(request)
+            self.assertEqual(raised.exception.status_code, 429)
+        finally:
+            release.set()
+            first.join()
+        
+        self.assertEqual(results[0][0], "held")
+        self.assertTrue(profiling_service.run_schedule_profiled(request).success)
+
+
+class TestSchedulingExecutor(unittest.TestCase):
+    """Test admission control of the scheduling executor."""
+    
+    def test_rejects_when_pool_and_queue_full(self):
+        """Jobs beyond workers + queue depth are rejected with a retry hint."""
+        executor = SchedulingExecutor(mode="thread", workers=1, max_queue=1, timeout=5)
+        release = threading.Event()
+        
+        async def scenario():
+            first = asyncio.ensure_future(executor.run(release.wait))
+            second = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorSaturated) as raised:
+                await executor.run(release.wait)
+            release.set()
+            return raised.exception, await asyncio.gather(first, second)
+        
+        try:
+            error, results = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+        self.assertGreaterEqual(error.retry_after, 1)
+        self.assertEqual(results, [True, True])
+        self.assertEqual(executor.stats()["rejected"], 1)
+        self.assertEqual(executor.stats()["in_flight"], 0)
+    
+    def test_timeout_keeps_slot_until_job_finishes(self):
+        """A timed-out job still counts against capacity until it ends."""
+        executor = SchedulingExecutor(mode="thread", workers=1, max_queue=0, timeout=0.05)
+        release = threading.Event()
+        
+        async def scenario():
+            with self.assertRaises(ExecutorTimeout):
+                await executor.run(release.wait)
+            with self.assertRaises(ExecutorSaturated):
+                await executor.run(release.wait)
+        
+        try:
+            asyncio.run(scenario())
+            release.set()
+        finally:
+            executor.shutdown()
+        self.assertEqual(executor.stats()["timed_out"], 1)
+
+    def test_abandoned_jobs_count_as_cancelled(self):
+        """Timed-out running and queued jobs are not counted as completed."""
+        executor = SchedulingExecutor(mode="thread", workers=1, max_queue=1, timeout=0.05)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(executor.run(release.wait))
+            queued = asyncio.ensure_future(executor.run(release.wait))
+            for job in (running, queued):
+                with self.assertRaises(ExecutorTimeout):
+                    await job
+            release.set()
+            while executor.stats()["in_flight"]:
+                await asyncio.sleep(0.01)
+            return await executor.run(lambda: "done", timeout=5)
+
+        try:
+            self.assertEqual(asyncio.run(scenario()), "done")
+        finally:
+            release.set()
+            executor.shutdown()
+        stats = executor.stats()
+        self.assertEqual(stats["cancelled"], 2)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["timed_out"], 2)
+
+    def test_stream_yields_emitted_items_then_result(self):
+        """Streamed jobs forward emitted items in order and admit eagerly."""
+        executor = SchedulingExecutor(mode="thread", workers=1, max_queue=0, timeout=5)
+        release = threading.Event()
+        
+        def job(count, emit):
+            release.wait()
+            for i in range(count):
+                emit(i)
+            return "done"
+        
+        async def scenario():
+            items = executor.stream(job, 3)
+            with self.assertRaises(ExecutorSaturated):
+                executor.stream(job, 1)
+            release.set()
+            return [item async for item in items]
+        
+        try:
+            self.assertEqual(asyncio.run(scenario()), [0, 1, 2, "done"])
+        finally:
+            release.set()
+            executor.shutdown()
+        self.assertEqual(executor.stats()["in_flight"], 0)
+
+
+class TestBatchScheduling(unittest.TestCase):
+    """Test batch scheduling over a shared participant directory."""
+    
+    def setUp(self):
+        """Set up a directory of participants and a few meetings."""
+        day = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        self.directory = {}
+        for i in range(3):
+            busy = [TimeSlot(
+                start=day.replace(hour=18 + i),
+                end=day.replace(hour=18 + i, minute=30),
+                timezone="UTC",
+            )]
+            self.directory[f"user{i}"] = Participant(
+                user_id=f"user{i}",
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+                calendar_summary=CompressedCalendarSummary(user_id=f"user{i}", busy_slots=busy),
+            )
+        self.constraints = SchedulingConstraints(
+            duration_minutes=30,
+            earliest_date=day,
+            latest_date=day + timedelta(days=2),
+            working_hours_start=18,
+            working_hours_end=21,
+            max_candidates=3,
+        )
+    
+    def test_meeting_request_shares_calendar_summaries(self):
+        """Resolved meetings reference the directory's summaries, not copies."""
+        meeting = BatchMeeting(
+            meeting_id="m1",
+            participant_ids=["user0", "user2"],
+            optional_participant_ids=["user2"],
+            constraints=self.constraints,
+        )
+        request = scheduling_pipeline.build_meeting_request(meeting, self.directory)
+        
+        self.assertEqual([p.is_required for p in request.participants], [True, False])
+        self.assertIs(
+            request.participants[1].calendar_summary,
+            self.directory["user2"].calendar_summary,
+        )
+        self.assertTrue(self.directory["user2"].is_required)
+    
+    def test_stream_matches_single_requests(self):
+        """Every meeting streams the same result as a stand-alone request."""
+        meetings = [
+            BatchMeeting(meeting_id=f"m{i}", participant_ids=ids, constraints=self.constraints)
+            for i, ids in enumerate([["user0", "user1"], ["user1", "user2"], ["ghost"]])
+        ]
+        batch = BatchScheduleRequest(participants=self.directory, meetings=meetings)
+        
+        async def collect():
+            return [record async for record in batch_service.stream_batch(batch)]
+        
+        records = asyncio.run(collect())
+        summary = records.pop()["summary"]
+        by_id = {record["meeting_id"]: record for record in records}
+        
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(by_id["m2"]["status"], 400)
+        for meeting in meetings[:2]:
+            expected = scheduling_pipeline.run_schedule(
+                scheduling_pipeline.build_meeting_request(meeting, self.directory)
+            ).model_dump(mode="json")
+            actual = by_id[meeting.meeting_id]["response"]
+            self.assertEqual(actual["candidates"], expected["candidates"])
+    
+    def test_single_request_stream(self):
+        """A streamed request sends ranked candidates first and the full response last."""
+        meeting = BatchMeeting(
+            meeting_id="m1", participant_ids=["user0", "user1"], constraints=self.constraints
+        )
+        request = scheduling_pipeline.build_meeting_request(meeting, self.directory)
+        
+        async def collect():
+            return [record async for record in streaming_service.stream_schedule(request)]
+        
+        records = asyncio.run(collect())
+        expected = scheduling_pipeline.run_schedule(request).model_dump(mode="json")
+        
+        self.assertEqual([r["event"] for r in records], ["candidates", "result"])
+        self.assertTrue(records[0]["candidates"])
+        self.assertEqual(records[-1]["response"]["candidates"], expected["candidates"])
+
+
+class TestRerank(unittest.TestCase):
+    """Test incremental re-ranking after busy-slot changes."""
+    
+    def setUp(self):
+        """Set up a week of evening slots over three participants' calendars."""
+        day = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        participants = []
+        for i in range(3):
+            busy = [
+                TimeSlot(
+                    start=day + timedelta(days=d, hours=18 + (d + i) % 3),
+                    end=day + timedelta(days=d, hours=18 + (d + i) % 3, minutes=30),
+                    timezone="UTC",
+                )
+                for d in range(7)
+            ]
+            participants.append(Participant(
+                user_id=f"user{i}",
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+                calendar_summary=CompressedCalendarSummary(user_id=f"user{i}", busy_slots=busy),
+            ))
+        self.request = ScheduleRequest(
+            meeting_id="rerank",
+            participants=participants,
+            constraints=SchedulingConstraints(
+                duration_minutes=60,
+                earliest_date=day,
+                latest_date=day + timedelta(days=7),
+                working_hours_start=18,
+                working_hours_end=22,
+                max_candidates=5,
+            ),
+        )
+    
+    def _edited(self, changes: List[BusySlotChange]) -> ScheduleRequest:
+        """Get the request with the changes applied to its busy slots."""
+        by_id = {change.user_id: change for change in changes}
+        participants = []
+        for participant in self.request.participants:
+            change = by_id.get(participant.user_id)
+            if change is not None:
+                busy = [
+                    s for s in participant.calendar_summary.busy_slots
+                    if s not in change.removed_busy_slots
+                ] + change.added_busy_slots
+                summary = participant.calendar_summary.model_copy(update={"busy_slots": busy})
+                participant = participant.model_copy(update={"calendar_summary": summary})
+            participants.append(participant)
+        return self.request.model_copy(update={"participants": participants})
+    
+    def test_rerank_matches_full_run(self):
+        """Re-ranking gives the candidates of a full run on the edited calendars."""
+        response = rerank_service.run_schedule_tracked(self.request)
+        top = response.candidates[0].slot
+        changes = [
+            BusySlotChange(
+                user_id="user0",
+                added_busy_slots=[TimeSlot(start=top.start, end=top.end, timezone="UTC")],
+            ),
+            BusySlotChange(
+                user_id="user1",
+                removed_busy_slots=[self.request.participants[1].calendar_summary.busy_slots[4]],
+            ),
+        ]
+        
+        reranked = rerank_service.run_rerank(response._ranking, changes)
+        expected = scheduling_pipeline.run_schedule(self._edited(changes))
+        
+        self.assertNotEqual(reranked.candidates[0].slot.start, top.start)
+        self.assertEqual(
+            [c.model_dump() for c in reranked.candidates],
+            [c.model_dump() for c in expected.candidates],
+        )
+        self.assertLess(reranked.analytics["rerank"]["slots_rescored"], len(response._ranking.slots))
+    
+    def test_unknown_removal_is_conflict(self):
+        """Removing a busy slot that is not in the calendar is rejected."""
+        response = rerank_service.run_schedule_tracked(self.request)
+        change = BusySlotChange(
+            user_id="user0",
+            removed_busy_slots=[TimeSlot(
+                start=datetime(2026, 3, 2, 3, tzinfo=timezone.utc),
+                end=datetime(2026, 3, 2, 4, tzinfo=timezone.utc),
+                timezone="UTC",
+            )],
+        )
+        
+        with self.assertRaises(scheduling_pipeline.SchedulingError) as raised:
+            rerank_service.rerank(response._ranking, [change])
+        self.assertEqual(raised.exception.status_code, 409)
+    
+    def test_empty_change_is_rejected(self):
+        """A change must add or remove busy slots (e.g. not a misspelled key)."""
+        with self.assertRaises(ValidationError):
+            BusySlotChange.model_validate({"user_id": "user0", "added": []})
+    
+    def test_store_entry_and_byte_limits(self):
+        """The ranking store evicts least recently used rankings beyond either limit."""
+        state = rerank_service.run_schedule_tracked(self.request)._ranking
+        size = state.estimated_bytes()
+        
+        store = rerank_service.RankingStore(max_entries=2)
+        first = store.put(state)
+        second = store.put(state)
+        store.get(first)
+        store.put(state)
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get(second))
+        self.assertIs(store.get(first), state)
+        
+        small = rerank_service.RankingStore(max_bytes=2 * size - 1)
+        first = small.put(state)
+        small.put(state)
+        self.assertEqual(small.stats()["bytes"], size)
+        self.assertIsNone(small.get(first))
+        self.assertIsNone(rerank_service.RankingStore(max_bytes=size - 1).put(state))
+    
+    def test_store_rejects_overtaken_rerank(self):
+        """Only the ranking a re-rank started from can be replaced."""
+        response = rerank_service.run_schedule_tracked(self.request)
+        store = rerank_service.RankingStore()
+        handle = store.put(response._ranking)
+        slot = response.candidates[0].slot
+        changes = [BusySlotChange(user_id="user0", added_busy_slots=[slot])]
+        first = rerank_service.run_rerank(response._ranking, changes)
+        second = rerank_service.run_rerank(response._ranking, changes)
+        
+        self.assertEqual(store.replace(handle, response._ranking, first._ranking), handle)
+        with self.assertRaises(scheduling_pipeline.SchedulingError) as raised:
+            store.replace(handle, response._ranking, second._ranking)
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertIs(store.get(handle), first._ranking)
+
+
+class TestCalendarCache(unittest.TestCase):
+    """Test the calendar summary cache and calendar references."""
+    
+    def setUp(self):
+        """Set up a few calendar summaries."""
+        day = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        self.summaries = [
+            CompressedCalendarSummary(
+                user_id=f"user{i}",
+                busy_slots=[TimeSlot(
+                    start=day.replace(hour=9 + i), end=day.replace(hour=10 + i), timezone="UTC"
+                )],
+            )
+            for i in range(3)
+        ]
+    
+    def test_lru_and_byte_limits(self):
+        """Least recently used entries are evicted once a limit is exceeded."""
+        cache = CalendarCache(max_entries=2, redis_url="")
+        hashes = [cache.put(s.user_id, s) for s in self.summaries[:2]]
+        self.assertIs(cache.get("user0", hashes[0]), self.summaries[0])
+        
+        cache.put("user2", self.summaries[2])  # evicts user1, not the recently used user0
+        self.assertIsNotNone(cache.get("user0", hashes[0]))
+        self.assertIsNone(cache.get("user1", hashes[1]))
+        self.assertIsNone(cache.get("user0", "unknown"))
+        
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1))
+        
+        tiny = CalendarCache(max_bytes=stats["bytes"] // 2, redis_url="")
+        tiny.put("user0", self.summaries[0])
+        tiny.put("user1", self.summaries[1])
+        self.assertEqual(tiny.stats()["entries"], 1)
+    
+    def test_ttl_expiry(self):
+        """Expired entries are no longer returned."""
+        cache = CalendarCache(ttl=0, redis_url="")
+        digest = cache.put("user0", self.summaries[0])
+        self.assertIsNone(cache.get("user0", digest))
+        self.assertEqual(cache.stats()["expirations"], 1)
+    
+    def test_references_resolve_to_indexed_summaries(self):
+        """Participants may reference a cached summary instead of sending it."""
+        summary = self.summaries[0]
+        digest = calendar_cache_service.get_cache().put("user0", summary)
+        participants = [
+            Participant(user_id="user0", email="u0@example.com", name="U0",
+                        calendar_ref=CalendarRef(summary_hash=digest)),
+            Participant(user_id="user1", email="u1@example.com", name="U1",
+                        calendar_summary=self.summaries[1]),
+        ]
+        
+        resolved = calendar_cache_service.resolve_participants(participants)
+        self.assertIs(resolved[0].calendar_summary, summary)
+        self.assertIsNotNone(summary._busy_index)
+        self.assertIsNotNone(resolved[1].calendar_summary._busy_index)
+        
+        # Same content sent inline again is swapped for the cached copy
+        again = self.summaries[1].model_copy(deep=True)
+        resolved = calendar_cache_service.resolve_participants([
+            participants[1].model_copy(update={"calendar_summary": again})
+        ])
+        self.assertIs(resolved[0].calendar_summary, self.summaries[1])
+        
+        with self.assertRaises(scheduling_pipeline.SchedulingError) as raised:
+            calendar_cache_service.resolve_participants([
+                Participant(user_id="user2", email="u2@example.com", name="U2",
+                            calendar_ref=CalendarRef(summary_hash=digest)),
+            ])
+        self.assertEqual(raised.exception.status_code, 409)
+
+
+class TestRequestDecoder(unittest.TestCase):
+    """Test the compact request decoder against plain pydantic validation."""
+    
+    def setUp(self):
+        """Build a request body with unsorted, mixed-offset busy slots."""
+        starts = [
+            "2026-03-03T15:00:00Z", "2026-03-03T09:30:00+05:30", "2026-03-02T23:15:00.250-08:00",
+            "2026-03-03T09:30:00+05:30", "2026-03-03T12:00:00",
+        ]
+        busy = [
+            {"start": start, "end": start[:11] + "23:59:59" + start[19:], "timezone": "UTC"}
+            for start in starts
+        ]
+        busy[3]["end"] = "2026-03-03T10:00:00+05:30"
+        self.constraints = {
+            "duration_minutes": 30,
+            "earliest_date": "2026-03-02T00:00:00Z",
+            "latest_date": "2026-03-06T00:00:00Z",
+        }
+        self.data = {
+            "meeting_id": "decode",
+            "participants": [
+                {"user_id": f"user{i}", "email": f"u{i}@example.com", "name": f"U{i}",
+                 "calendar_summary": {"user_id": f"user{i}", "busy_slots": busy[i:]}}
+                for i in range(3)
+            ],
+            "constraints": self.constraints,
+        }
+    
+    def test_compact_decode_matches_pydantic(self):
+        """Decoded requests index, serialize and hash exactly like validated ones."""
+        body = json.dumps(self.data).encode()
+        expected = ScheduleRequest.model_validate_json(body)
+        decoded = decode_schedule_request(body)
+        
+        self.assertEqual(decoded.model_dump_json(), expected.model_dump_json())
+        for got, want in zip(decoded.participants, expected.participants):
+            got_index = BusyIndex.for_summary(got.calendar_summary)
+            want_index = BusyIndex.for_summary(want.calendar_summary)
+            for field in ("starts", "ends", "start_days", "sorted_ends", "max_duration"):
+                self.assertEqual(getattr(got_index, field), getattr(want_index, field))
+            self.assertEqual(
+                calendar_cache_service.summary_hash(got.calendar_summary),
+                calendar_cache_service.summary_hash(want.calendar_summary),
+            )
+        
+        batch = {
+            "participants": {p["user_id"]: p for p in self.data["participants"]},
+            "meetings": [{"meeting_id": "m1", "participant_ids": ["user0", "user1"],
+                          "constraints": self.constraints}],
+        }
+        body = json.dumps(batch).encode()
+        self.assertEqual(
+            decode_batch_request(body).model_dump_json(),
+            BatchScheduleRequest.model_validate_json(body).model_dump_json(),
+        )
+    
+    def test_other_formats_and_errors_use_pydantic(self):
+        """Non-canonical timestamps decode normally and invalid ones raise the schema's errors."""
+        busy = self.data["participants"][0]["calendar_summary"]["busy_slots"]
+        busy[0]["start"] = "2026-03-03 15:00Z"
+        body = json.dumps(self.data).encode()
+        self.assertEqual(
+            decode_schedule_request(body).model_dump_json(),
+            ScheduleRequest.model_validate_json(body).model_dump_json(),
+        )
+        
+        invalid = [
+            "2026-02-30T15:00:00Z",
+            " 026-01-01T10:00:00Z",
+            "2026-01-01T10:00:00.-12Z",
+            "2026-01-01T10:00:00.1 Z",
+            "2026-01-01T10:00:00.    Z",
+            "2026-01-01T10:00:00.1+05Z",
+        ]
+        for text in invalid:
+            busy[0]["start"] = text
+            body = json.dumps(self.data).encode()
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                with self.assertRaises(ValidationError) as raised:
+                    decode_schedule_request(body)
+            with self.assertRaises(ValidationError) as expected:
+                ScheduleRequest.model_validate_json(body)
+            self.assertEqual(raised.exception.errors(), expected.exception.errors())
+
+
+class TestResponseProjection(unittest.TestCase):
+    """Test ?fields= / ?verbosity= response projections."""
+    
+    def setUp(self):
+        """Build a response with a detailed candidate."""
+        start = datetime(2026, 3, 3, 10, tzinfo=timezone.utc)
+        self.response = ScheduleResponse(
+            meeting_id="projection",
+            candidates=[MeetingSlotCandidate(
+                slot=TimeSlot(start=start, end=start + timedelta(hours=1)),
+                score=85.0,
+                availability_score=100.0,
+                preference_score=80.0,
+                optimization_score=90.0,
+                score_breakdown={"weights": {"availability": 0.5}},
+                all_participants_available=True,
+                reasoning="Good slot",
+            )],
+            total_candidates_evaluated=12,
+            processing_time_ms=3.5,
+            analytics={"trace": {"spans": []}},
+            success=True,
+        )
+    
+    def test_verbosity_levels_and_fields(self):
+        """Projections keep the envelope plus the requested fields only."""
+        full = response_projection.project(
+            self.response, response_projection.parse_projection(None, "full")
+        )
+        self.assertEqual(full, self.response.model_dump(mode="json"))
+        
+        minimal = response_projection.project(
+            self.response, response_projection.parse_projection(None, "minimal")
+        )
+        self.assertEqual(set(minimal), {"meeting_id", "success", "message", "candidates"})
+        self.assertEqual(minimal["candidates"], [{"slot": full["candidates"][0]["slot"], "score": 85.0}])
+        
+        standard = response_projection.project(
+            self.response, response_projection.parse_projection(None, "standard")
+        )
+        self.assertNotIn("analytics", standard)
+        self.assertNotIn("score_breakdown", standard["candidates"][0])
+        self.assertEqual(standard["candidates"][0]["reasoning"], "Good slot")
+        
+        projection = response_projection.parse_projection(" score , analytics", "minimal")
+        projected = response_projection.project(self.response, projection)
+        self.assertEqual(projected["candidates"], [{"score": 85.0}])
+        self.assertEqual(projected["analytics"], full["analytics"])
+        self.assertEqual(
+            response_projection.project_candidates(full["candidates"], projection), [{"score": 85.0}]
+        )
+        self.assertEqual(
+            response_projection.dumps(projected),
+            json.dumps(projected, separators=(",", ":")).encode(),
+        )
+    
+    def test_unknown_fields_are_rejected(self):
+        """Unknown field names and verbosity levels are 422 errors."""
+        for fields, verbosity in (("slot,bogus", "full"), (None, "loud")):
+            with self.assertRaises(scheduling_pipeline.SchedulingError) as raised:
+                response_projection.parse_projection(fields, verbosity)
+            self.assertEqual(raised.exception.status_code, 422)
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test the benchmark generators and result comparison."""
+    
+    def test_generators_are_seeded_and_valid(self):
+        """Equal scenarios generate equal, schema-valid requests."""
+        scenario = SCENARIOS["cross_timezone"]
+        payload = generate_request_payload(scenario)
+        self.assertEqual(payload, generate_request_payload(scenario))
+        self.assertNotEqual(payload, generate_request_payload(scenario.model_copy(update={"seed": 99})))
+        
+        request = ScheduleRequest.model_validate(payload)
+        self.assertEqual(len(request.participants), scenario.participants)
+        self.assertEqual(
+            {p.calendar_summary.timezone for p in request.participants}, set(scenario.timezones)
+        )
+        self.assertTrue(all(p.calendar_summary.busy_slots for p in request.participants))
+        self.assertIn(request.constraints.event_category, scenario.categories)
+    
+    def test_measure_and_compare(self):
+        """Timings are recorded per call and compared by median."""
+        timing = measure(lambda: None, repeat=3, sample_seconds=0.001)
+        self.assertEqual(len(timing["samples_ms"]), 3)
+        self.assertLessEqual(timing["min_ms"], timing["median_ms"])
+        
+        def results(**medians):
+            return {"benchmarks": [
+                {"scenario": "s", "case": case, "status": "ok", "median_ms": median}
+                for case, median in medians.items()
+            ]}
+        
+        rows = compare(results(a=10.0, b=10.0, c=10.0), results(a=10.2, b=5.0, d=1.0))
+        verdicts = {row["case"]: row["verdict"] for row in rows}
+        self.assertEqual(verdicts, {"a": "same", "b": "faster", "c": "removed", "d": "new"})
+
+
+class TestJointSchedulingAgent(unittest.TestCase):
+    """Test joint assignment of meetings to compatible slots."""
+    
+    def setUp(self):
+        """Set up shared participants and a few candidate slots."""
+        self.day = datetime(2026, 3, 3, 9, 0, tzinfo=timezone.utc)
+        self.users = {
+            user_id: Participant(
+                user_id=user_id,
+                name=user_id,
+                email=f"{user_id}@example.com",
+                calendar_summary=CompressedCalendarSummary(user_id=user_id),
+            )
+            for user_id in ("user1", "user2", "user3")
+        }
+        self.constraints = SchedulingConstraints(
+            duration_minutes=60,
+            earliest_date=self.day,
+            latest_date=self.day + timedelta(days=1),
+            buffer_minutes=15,
+        )
+    
+    def _request(self, meeting_id: str, user_ids: List[str]) -> ScheduleRequest:
+        return ScheduleRequest(
+            meeting_id=meeting_id,
+            participants=[self.users[u] for u in user_ids],
+            constraints=self.constraints,
+        )
+    
+    def _candidate(self, hour: int, score: float) -> MeetingSlotCandidate:
+        start = self.day.replace(hour=hour)
+        return MeetingSlotCandidate(
+            slot=TimeSlot(start=start, end=start + timedelta(hours=1)),
+            score=score,
+            availability_score=100.0,
+            preference_score=50.0,
+            optimization_score=50.0,
+            all_participants_available=True,
+            reasoning="test",
+        )
+    
+    def test_local_search_moves_blocking_meeting(self):
+        """Ejecting a greedy choice lets both meetings take better slots."""
+        requests = [
+            self._request("team", ["user1", "user2"]),
+            self._request("one-on-one", ["user1"]),
+        ]
+        candidates = [
+            [self._candidate(10, 90.0), self._candidate(14, 80.0)],
+            [self._candidate(10, 99.0), self._candidate(16, 10.0)],
+        ]
+        snapshots = []
+        result = JointSchedulingAgent.solve(
+            requests, candidates, on_improvement=snapshots.append
+        )
+        
+        self.assertEqual(snapshots[0]["assignments"], [0, 1])
+        self.assertEqual(result["assignments"], [1, 0])
+        self.assertEqual(result["total_score"], 179.0)
+        self.assertEqual(result["unscheduled"], 0)
+    
+    def test_buffer_and_disjoint_participants(self):
+        """Slots inside the buffer conflict only for shared participants."""
+        requests = [
+            self._request("a", ["user1"]),
+            self._request("b", ["user1"]),
+            self._request("c", ["user3"]),
+        ]
+        # 11:00 starts right as the 10:00 meeting ends, inside the 15 min buffer
+        candidates = [
+            [self._candidate(10, 90.0)],
+            [self._candidate(11, 90.0)],
+            [self._candidate(10, 90.0)],
+        ]
+        result = JointSchedulingAgent.solve(requests, candidates)
+        
+        self.assertEqual(result["scheduled"], 2)
+        self.assertEqual(result["assignments"][2], 0)
+        self.assertEqual(sorted(result["assignments"][:2], key=str), [0, None])
+
+    def test_optional_only_overlap_is_not_a_conflict(self):
+        """A participant who is optional in one meeting does not block it."""
+        optional = self._request("review", ["user2"])
+        optional.participants.append(self.users["user1"].model_copy(update={"is_required": False}))
+        requests = [self._request("standup", ["user1"]), optional]
+        candidates = [[self._candidate(10, 90.0)], [self._candidate(10, 80.0)]]
+
+        result = JointSchedulingAgent.solve(requests, candidates)
+        self.assertEqual(result["assignments"], [0, 0])
+
+        strict = JointSchedulingAgent.solve(requests, candidates, optional_conflicts=True)
+        self.assertEqual(strict["assignments"], [0, None])
 
 
 class TestIntegration(unittest.TestCase):
@@ -391,9 +2051,23 @@ def run_tests():
     
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestAvailabilityAgent))
+    suite.addTests(loader.loadTestsFromTestCase(TestBusyIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestIntervalSet))
+    suite.addTests(loader.loadTestsFromTestCase(TestTimezoneEngine))
     suite.addTests(loader.loadTestsFromTestCase(TestPreferenceAgent))
     suite.addTests(loader.loadTestsFromTestCase(TestOptimizationAgent))
     suite.addTests(loader.loadTestsFromTestCase(TestNegotiationAgent))
+    suite.addTests(loader.loadTestsFromTestCase(TestTracing))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetrics))
+    suite.addTests(loader.loadTestsFromTestCase(TestProfiling))
+    suite.addTests(loader.loadTestsFromTestCase(TestSchedulingExecutor))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchScheduling))
+    suite.addTests(loader.loadTestsFromTestCase(TestRerank))
+    suite.addTests(loader.loadTestsFromTestCase(TestCalendarCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestRequestDecoder))
+    suite.addTests(loader.loadTestsFromTestCase(TestResponseProjection))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmarks))
+    suite.addTests(loader.loadTestsFromTestCase(TestJointSchedulingAgent))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     
     # Run tests